@@ -0,0 +1,93 @@
+"""
+Benchmark: legacy BeautifulSoup extraction vs. the streaming lxml parser.
+
+Builds synthetic Stocktwits pages of increasing size (or times saved pages
+passed on the command line) and reports per-message cost for each parser.
+A linear parser keeps a flat µs/message column as pages grow; the legacy
+find_previous("time") walk grows with page size.
+
+Usage:
+    python benchmarks/bench_extract_messages.py
+    python benchmarks/bench_extract_messages.py saved_TSLA.html saved_SPY.html
+"""
+
+import os
+import sys
+import time
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from message_parser import parse_messages_html
+
+SIZES = [250, 500, 1000, 2000, 4000]
+REPEATS = 3
+
+MESSAGE_TEMPLATE = """
+<article class="StreamMessage_container__abc">
+  <div class="StreamMessage_header__x">
+    <a href="/user{i}"><img src="/avatar/{i}.png"/><span>user{i}</span></a>
+    <a href="/TSLA/message/{i}"><time datetime="2025-02-27T{h:02d}:{m:02d}:{s:02d}Z">{m}m</time></a>
+  </div>
+  <div class="RichTextMessage_body__4qUeP">$TSLA message number {i} <span>looking strong</span> into the close</div>
+  <div class="StreamMessage_footer__y"><button>Like</button><button>Reply</button><button>Share</button></div>
+</article>
+"""
+
+
+def build_page(count):
+    body = "".join(
+        MESSAGE_TEMPLATE.format(i=i, h=(i // 3600) % 24, m=(i // 60) % 60, s=i % 60) for i in range(count)
+    )
+    return f"<html><head><title>TSLA</title></head><body><main>{body}</main></body></html>"
+
+
+def legacy_parse(html_content):
+    soup = BeautifulSoup(html_content, "html.parser")
+    rows = []
+    for msg in soup.find_all("div", class_="RichTextMessage_body__4qUeP"):
+        timestamp_elem = msg.find_previous("time")
+        rows.append({
+            "timestamp": timestamp_elem.get("datetime") if timestamp_elem else None,
+            "content": msg.get_text(strip=True),
+        })
+    return rows
+
+
+def best_time(func, html_content):
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(html_content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def timestamp_and_content(rows):
+    # The legacy parser never read message IDs, so only compare what both return.
+    return [(row["timestamp"], row["content"]) for row in rows]
+
+
+def run(pages):
+    print(f"{'page':>16} {'KB':>8} {'msgs':>6} {'legacy ms':>10} {'lxml ms':>9} {'legacy µs/msg':>14} {'lxml µs/msg':>12}")
+    for label, html_content in pages:
+        count = len(parse_messages_html(html_content)) or 1
+        assert timestamp_and_content(parse_messages_html(html_content)) == timestamp_and_content(
+            legacy_parse(html_content)
+        ), f"parsers disagree on {label}"
+        legacy = best_time(legacy_parse, html_content)
+        streaming = best_time(parse_messages_html, html_content)
+        print(
+            f"{label:>16} {len(html_content) / 1024:>8.0f} {count:>6} {legacy * 1000:>10.1f} {streaming * 1000:>9.1f} "
+            f"{legacy / count * 1e6:>14.1f} {streaming / count * 1e6:>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        saved_pages = []
+        for path in sys.argv[1:]:
+            with open(path, "r", encoding="utf-8") as f:
+                saved_pages.append((os.path.basename(path)[-16:], f.read()))
+        run(saved_pages)
+    else:
+        run([(f"synthetic-{n}", build_page(n)) for n in SIZES])
@@ -0,0 +1,84 @@
+"""
+Benchmark: FinBERT CPU inference backends (pytorch, int8, onnx).
+
+Each backend is loaded in a fresh interpreter so resident memory is measured
+in isolation. Reports load time, messages/sec at the given batch size,
+resident memory (peak RSS when psutil is missing), and label agreement with
+the stock pytorch pipeline on the same texts. Backends whose dependencies are missing are reported and skipped.
+
+Usage:
+    python benchmarks/bench_finbert_backends.py
+    python benchmarks/bench_finbert_backends.py --messages 512 --batch-size 32 int8 onnx
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+from finbert_backends import BACKENDS
+
+PROBE = """
+import json, sys, time
+from finbert_backends import PARITY_TEXTS, build_finbert_pipeline
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 / 1024
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+start = time.perf_counter()
+pipe = build_finbert_pipeline({backend!r})
+load = time.perf_counter() - start
+
+texts = (PARITY_TEXTS * ({messages} // len(PARITY_TEXTS) + 1))[:{messages}]
+pipe(texts[:{batch_size}], batch_size={batch_size}, truncation=True)
+start = time.perf_counter()
+pipe(texts, batch_size={batch_size}, truncation=True)
+elapsed = time.perf_counter() - start
+
+labels = [r["label"].lower() for r in pipe(list(PARITY_TEXTS), truncation=True)]
+print(json.dumps({{"load": load, "msgs_per_sec": len(texts) / elapsed, "rss_mb": rss_mb(), "labels": labels}}))
+"""
+
+
+def probe(backend, messages, batch_size):
+    code = PROBE.format(backend=backend, messages=messages, batch_size=batch_size)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": (result.stderr.strip().splitlines() or ["unknown error"])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(backends, messages, batch_size):
+    results = {backend: probe(backend, messages, batch_size) for backend in backends}
+    reference = results["pytorch"] if "pytorch" in results else probe("pytorch", batch_size, batch_size)
+
+    print(f"{'backend':>8} {'load s':>7} {'msgs/s':>8} {'RSS MB':>8} {'parity':>7}")
+    for backend, result in results.items():
+        if "error" in result:
+            print(f"{backend:>8} skipped: {result['error']}")
+            continue
+        parity = "-"
+        if "error" not in reference:
+            matches = sum(a == b for a, b in zip(reference["labels"], result["labels"]))
+            parity = f"{matches / len(reference['labels']):.0%}"
+        print(
+            f"{backend:>8} {result['load']:>7.1f} {result['msgs_per_sec']:>8.1f} "
+            f"{result['rss_mb']:>8.0f} {parity:>7}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backends", nargs="*", default=list(BACKENDS))
+    parser.add_argument("--messages", type=int, default=256)
+    parser.add_argument("--batch-size", type=int, default=16)
+    args = parser.parse_args()
+    run(args.backends, args.messages, args.batch_size)
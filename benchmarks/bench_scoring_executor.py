@@ -0,0 +1,65 @@
+"""
+Benchmark: in-process scoring vs. the process-pool ScoringExecutor.
+
+Scores synthetic cleaned Stocktwits messages of increasing batch size both
+in-process and through a warm ScoringExecutor (pool started before timing),
+and reports messages/sec for each. It also measures the fixed cost of one
+pool call and the in-process cost per message, and prints the batch size
+where --workers processes break even:
+    overhead / (per_message * (1 - 1 / workers))
+SCORING_MIN_PARALLEL_BATCH should sit above that; the scraper scores and
+saves in SCRAPE_FLUSH_SIZE chunks, which default to it.
+
+Usage:
+    python benchmarks/bench_scoring_executor.py
+    python benchmarks/bench_scoring_executor.py --workers 4 --sizes 50 200 500 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sentiment_engine import SCORING_CHUNK_SIZE, SCORING_WORKERS, ScoringExecutor, get_engine
+from bench_vectorized_scorer import build_corpus
+
+
+def median_seconds(fn, texts, repeats):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(texts)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def run(sizes, workers, chunk_size, repeats):
+    engine = get_engine()
+    executor = ScoringExecutor(max_workers=workers, min_parallel_batch=0, chunk_size=chunk_size)
+    executor.score(build_corpus(workers * chunk_size, seed=1))  # start and warm every worker
+    try:
+        overhead = median_seconds(executor.score, build_corpus(1), max(repeats, 11))
+        per_message = median_seconds(engine.analyze_batch, build_corpus(2000, seed=2), repeats) / 2000
+        print(f"{workers} worker(s), shards of at most {chunk_size}")
+        print(f"Pool call overhead {overhead * 1000:.1f} ms, in-process {per_message * 1000:.3f} ms/msg")
+        print(f"Break-even with {workers} worker(s): ~{overhead / (per_message * (1 - 1 / workers)):.0f} messages")
+        print(f"{'messages':>10} {'in-process msg/s':>17} {'pool msg/s':>11} {'speedup':>8}")
+        for size in sizes:
+            texts = build_corpus(size)
+            local_rate = size / median_seconds(engine.analyze_batch, texts, repeats)
+            pool_rate = size / median_seconds(executor.score, texts, repeats)
+            print(f"{size:>10} {local_rate:>17.0f} {pool_rate:>11.0f} {pool_rate / local_rate:>7.2f}x")
+    finally:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 250, 500, 1000, 2000, 5000])
+    parser.add_argument("--workers", type=int, default=max(2, SCORING_WORKERS))
+    parser.add_argument("--chunk-size", type=int, default=SCORING_CHUNK_SIZE)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.workers, args.chunk_size, args.repeats)
@@ -0,0 +1,114 @@
+"""
+Benchmark: legacy SequenceMatcher window scan vs. the MinHash/LSH spam index.
+
+Streams a synthetic feed (organic messages mixed with templated pump spam)
+through both detectors at several window sizes. Reports µs per message and
+how often the index agrees with the exact scan. The exact scan is skipped
+above --scan-limit because its cost grows with the window. Finally fills
+one index with --memory-messages distinct messages and reports its memory
+per message (traced allocations), which sizes SPAM_WINDOW.
+
+Usage:
+    python benchmarks/bench_spam_index.py
+    python benchmarks/bench_spam_index.py --messages 200000 --windows 100 100000 --memory-messages 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from spam_index import NearDuplicateIndex
+
+THRESHOLD = 0.85
+WORDS = (
+    "tsla spy qqq calls puts bullish bearish moon dump rip squeeze short long buy sell hold "
+    "great terrible strong weak beat miss guidance earnings revenue margins record crash rally "
+    "the a to of and is are this that today tomorrow week green red chart support resistance"
+).split()
+PUMP_TEMPLATES = [
+    "{t} is about to explode join our discord for the next {n}x play before it runs",
+    "massive short squeeze incoming on {t} target {n} dollars load up now",
+    "insiders are buying {t} heavily next catalyst in {n} days do not miss this",
+]
+
+
+def build_feed(count, seed=0):
+    rng = random.Random(seed)
+    feed = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            template = rng.choice(PUMP_TEMPLATES)
+            feed.append(template.format(t=rng.choice(["abcd", "wxyz", "mnop"]), n=rng.randint(2, 99)))
+        else:
+            feed.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 25))) + f" {rng.randint(0, 10**6)}")
+    return feed
+
+
+class LegacyScan:
+    """The original is_spam loop: compare against every message in the window."""
+
+    def __init__(self, window):
+        self.window = window
+        self.recent = set()
+        self.messages = deque()
+
+    def check_and_add(self, message):
+        for recent in self.messages:
+            if SequenceMatcher(None, message, recent).ratio() > THRESHOLD:
+                return True
+        if message not in self.recent:
+            self.recent.add(message)
+            self.messages.append(message)
+        if len(self.messages) > self.window:
+            self.recent.discard(self.messages.popleft())
+        return False
+
+
+def timed(detector, feed):
+    start = time.perf_counter()
+    flags = [detector.check_and_add(message) for message in feed]
+    return flags, (time.perf_counter() - start) / len(feed) * 1e6
+
+
+def index_memory(messages):
+    feed = [f"{message} {i}" for i, message in enumerate(build_feed(messages, seed=1))]
+    index = NearDuplicateIndex(THRESHOLD, window=messages)
+    tracemalloc.start()
+    for message in feed:
+        index.add(message)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # The feed's own strings are counted outside the trace; the index keeps them alive.
+    used += sum(sys.getsizeof(message) for message in feed)
+    print(f"Index memory: {used / len(index) / 1024:.1f} KB/message over {len(index)} messages "
+          f"(~{used / len(index) * 100_000 / 2**20:.0f} MB per 100k-message window)")
+
+
+def run(messages, windows, scan_limit):
+    feed = build_feed(messages)
+    print(f"{'window':>8} {'scan µs/msg':>12} {'index µs/msg':>13} {'spam found':>11} {'agreement':>10}")
+    for window in windows:
+        index_flags, index_us = timed(NearDuplicateIndex(THRESHOLD, window=window), feed)
+        if window > scan_limit:
+            print(f"{window:>8} {'-':>12} {index_us:>13.0f} {sum(index_flags):>11} {'-':>10}")
+            continue
+        scan_flags, scan_us = timed(LegacyScan(window), feed)
+        agreement = sum(a == b for a, b in zip(scan_flags, index_flags)) / len(feed)
+        print(f"{window:>8} {scan_us:>12.0f} {index_us:>13.0f} {sum(index_flags):>11} {agreement:>10.2%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--windows", type=int, nargs="+", default=[100, 100000])
+    parser.add_argument("--scan-limit", type=int, default=100)
+    parser.add_argument("--memory-messages", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.messages, args.windows, args.scan_limit)
+    index_memory(args.memory_messages)
@@ -0,0 +1,74 @@
+"""
+Benchmark: cold import time of the Discord bot and the scraper.
+
+Each module is imported in a fresh interpreter so nothing is cached between
+runs. Reports the best wall time per module, which heavy dependencies the
+import pulled in, and whether it opened a database connection. With
+--with-model the first FinBERT load (what the bot's background warm-up pays
+after on_ready) is timed as well. With --with-db the first database use
+(pool connect plus schema initialization) is timed; it needs a reachable
+MySQL configured in the environment.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --with-model
+    python benchmarks/bench_startup.py --with-db
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MODULES = ["sentiment_analysis_discord_bot", "sentiment_scraper"]
+HEAVY = ["transformers", "torch", "selenium", "pandas", "textblob", "vaderSentiment", "sentiment_scraper"]
+REPEATS = 3
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module} as target
+imported = time.perf_counter() - start
+model = None
+if {with_model}:
+    start = time.perf_counter()
+    target.get_finbert()
+    model = time.perf_counter() - start
+import db_handler
+db_at_import = db_handler._shared_handler is not None and db_handler._shared_handler.pool is not None
+db = None
+if {with_db}:
+    handler = db_handler.get_database_handler()
+    start = time.perf_counter()
+    handler.ensure_ready()
+    db = time.perf_counter() - start
+print(json.dumps({{"import": imported, "model": model, "db_at_import": db_at_import, "db": db,
+                  "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def probe(module, with_model=False, with_db=False):
+    code = PROBE.format(module=module, with_model=with_model, with_db=with_db, heavy=HEAVY)
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": (result.stderr.strip().splitlines() or ["unknown error"])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run(with_model=False, with_db=False):
+    print(f"{'module':>32} {'import ms':>10} {'model s':>8} {'db@import':>9} {'db ms':>7}  heavy deps loaded")
+    for module in MODULES:
+        runs = [probe(module, with_model and module == MODULES[0], with_db) for _ in range(REPEATS)]
+        if "error" in runs[0]:
+            print(f"{module:>32} {'failed':>10} {'-':>8} {'-':>9} {'-':>7}  {runs[0]['error']}")
+            continue
+        best = min(runs, key=lambda r: r["import"])
+        model = f"{best['model']:.1f}" if best["model"] is not None else "-"
+        db = f"{min(r['db'] for r in runs) * 1000:.0f}" if best["db"] is not None else "-"
+        print(f"{module:>32} {best['import'] * 1000:>10.0f} {model:>8} {'yes' if best['db_at_import'] else 'no':>9} "
+              f"{db:>7}  {', '.join(best['heavy']) or 'none'}")
+
+
+if __name__ == "__main__":
+    run(with_model="--with-model" in sys.argv, with_db="--with-db" in sys.argv)
@@ -0,0 +1,64 @@
+"""
+Benchmark: scalar TextBlob + VADER scoring vs. the vectorized NumPy scorer.
+
+Scores synthetic cleaned Stocktwits messages of increasing batch size and
+reports messages/sec for each path, plus the largest score difference. The
+scalar path is skipped above --scalar-limit messages because it is the slow
+one being replaced.
+
+Usage:
+    python benchmarks/bench_vectorized_scorer.py
+    python benchmarks/bench_vectorized_scorer.py --sizes 10000 1000000 --scalar-limit 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from sentiment_engine import get_engine
+from vectorized_scorer import VectorizedScorer
+
+WORDS = (
+    "TSLA SPY QQQ calls puts bullish bearish moon dump rip squeeze short long buy sell hold "
+    "great terrible strong weak beat miss guidance earnings revenue margins record crash rally "
+    "not never no very really absolutely barely but love hate good bad happy sad risk profit loss "
+    "the a to of and is are this that today tomorrow week 420 69 100 green red"
+).split()
+
+
+def build_corpus(count, seed=0):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 30))) for _ in range(count)]
+
+
+def run(sizes, scalar_limit):
+    engine = get_engine()
+    scorer = VectorizedScorer()
+    print(f"{'messages':>10} {'scalar msg/s':>13} {'vector msg/s':>13} {'speedup':>8} {'max |diff|':>11}")
+    for size in sizes:
+        texts = build_corpus(size)
+        start = time.perf_counter()
+        vectorized = scorer.score(texts)
+        vector_rate = size / (time.perf_counter() - start)
+
+        if size > scalar_limit:
+            print(f"{size:>10} {'-':>13} {vector_rate:>13.0f} {'-':>8} {'-':>11}")
+            continue
+        start = time.perf_counter()
+        scalar = engine.analyze_batch(texts)
+        scalar_rate = size / (time.perf_counter() - start)
+        diff = np.max(np.abs(vectorized.final - np.array(scalar.final))) if size else 0.0
+        print(f"{size:>10} {scalar_rate:>13.0f} {vector_rate:>13.0f} {vector_rate / scalar_rate:>7.1f}x {diff:>11.2e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--scalar-limit", type=int, default=100000)
+    args = parser.parse_args()
+    run(args.sizes, args.scalar_limit)
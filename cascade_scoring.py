@@ -0,0 +1,86 @@
+import logging
+import threading
+import time
+
+from logins.project_config import config
+from sentiment_engine import BEARISH_THRESHOLD, BULLISH_THRESHOLD, BatchScores, analyze_batch
+
+logger = logging.getLogger("CascadeScoring")
+
+# Messages whose blended lexicon score is within CASCADE_BAND of either
+# category threshold (±0.2) are escalated to FinBERT.
+CASCADE_BAND = config.get_env("CASCADE_BAND", 0.1, float)
+
+
+def is_ambiguous(final_score, band=CASCADE_BAND):
+    return abs(final_score - BULLISH_THRESHOLD) <= band or abs(final_score - BEARISH_THRESHOLD) <= band
+
+
+class CascadeScorer:
+    """
+    Two-tier scorer: every text gets the TextBlob/VADER blend, and only texts
+    whose final score falls in the uncertainty band around the thresholds are
+    re-classified by `escalate_fn`.
+
+    `escalate_fn(texts)` returns one (category, confidence) per text, like the
+    bot's classify_batch. Escalated texts keep their lexicon scores and take
+    the escalated category. Concurrent scrapes call `escalate_fn` in
+    parallel, so it must be thread-safe; the bot passes one that queues texts
+    on its FinBERT micro-batcher, which runs the model one batch at a time.
+    """
+
+    def __init__(self, escalate_fn, band=CASCADE_BAND, lexicon_fn=analyze_batch):
+        self.escalate_fn = escalate_fn
+        self.band = band
+        self.lexicon_fn = lexicon_fn
+        self.messages = 0
+        self.escalated = 0
+        self.lexicon_seconds = 0.0
+        self.escalation_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def score(self, texts):
+        """
+        Returns (BatchScores, tiers) where tiers[i] is "lexicon" or "finbert".
+        """
+        start = time.perf_counter()
+        scores = self.lexicon_fn(texts)
+        lexicon_seconds = time.perf_counter() - start
+
+        categories = list(scores.category)
+        tiers = ["lexicon"] * len(texts)
+        ambiguous = [i for i, final in enumerate(scores.final) if is_ambiguous(final, self.band)]
+
+        escalation_seconds = 0.0
+        if ambiguous:
+            start = time.perf_counter()
+            try:
+                results = self.escalate_fn([texts[i] for i in ambiguous])
+            except Exception as e:
+                logger.error(f"❌ Escalation failed for {len(ambiguous)} messages; keeping lexicon scores: {e}")
+                results = None
+            escalation_seconds = time.perf_counter() - start
+            if results is not None:
+                for i, (category, _confidence) in zip(ambiguous, results):
+                    categories[i] = category
+                    tiers[i] = "finbert"
+
+        with self._lock:
+            self.messages += len(texts)
+            self.escalated += tiers.count("finbert")
+            self.lexicon_seconds += lexicon_seconds
+            self.escalation_seconds += escalation_seconds
+
+        return BatchScores(scores.textblob, scores.vader, scores.final, categories), tiers
+
+    def stats(self):
+        """
+        Cumulative escalation rate and per-tier latency (ms per message scored by that tier).
+        """
+        return {
+            "messages": self.messages,
+            "escalated": self.escalated,
+            "escalation_rate": self.escalated / self.messages if self.messages else 0.0,
+            "lexicon_ms_per_msg": self.lexicon_seconds * 1000 / self.messages if self.messages else 0.0,
+            "finbert_ms_per_msg": self.escalation_seconds * 1000 / self.escalated if self.escalated else 0.0,
+        }
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+from webdriver_manager.chrome import ChromeDriverManager
+from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+
+from logins.project_config import config
+
+logger = logging.getLogger("ChromeDriverCache")
+
+CACHE_FILE = Path(config.get_env("CHROMEDRIVER_CACHE_FILE", os.path.join(os.getcwd(), "chromedriver_cache.json")))
+
+_lock = threading.Lock()
+_resolved_path = None
+
+
+def get_chrome_major_version():
+    """
+    Returns the installed Chrome major version (e.g. '124'), or None if it
+    cannot be detected. Detection only probes the local OS, never the network.
+    """
+    try:
+        version = OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not detect Chrome version: {e}")
+        return None
+    if not version:
+        return None
+    return version.split(".")[0]
+
+
+def _read_cache():
+    try:
+        with open(CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(chrome_major, driver_path):
+    try:
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE, "w") as f:
+            json.dump({"chrome_major": chrome_major, "driver_path": driver_path}, f)
+    except OSError as e:
+        logger.warning(f"⚠️ Failed to write chromedriver cache {CACHE_FILE}: {e}")
+
+
+def resolve_chromedriver_path(refresh=False):
+    """
+    Returns the chromedriver binary path, resolving it at most once per process.
+
+    The path is persisted in CACHE_FILE together with the Chrome major version
+    it was installed for, so restarts reuse it without touching the network.
+    ChromeDriverManager().install() only runs when there is no cached driver or
+    the local Chrome major version changed. If that install fails (e.g. offline)
+    a previously cached driver is used instead.
+
+    :param refresh: Skip the in-process result and re-check the Chrome version.
+    """
+    global _resolved_path
+
+    with _lock:
+        if _resolved_path and not refresh:
+            return _resolved_path
+
+        chrome_major = get_chrome_major_version()
+        cached = _read_cache()
+        cached_path = cached.get("driver_path")
+        cached_usable = bool(cached_path) and os.path.exists(cached_path)
+
+        if cached_usable and (chrome_major is None or cached.get("chrome_major") == chrome_major):
+            _resolved_path = cached_path
+            return _resolved_path
+
+        try:
+            driver_path = ChromeDriverManager().install()
+        except Exception as e:
+            if not cached_usable:
+                logger.error(f"❌ Failed to install chromedriver: {e}")
+                raise
+            logger.warning(f"⚠️ chromedriver install failed ({e}); using cached driver {cached_path}.")
+            _resolved_path = cached_path
+            return _resolved_path
+
+        logger.info(f"✅ Resolved chromedriver for Chrome {chrome_major}: {driver_path}")
+        _write_cache(chrome_major, driver_path)
+        _resolved_path = driver_path
+        return _resolved_path
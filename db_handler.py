@@ -1,54 +1,252 @@
+import hashlib
+import itertools
 import mysql.connector
+from mysql.connector import pooling
 import logging
 import os
+import re
 import sys
+import threading
+import time
+from contextlib import contextmanager
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from logins.project_config import config
 
- 
+# Connection pool shared by the scraper's worker threads and the bot.
+DB_POOL_SIZE = config.get_env("DB_POOL_SIZE", 5, int)
+DB_POOL_TIMEOUT = config.get_env("DB_POOL_TIMEOUT", 30, float)  # max wait for a free connection (s)
+DB_RECONNECT_ATTEMPTS = config.get_env("DB_RECONNECT_ATTEMPTS", 5, int)
+DB_RECONNECT_BACKOFF = config.get_env("DB_RECONNECT_BACKOFF", 0.5, float)  # first retry delay, doubled each time
+
+# "MySQL server has gone away", "Lost connection during query", "Lost connection to server"
+CONNECTION_LOST_ERRNOS = {2006, 2013, 2055}
+
+_pool_ids = itertools.count(1)
+
+# Characters dropped from content before hashing it into a message_key.
+_KEY_STRIP_PATTERN = re.compile(r"[^0-9A-Za-z]")
+
+# Schema initialization runs once per process for each database, however many
+# handlers are created.
+_schema_lock = threading.Lock()
+_initialized_schemas = set()
+
+_shared_handler = None
+_shared_handler_lock = threading.Lock()
+
+
+def message_key(ticker, timestamp, content):
+    """
+    Stable identity for a scraped message: a SHA-1 of ticker, timestamp and
+    content with everything but letters and digits removed. Pass the timestamp
+    as stored ('YYYY-MM-DD HH:MM:SS').
+
+    The browser, HTML and JSON paths join a message's text nodes with
+    different whitespace, and rows stored before keys existed have no
+    Stocktwits ID, so neither the ID nor the raw text would give the same key
+    on every path. migrate_message_key computes the same key in SQL.
+    """
+    normalized = _KEY_STRIP_PATTERN.sub("", content)
+    digest = hashlib.sha1(f"{ticker}|{timestamp}|{normalized}".encode("utf-8")).hexdigest()
+    return f"h:{digest}"
+
 
 class DatabaseHandler:
     """
     Handles database operations for storing sentiment data.
     Supports MySQL as the backend.
+
+    Nothing connects at construction: the pool is opened and the schema
+    initialized on the first operation (or an explicit ensure_ready()).
+    Each operation checks a connection out of a mysql.connector pool and
+    returns it afterwards, so one handler can be shared across threads.
+    Dropped connections are re-established with exponential backoff, and an
+    operation interrupted by a lost connection is retried once on a fresh one.
     """
 
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, pool_size=DB_POOL_SIZE, pool_timeout=DB_POOL_TIMEOUT,
+                 reconnect_attempts=DB_RECONNECT_ATTEMPTS, reconnect_backoff=DB_RECONNECT_BACKOFF):
         self.logger = logger
         self.db_type = config.get_env("DB_TYPE", "mysql").lower()
 
         if self.db_type != "mysql":
             raise ValueError("❌ Unsupported database type. Only MySQL is supported.")
 
+        self.pool_size = pool_size
+        self.pool_timeout = pool_timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.reconnect_backoff = reconnect_backoff
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._in_use = 0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+        self._retries = 0
+        self.pool = None
+        self._pool_lock = threading.Lock()
+        self._ready = False
+        self.connect_seconds = None
+        self.schema_seconds = None
+
         self.logger.info(f"✅ Initializing DatabaseHandler for {self.db_type}")
-        self.conn = self.get_connection()
-        self.cursor = self.conn.cursor()
-        # Expose table initialization publicly:
-        self.initialize_table()
 
-    def get_connection(self):
-        """Establishes a new database connection."""
+    def _schema_target(self):
+        return (
+            config.get_env("MYSQL_DB_HOST", "localhost"),
+            config.get_env("MYSQL_DB_PORT", 3306, int),
+            config.get_env("MYSQL_DB_NAME"),
+        )
+
+    def _get_pool(self):
+        if self.pool is None:
+            with self._pool_lock:
+                if self.pool is None:
+                    start = time.perf_counter()
+                    self.pool = self.create_pool()
+                    self.connect_seconds = time.perf_counter() - start
+        return self.pool
+
+    def ensure_ready(self):
+        """
+        Opens the pool and initializes the schema if this is the first use.
+        Cheap once the handler is ready.
+        """
+        if self._ready:
+            return
+        with _schema_lock:
+            if self._ready:
+                return
+            target = self._schema_target()
+            if target not in _initialized_schemas:
+                start = time.perf_counter()
+                self.initialize_table()
+                self.schema_seconds = time.perf_counter() - start
+                _initialized_schemas.add(target)
+            self._get_pool()
+            self._ready = True
+        connect_ms = self.connect_seconds * 1000 if self.connect_seconds is not None else 0.0
+        schema_ms = self.schema_seconds * 1000 if self.schema_seconds is not None else 0.0
+        self.logger.info(
+            f"⏱️ Database ready in {connect_ms + schema_ms:.0f} ms "
+            f"(connect {connect_ms:.0f} ms, schema {schema_ms:.0f} ms)."
+        )
+
+    def create_pool(self):
+        """Opens the connection pool."""
         try:
-            conn = mysql.connector.connect(
+            pool = pooling.MySQLConnectionPool(
+                pool_name=f"sentiment_db_{next(_pool_ids)}",
+                pool_size=self.pool_size,
                 database=config.get_env("MYSQL_DB_NAME"),
                 user=config.get_env("MYSQL_DB_USER"),
                 password=config.get_env("MYSQL_DB_PASSWORD"),
                 host=config.get_env("MYSQL_DB_HOST", "localhost"),
                 port=config.get_env("MYSQL_DB_PORT", 3306, int)
             )
-            self.logger.info("✅ Database connection established.")
-            return conn
+            self.logger.info(f"✅ Database connection pool established ({self.pool_size} connections).")
+            return pool
         except Exception as e:
             self.logger.error(f"❌ Failed to connect to MySQL: {e}")
             raise
 
+    def _checkout(self):
+        """Gets a live pooled connection, retrying with exponential backoff."""
+        delay = self.reconnect_backoff
+        for attempt in range(1, self.reconnect_attempts + 1):
+            try:
+                # The pool pings the connection and reconnects it if it was dropped.
+                return self._get_pool().get_connection()
+            except mysql.connector.Error as e:
+                if attempt == self.reconnect_attempts:
+                    self.logger.error(f"❌ MySQL unavailable after {attempt} attempts: {e}")
+                    raise
+                with self._stats_lock:
+                    self._retries += 1
+                self.logger.warning(f"⚠️ MySQL connection attempt {attempt} failed: {e}; retrying in {delay:.1f}s.")
+                time.sleep(delay)
+                delay *= 2
+
+    @contextmanager
+    def connection(self):
+        """
+        Checks a connection out of the pool for the duration of the block.
+        Waits up to `pool_timeout` seconds when every connection is in use.
+        """
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            raise TimeoutError(f"No database connection free within {self.pool_timeout}s.")
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self._checkouts += 1
+            self._in_use += 1
+            self._wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+        try:
+            conn = self._checkout()
+            try:
+                yield conn
+            finally:
+                conn.close()  # returns it to the pool
+        finally:
+            with self._stats_lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    def _run(self, operation):
+        """
+        Runs operation(conn, cursor) on a pooled connection, rolling back on
+        errors and retrying once if the connection was lost mid-operation.
+        """
+        for attempt in (1, 2):
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    return operation(conn, cursor)
+                except mysql.connector.Error as e:
+                    self._rollback(conn)
+                    if attempt == 1 and e.errno in CONNECTION_LOST_ERRNOS:
+                        with self._stats_lock:
+                            self._retries += 1
+                        self.logger.warning(f"⚠️ Lost MySQL connection ({e}); retrying on a fresh connection.")
+                        continue
+                    raise
+                except Exception:
+                    self._rollback(conn)
+                    raise
+                finally:
+                    cursor.close()
+
+    def _rollback(self, conn):
+        try:
+            conn.rollback()
+        except Exception:
+            pass
+
+    def stats(self):
+        """
+        Pool size, connections in use, checkout wait times, connection retries,
+        and the cold-start cost (None until connected / initialized here).
+        """
+        with self._stats_lock:
+            return {
+                "connected": self.pool is not None,
+                "connect_ms": self.connect_seconds * 1000 if self.connect_seconds is not None else None,
+                "schema_init_ms": self.schema_seconds * 1000 if self.schema_seconds is not None else None,
+                "pool_size": self.pool_size,
+                "in_use": self._in_use,
+                "checkouts": self._checkouts,
+                "avg_wait_ms": self._wait_seconds * 1000 / self._checkouts if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait_seconds * 1000,
+                "retries": self._retries,
+            }
+
     def close_connection(self):
-        """Closes the database connection."""
-        if self.cursor:
-            self.cursor.close()
-        if self.conn:
-            self.conn.close()
+        """Closes the idle pooled connections."""
+        if self.pool is None:
+            return
+        self.pool._remove_connections()
         self.logger.info("✅ Database connection closed.")
 
     def initialize_table(self):
@@ -61,46 +259,111 @@ class DatabaseHandler:
             content TEXT,
             textblob_sentiment FLOAT,
             vader_sentiment FLOAT,
-            sentiment_category VARCHAR(20)
+            sentiment_category VARCHAR(20),
+            message_key VARCHAR(64) NULL,
+            UNIQUE KEY uq_sentiment_message_key (message_key)
         );
         """
+        def initialize(conn, cursor):
+            cursor.execute(query)
+            conn.commit()
+            self.migrate_message_key(conn, cursor)
+
         try:
-            self.cursor.execute(query)
-            self.conn.commit()
+            self._run(initialize)
             self.logger.info("✅ SentimentData table initialized successfully.")
         except Exception as e:
             self.logger.error(f"❌ Error initializing SentimentData table: {e}")
             raise
 
+    def migrate_message_key(self, conn, cursor):
+        """
+        Adds the message_key column and its unique key to tables created before
+        ingestion was deduplicated, and backfills hashed keys for existing rows.
+        Rows that duplicate an earlier row keep a NULL key.
+        """
+        cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'SentimentData' AND COLUMN_NAME = 'message_key';
+        """)
+        row = cursor.fetchone()
+        if row and row[0]:
+            return
+        cursor.execute("""
+        ALTER TABLE SentimentData
+            ADD COLUMN message_key VARCHAR(64) NULL,
+            ADD UNIQUE KEY uq_sentiment_message_key (message_key);
+        """)
+        # Same format as message_key(): 'h:' + sha1(ticker|YYYY-MM-DD HH:MM:SS|letters and digits of content).
+        # REGEXP_REPLACE needs MySQL 8.0+ or MariaDB 10.0.5+.
+        cursor.execute("""
+        UPDATE IGNORE SentimentData
+        SET message_key = CONCAT('h:', SHA1(CONCAT(
+            ticker, '|', DATE_FORMAT(timestamp, '%Y-%m-%d %H:%i:%s'), '|', REGEXP_REPLACE(content, '[^0-9A-Za-z]', '')
+        )))
+        WHERE message_key IS NULL
+        ORDER BY id;
+        """)
+        conn.commit()
+        self.logger.info(f"✅ Added message_key to SentimentData; backfilled {cursor.rowcount} rows.")
+
     def bulk_insert_sentiment(self, data):
-        """Inserts multiple sentiment records in a batch transaction."""
+        """
+        Inserts multiple sentiment records in a batch transaction.
+        Each record is (ticker, timestamp, content, textblob, vader, category, message_key);
+        records whose message_key is already stored are skipped.
+        Returns {"inserted": new rows, "duplicates": skipped rows}.
+        """
+        # The no-op update leaves duplicates with 0 affected rows (the connector
+        # does not set CLIENT_FOUND_ROWS), so rowcount is the number of new rows.
+        # Unlike INSERT IGNORE, other errors still raise.
         query = """
-        INSERT INTO SentimentData (ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category)
-        VALUES (%s, %s, %s, %s, %s, %s);
+        INSERT INTO SentimentData
+            (ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category, message_key)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE id = id;
         """
+        def insert(conn, cursor):
+            cursor.executemany(query, data)
+            conn.commit()
+            return max(cursor.rowcount, 0)
+
         try:
-            self.cursor.executemany(query, data)
-            self.conn.commit()
-            self.logger.info(f"✅ Bulk insert successful. Inserted {len(data)} records.")
+            self.ensure_ready()
+            inserted = self._run(insert)
+            result = {"inserted": inserted, "duplicates": len(data) - inserted}
+            self.logger.info(
+                f"✅ Bulk insert successful. Inserted {result['inserted']} new records, "
+                f"skipped {result['duplicates']} duplicates."
+            )
+            return result
         except Exception as e:
-            self.conn.rollback()
             self.logger.error(f"⚠️ Database bulk insert failed: {e}")
             raise
 
     def save_sentiment(self, ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category):
         """
-        Saves a single sentiment data point into the database.
+        Saves a single sentiment data point into the database, unless the same
+        message (see message_key) is already stored.
         """
         query = """
-        INSERT INTO SentimentData (ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category)
-        VALUES (%s, %s, %s, %s, %s, %s);
+        INSERT INTO SentimentData
+            (ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category, message_key)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE id = id;
         """
+        key = message_key(ticker, timestamp, content)
+
+        def save(conn, cursor):
+            cursor.execute(query, (ticker, timestamp, content, textblob_sentiment, vader_sentiment,
+                                   sentiment_category, key))
+            conn.commit()
+
         try:
-            self.cursor.execute(query, (ticker, timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category))
-            self.conn.commit()
+            self.ensure_ready()
+            self._run(save)
             self.logger.info(f"✅ Saved sentiment data for {ticker}.")
         except Exception as e:
-            self.conn.rollback()
             self.logger.error(f"⚠️ Error saving sentiment data: {e}")
             raise
 
@@ -115,9 +378,13 @@ class DatabaseHandler:
         SELECT timestamp, content, textblob_sentiment, vader_sentiment, sentiment_category
         FROM SentimentData WHERE ticker = %s ORDER BY timestamp DESC LIMIT %s;
         """
+        def fetch(conn, cursor):
+            cursor.execute(query, (ticker, limit))
+            return cursor.fetchall()
+
         try:
-            self.cursor.execute(query, (ticker, limit))
-            rows = self.cursor.fetchall()
+            self.ensure_ready()
+            rows = self._run(fetch)
             sentiment_data = []
             for row in rows:
                 sentiment_data.append({
@@ -131,3 +398,16 @@ class DatabaseHandler:
         except Exception as e:
             self.logger.error(f"⚠️ Error fetching sentiment data: {e}")
             return []
+
+
+def get_database_handler(logger=None):
+    """
+    Returns the process-wide DatabaseHandler shared by the scraper, the bot
+    and the beta verifier. Creating it does not touch MySQL.
+    """
+    global _shared_handler
+    if _shared_handler is None:
+        with _shared_handler_lock:
+            if _shared_handler is None:
+                _shared_handler = DatabaseHandler(logger or logging.getLogger("DatabaseHandler"))
+    return _shared_handler
@@ -0,0 +1,78 @@
+import logging
+
+logger = logging.getLogger("FinBertBackends")
+
+FINBERT_MODEL = "ProsusAI/finbert"
+
+# "pytorch": stock full-precision pipeline.
+# "int8":    PyTorch dynamic quantization of the Linear layers (CPU only).
+# "onnx":    ONNX Runtime graph exported on load; needs `pip install optimum[onnxruntime]`.
+BACKENDS = ("pytorch", "int8", "onnx")
+
+# Short finance texts covering all three labels, used for parity checks.
+PARITY_TEXTS = [
+    "Revenue beat expectations and guidance was raised for the full year.",
+    "Shares plunged after the company missed earnings and cut its dividend.",
+    "The board will meet on Tuesday to discuss the quarterly results.",
+    "$TSLA breaking out to new highs, loading up on calls",
+    "Bankruptcy risk is rising as debt covenants are breached.",
+    "Management reiterated its outlook for the second half.",
+    "Strong demand pushed margins to a record level.",
+    "Analysts downgraded the stock to sell on weak subscriber growth.",
+    "Trading volume was in line with the 30-day average.",
+    "Huge short squeeze incoming, this is going parabolic",
+    "Layoffs announced as sales continue to decline.",
+    "The company will report earnings after the close.",
+]
+
+
+def _load_tokenizer_and_model(model_name):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    return AutoTokenizer.from_pretrained(model_name), AutoModelForSequenceClassification.from_pretrained(model_name)
+
+
+def build_finbert_pipeline(backend="pytorch", model_name=FINBERT_MODEL):
+    """
+    Returns a transformers text-classification pipeline for FinBERT running on
+    the requested CPU backend. All backends take and return the same shapes
+    as the stock pipeline, so callers can swap them freely.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown FinBERT backend {backend!r}; expected one of {', '.join(BACKENDS)}.")
+
+    from transformers import pipeline
+
+    if backend == "pytorch":
+        return pipeline("text-classification", model=model_name)
+
+    if backend == "int8":
+        import torch
+        tokenizer, model = _load_tokenizer_and_model(model_name)
+        model.eval()
+        quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return pipeline("text-classification", model=quantized, tokenizer=tokenizer)
+
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+    except ImportError as e:
+        raise ImportError("The onnx FinBERT backend needs `pip install optimum[onnxruntime]`.") from e
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+    return pipeline("text-classification", model=model, tokenizer=tokenizer)
+
+
+def check_parity(reference, candidate, texts=PARITY_TEXTS):
+    """
+    Compares the labels two pipelines assign to `texts`.
+    Returns {"agreement": fraction of matching labels, "mismatches": [(text, ref, cand), ...]}.
+    """
+    ref_labels = [result["label"].lower() for result in reference(list(texts), truncation=True)]
+    cand_labels = [result["label"].lower() for result in candidate(list(texts), truncation=True)]
+    mismatches = [
+        (text, ref, cand) for text, ref, cand in zip(texts, ref_labels, cand_labels) if ref != cand
+    ]
+    return {
+        "agreement": 1 - len(mismatches) / len(texts) if texts else 1.0,
+        "mismatches": mismatches,
+    }
@@ -0,0 +1,114 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-text classification requests into batches.
+
+    Callers await `submit(text)`. A single worker task collects queued
+    requests until `max_batch_size` are waiting or the oldest has waited
+    `max_latency_ms`, then runs `batch_fn(texts)` on the batcher's own
+    worker thread, so inference never blocks the event loop and never
+    waits for a slot in the loop's default executor (where callers may be
+    blocked on this batcher). `batch_fn` must return one result per text,
+    in order; each result (or the batch's exception) is delivered to its
+    caller's future. Requests that arrive while a batch is running are
+    picked up by the next batch without waiting for the latency window.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=16, max_latency_ms=25, logger=None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000
+        self.logger = logger or logging.getLogger("MicroBatcher")
+        self.batches = 0
+        self.items = 0
+        self._queue = None
+        self._worker = None
+        self._executor = None
+        self._inflight = []
+
+    def _ensure_worker(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="finbert-batch")
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, text):
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        batch = self._inflight = [await self._queue.get()]
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [(text, future) for text, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            self._inflight = batch
+            texts = [text for text, _ in batch]
+            start = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self._executor, self.batch_fn, texts)
+                if len(results) != len(texts):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(texts)} texts")
+            except Exception as e:
+                self.logger.error(f"❌ Batch classification failed for {len(texts)} texts: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                self._inflight = []
+                continue
+
+            self.batches += 1
+            self.items += len(texts)
+            self.logger.debug(f"Classified batch of {len(texts)} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+            self._inflight = []
+
+    async def close(self):
+        """
+        Stops the worker and its thread and fails any requests still queued
+        or in flight.
+        """
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        pending = list(self._inflight)
+        self._inflight = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("MicroBatcher closed"))
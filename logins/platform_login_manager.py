@@ -15,6 +15,7 @@ Supported Platforms:
 """
 
 import os
+import sys
 import time
 import pickle
 from selenium import webdriver
@@ -22,9 +23,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
 
+# Shared chromedriver resolver lives at the project root.
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from chromedriver_cache import resolve_chromedriver_path
+
 # Load environment variables if needed (credentials, etc.)
 load_dotenv()
 
@@ -77,7 +81,7 @@ def get_driver(profile_path: str = None):
         profile_path = config.get_env("CHROME_PROFILE_PATH", os.path.join(os.getcwd(), "chrome_profile"))
     options.add_argument(f"--user-data-dir={profile_path}")
     
-    service = Service(ChromeDriverManager().install())
+    service = Service(resolve_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
     logger.info("Chrome driver initialized with profile: %s", profile_path)
     return driver
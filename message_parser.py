@@ -0,0 +1,90 @@
+import re
+
+from lxml import etree
+
+# Stocktwits renders message bodies as <div class="RichTextMessage_body__<hash>">;
+# the hash suffix changes between site builds.
+MESSAGE_BODY_CLASS_PREFIX = "RichTextMessage_body__"
+
+# A message's <time> sits inside its permalink, <a href="/<ticker>/message/<id>">.
+MESSAGE_ID_PATTERN = re.compile(r"/message/(\d+)")
+
+
+class _MessageStreamTarget:
+    """
+    lxml parser target that pairs each message body with the closest preceding
+    <time> element in a single forward pass, without building a tree. The
+    message ID comes from the message permalink enclosing that <time>, like
+    the in-browser extraction script.
+
+    Text inside a body is collected the way BeautifulSoup's
+    get_text(strip=True) does: each text node is stripped and the pieces are
+    joined without a separator.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self._last_timestamp = None
+        self._last_message_id = None
+        self._anchor_ids = []
+        self._depth = 0
+        self._parts = []
+        self._buffer = []
+
+    def _flush_text(self):
+        text = "".join(self._buffer).strip()
+        if text:
+            self._parts.append(text)
+        self._buffer = []
+
+    def start(self, tag, attrib):
+        if self._depth:
+            self._flush_text()
+            self._depth += 1
+        elif tag == "a":
+            match = MESSAGE_ID_PATTERN.search(attrib.get("href", ""))
+            self._anchor_ids.append(match.group(1) if match else None)
+        elif tag == "time":
+            self._last_timestamp = attrib.get("datetime")
+            self._last_message_id = next((i for i in reversed(self._anchor_ids) if i), None)
+        elif tag == "div" and any(
+            cls.startswith(MESSAGE_BODY_CLASS_PREFIX) for cls in attrib.get("class", "").split()
+        ):
+            self._depth = 1
+            self._parts = []
+            self._buffer = []
+
+    def end(self, tag):
+        if not self._depth:
+            if tag == "a" and self._anchor_ids:
+                self._anchor_ids.pop()
+            return
+        self._flush_text()
+        self._depth -= 1
+        if self._depth == 0:
+            self.rows.append({
+                "timestamp": self._last_timestamp,
+                "content": "".join(self._parts),
+                "message_id": self._last_message_id,
+            })
+
+    def data(self, data):
+        if self._depth:
+            self._buffer.append(data)
+
+    def close(self):
+        return self.rows
+
+
+def parse_messages_html(html_content):
+    """
+    Parse Stocktwits HTML into [{"timestamp", "content", "message_id"}] rows in
+    document order. Runs in time linear in the page size; rows may have an
+    empty content or a None timestamp and are left for the caller to filter,
+    and message_id is None when the <time> has no message permalink.
+    """
+    if not html_content or not html_content.strip():
+        return []
+    parser = etree.HTMLParser(target=_MessageStreamTarget())
+    parser.feed(html_content)
+    return parser.close()
@@ -0,0 +1,133 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger("ScoreCache")
+
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """
+    Memoizes sentiment scores by a hash of the cleaned text.
+
+    A bounded in-memory LRU sits in front of an optional sqlite file that
+    survives restarts. The disk tier records the scoring `signature` it was
+    filled under and is wiped when opened with a different one, so changing
+    weights or model versions never serves stale scores.
+    """
+
+    def __init__(self, signature, max_entries=50000, path=None):
+        self.signature = signature
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = self._open_disk() if self.path else None
+
+    def _open_disk(self):
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "key TEXT PRIMARY KEY, textblob REAL, vader REAL, final REAL, category TEXT)"
+            )
+            row = conn.execute("SELECT value FROM meta WHERE name = 'signature'").fetchone()
+            if row is None or row[0] != self.signature:
+                if row is not None:
+                    logger.info("♻️ Scoring signature changed; clearing on-disk score cache.")
+                conn.execute("DELETE FROM scores")
+                conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('signature', ?)", (self.signature,))
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Score cache disk tier unavailable ({self.path}): {e}")
+            return None
+
+    def _remember(self, key, scores):
+        self._memory[key] = scores
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get_many(self, keys):
+        """
+        Returns {key: (textblob, vader, final, category)} for the cached keys.
+        """
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+                else:
+                    missing.append(key)
+
+            if missing and self._conn is not None:
+                for start in range(0, len(missing), 500):
+                    chunk = missing[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT key, textblob, vader, final, category FROM scores "
+                        f"WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                    ).fetchall()
+                    for key, *scores in rows:
+                        found[key] = tuple(scores)
+                        self._remember(key, tuple(scores))
+                        self.disk_hits += 1
+
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        Stores {key: (textblob, vader, final, category)} in both tiers.
+        """
+        if not items:
+            return
+        with self._lock:
+            for key, scores in items.items():
+                self._remember(key, tuple(scores))
+            if self._conn is not None:
+                try:
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO scores (key, textblob, vader, final, category) VALUES (?, ?, ?, ?, ?)",
+                        [(key, *scores) for key, scores in items.items()]
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Failed to write score cache: {e}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._memory),
+        }
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM scores")
+                self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
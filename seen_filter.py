@@ -0,0 +1,235 @@
+import hashlib
+import logging
+import math
+import mmap
+import shutil
+import struct
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger("SeenFilter")
+
+# magic, capacity, num_bits, num_hashes, error_rate, created (epoch seconds), count
+_HEADER = struct.Struct("<8sQQIddQ")
+_MAGIC = b"STBLOOM1"
+_COUNT_OFFSET = _HEADER.size - 8
+
+
+def _hash_pair(key):
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class BloomFilter:
+    """
+    Fixed-capacity Bloom filter whose header and bit array live in a
+    memory-mapped file, so opening it costs no reads and every add is
+    persisted by the OS page cache without an explicit save.
+    """
+
+    def __init__(self, path, capacity=None, error_rate=None):
+        self.path = Path(path)
+        if not self.path.exists():
+            self._create(capacity, error_rate)
+        self._file = open(self.path, "r+b")
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        magic, self.capacity, self.num_bits, self.num_hashes, self.error_rate, self.created, _ = (
+            _HEADER.unpack_from(self._mm, 0)
+        )
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a Bloom filter file.")
+
+    def _create(self, capacity, error_rate):
+        if not capacity or not error_rate:
+            raise ValueError("capacity and error_rate are required to create a Bloom filter.")
+        num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, capacity, num_bits, num_hashes, error_rate, time.time(), 0))
+            f.truncate(_HEADER.size + (num_bits + 7) // 8)
+        tmp_path.replace(self.path)
+
+    @property
+    def count(self):
+        return struct.unpack_from("<Q", self._mm, _COUNT_OFFSET)[0]
+
+    @property
+    def is_full(self):
+        return self.count >= self.capacity
+
+    def _positions(self, key):
+        h1, h2 = _hash_pair(key)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, key):
+        mm = self._mm
+        base = _HEADER.size
+        return all(mm[base + (bit >> 3)] & (1 << (bit & 7)) for bit in self._positions(key))
+
+    def add(self, key):
+        """Sets the key's bits. Returns True if the key was not already present."""
+        mm = self._mm
+        base = _HEADER.size
+        added = False
+        for bit in self._positions(key):
+            byte = base + (bit >> 3)
+            mask = 1 << (bit & 7)
+            if not mm[byte] & mask:
+                mm[byte] |= mask
+                added = True
+        if added:
+            struct.pack_into("<Q", mm, _COUNT_OFFSET, self.count + 1)
+        return added
+
+    def flush(self):
+        self._mm.flush()
+
+    def close(self):
+        if not self._mm.closed:
+            self._mm.close()
+        self._file.close()
+
+
+class ScalableBloomFilter:
+    """
+    Grows by appending Bloom filter slices as earlier ones fill up. Slice i
+    holds capacity * growth**i keys at error_rate * tightening**(i + 1), so
+    the overall false-positive rate stays under `error_rate` however many
+    keys are added. Slices are files in `directory`.
+    """
+
+    def __init__(self, directory, capacity=100_000, error_rate=0.001, growth=2, tightening=0.5):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.slices = [BloomFilter(path) for path in sorted(self.directory.glob("slice_*.bloom"))]
+        if not self.slices:
+            self._add_slice()
+
+    @property
+    def created(self):
+        return self.slices[0].created
+
+    def __len__(self):
+        return sum(s.count for s in self.slices)
+
+    def _add_slice(self):
+        i = len(self.slices)
+        self.slices.append(BloomFilter(
+            self.directory / f"slice_{i:03d}.bloom",
+            capacity=self.capacity * self.growth ** i,
+            error_rate=self.error_rate * self.tightening ** (i + 1),
+        ))
+
+    def __contains__(self, key):
+        return any(key in s for s in self.slices)
+
+    def add(self, key):
+        """Adds the key to the newest slice. Returns True if it was not already present."""
+        if key in self:
+            return False
+        if self.slices[-1].is_full:
+            self._add_slice()
+        return self.slices[-1].add(key)
+
+    def flush(self):
+        for s in self.slices:
+            s.flush()
+
+    def close(self):
+        for s in self.slices:
+            s.close()
+
+
+class SeenFilter:
+    """
+    Disk-backed, per-ticker set of message keys already ingested, used to
+    skip re-scoring after restarts. Membership is probabilistic: an unseen
+    message is wrongly skipped with probability under `error_rate`, and a
+    seen message is never reported unseen while its generation is kept.
+
+    Each ticker keeps two generations of ScalableBloomFilter under
+    directory/<ticker>/. The current generation is retired after
+    `rotate_hours`, so keys are remembered for between one and two rotation
+    periods and the files never grow without bound.
+    """
+
+    def __init__(self, directory, capacity=100_000, error_rate=0.001, rotate_hours=168):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.rotate_seconds = rotate_hours * 3600
+        self.checked = 0
+        self.skipped = 0
+        self.added = 0
+        self.skipped_by_ticker = {}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def _open_generation(self, path):
+        return ScalableBloomFilter(path, self.capacity, self.error_rate)
+
+    def _load(self, ticker):
+        ticker_dir = self.directory / ticker
+        paths = sorted(ticker_dir.glob("gen_*"), key=lambda p: int(p.name[4:])) if ticker_dir.exists() else []
+        for stale in paths[:-2]:
+            shutil.rmtree(stale, ignore_errors=True)
+        generations = [self._open_generation(path) for path in paths[-2:]]
+        if not generations:
+            generations.append(self._open_generation(ticker_dir / f"gen_{int(time.time() * 1000)}"))
+        return generations
+
+    def _generations_for(self, ticker):
+        """Returns [previous, current] (or [current]), rotating if the current one expired."""
+        generations = self._generations.get(ticker)
+        if generations is None:
+            generations = self._generations[ticker] = self._load(ticker)
+        if time.time() - generations[-1].created >= self.rotate_seconds:
+            if len(generations) == 2:
+                retired = generations.pop(0)
+                retired.close()
+                shutil.rmtree(retired.directory, ignore_errors=True)
+            generations.append(self._open_generation(self.directory / ticker / f"gen_{int(time.time() * 1000)}"))
+            logger.info(f"🔄 Rotated seen-message filter for {ticker}.")
+        return generations
+
+    def filter_unseen(self, ticker, items, key_fn):
+        """Returns the items whose key_fn(item) has not been marked seen for `ticker`."""
+        with self._lock:
+            generations = self._generations_for(ticker)
+            unseen = [item for item in items if not any(key_fn(item) in g for g in generations)]
+            skipped = len(items) - len(unseen)
+            self.checked += len(items)
+            self.skipped += skipped
+            self.skipped_by_ticker[ticker] = self.skipped_by_ticker.get(ticker, 0) + skipped
+        return unseen
+
+    def mark_seen(self, ticker, keys):
+        """Records `keys` as ingested for `ticker`."""
+        with self._lock:
+            current = self._generations_for(ticker)[-1]
+            self.added += sum(current.add(key) for key in keys)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "skipped": self.skipped,
+                "added": self.added,
+                "skip_rate": self.skipped / self.checked if self.checked else 0.0,
+                "skipped_by_ticker": dict(self.skipped_by_ticker),
+            }
+
+    def close(self):
+        with self._lock:
+            for generations in self._generations.values():
+                for generation in generations:
+                    generation.flush()
+                    generation.close()
+            self._generations.clear()
@@ -1,22 +1,35 @@
 # D:\SocialMediaManager\sentiment_analysis_discord_bot.py
 
+import time
+_IMPORT_STARTED = time.perf_counter()
+
 import os
 import sys
 import asyncio
+import concurrent.futures
 import glob
-import pandas as pd
 import logging
+import threading
 from datetime import datetime, timedelta
 
 import discord
 from discord.ext import commands
-from transformers import pipeline  # Using FinBERT for sentiment analysis
-from sentiment_scraper import run_multi_ticker_scraper
+from finbert_batcher import MicroBatcher
+from finbert_backends import FINBERT_MODEL, build_finbert_pipeline
+
+# Heavy dependencies (transformers/FinBERT, the Selenium scraper stack, pandas)
+# are imported on first use so bot startup and test imports stay fast.
 
 # Import the configuration class and create an instance.
 from logins.project_config import Config
 config = Config()
 
+# ------------------ Logging Setup ------------------
+from logins.setup_logging import setup_logging
+console_level = logging.WARNING  # Show only warnings/errors/critical to console
+logger = setup_logging("DiscordBot", log_dir=config.LOG_DIR, console_log_level=console_level)
+logger.info("Logger initialized (file logs are verbose, console logs are WARNING and above).")
+
 # Load environment variables explicitly.
 def load_discord_credentials():
     """
@@ -48,22 +61,47 @@ except ValueError as e:
     # Optionally, re-raise the error if it's critical to stop execution
     raise e
 
-
-# ------------------ Logging Setup ------------------
-from logins.setup_logging import setup_logging
-console_level = logging.WARNING  # Show only warnings/errors/critical to console
-logger = setup_logging("DiscordBot", log_dir=config.LOG_DIR, console_log_level=console_level)
-logger.info("Logger initialized (file logs are verbose, console logs are WARNING and above).")
-
 # ------------------ Discord Bot & Sentiment Analysis ------------------
 intents = discord.Intents.default()
 bot = commands.Bot(command_prefix="!", intents=intents)
 
-# Load FinBERT sentiment model
-finbert = pipeline("text-classification", model="ProsusAI/finbert")
+# FinBERT sentiment model, loaded by get_finbert() on first use. With
+# FINBERT_WARMUP enabled it is loaded in the background once the bot is ready.
+# FINBERT_BACKEND picks the CPU inference backend: pytorch, int8 or onnx.
+FINBERT_BACKEND = config.get_env("FINBERT_BACKEND", "pytorch").lower()
+# With CASCADE_SCORING enabled the scraper escalates ambiguous messages to FinBERT.
+CASCADE_SCORING = config.get_env("CASCADE_SCORING", "false").lower() == "true"
+FINBERT_WARMUP = config.get_env("FINBERT_WARMUP", "true").lower() == "true"
+_finbert = None
+_finbert_lock = threading.Lock()
 
-def classify_sentiment(text: str):
-    result = finbert(text[:512])
+def get_finbert():
+    """Returns the shared FinBERT pipeline, loading it on the first call."""
+    global _finbert
+    if _finbert is None:
+        with _finbert_lock:
+            if _finbert is None:
+                start = time.perf_counter()
+                try:
+                    _finbert = build_finbert_pipeline(FINBERT_BACKEND, FINBERT_MODEL)
+                except Exception as e:
+                    if FINBERT_BACKEND == "pytorch":
+                        raise
+                    logger.error(f"❌ FinBERT {FINBERT_BACKEND} backend failed to load, using pytorch: {e}")
+                    _finbert = build_finbert_pipeline("pytorch", FINBERT_MODEL)
+                logger.info(f"🧠 FinBERT ({FINBERT_BACKEND}) loaded in {time.perf_counter() - start:.1f}s.")
+    return _finbert
+
+# FinBERT micro-batching: concurrent classify requests are flushed as one
+# padded batch once FINBERT_BATCH_SIZE are queued or the oldest has waited
+# FINBERT_MAX_LATENCY_MS.
+FINBERT_BATCH_SIZE = config.get_env("FINBERT_BATCH_SIZE", 16, int)
+FINBERT_MAX_LATENCY_MS = config.get_env("FINBERT_MAX_LATENCY_MS", 25, int)
+# Longest a scrape thread waits on the batcher before keeping lexicon scores.
+FINBERT_ESCALATION_TIMEOUT = config.get_env("FINBERT_ESCALATION_TIMEOUT", 60.0, float)
+
+def to_sentiment(result):
+    """Maps one FinBERT pipeline result to (category, score)."""
     # Expanded mapping to handle both sets of labels.
     sentiment_map = {
         "positive": "Bullish", 
@@ -72,8 +110,49 @@ def classify_sentiment(text: str):
         "bullish": "Bullish",   # new mapping
         "bearish": "Bearish"    # new mapping
     }
-    label = result[0]['label'].lower() if result[0].get('label') else "neutral"
-    return sentiment_map.get(label, "Neutral"), result[0]['score']
+    label = result['label'].lower() if result.get('label') else "neutral"
+    return sentiment_map.get(label, "Neutral"), result['score']
+
+def classify_sentiment(text: str):
+    result = get_finbert()(text[:512])
+    return to_sentiment(result[0])
+
+def classify_batch(texts):
+    """Runs FinBERT once over a padded batch; returns (category, score) per text."""
+    results = get_finbert()([text[:512] for text in texts], batch_size=len(texts), truncation=True)
+    return [to_sentiment(result) for result in results]
+
+finbert_batcher = MicroBatcher(
+    classify_batch, max_batch_size=FINBERT_BATCH_SIZE, max_latency_ms=FINBERT_MAX_LATENCY_MS, logger=logger
+)
+
+async def classify_sentiment_async(text: str):
+    """
+    Classifies `text` through the shared micro-batcher, off the event loop.
+    Returns (category, score) like classify_sentiment.
+    """
+    return await finbert_batcher.submit(text)
+
+async def classify_many_async(texts):
+    """Classifies each text through the micro-batcher; results come back in input order."""
+    return list(await asyncio.gather(*(finbert_batcher.submit(text) for text in texts)))
+
+def batched_classifier(loop, timeout=FINBERT_ESCALATION_TIMEOUT):
+    """
+    Returns a blocking classify_batch replacement for worker threads, such as
+    the scraper's cascade escalation. Texts are queued on the micro-batcher
+    running on `loop`, so concurrent scrapes share padded FinBERT batches.
+    Raises TimeoutError after `timeout` seconds, so the caller can fall back
+    (CascadeScorer keeps the lexicon scores).
+    """
+    def classify(texts):
+        future = asyncio.run_coroutine_threadsafe(classify_many_async(texts), loop)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise TimeoutError(f"FinBERT escalation of {len(texts)} texts timed out after {timeout}s")
+    return classify
 
 
 # ------------------ Embed Helper Functions ------------------
@@ -110,6 +189,8 @@ async def sentiment_command(ctx, ticker: str = "TSLA"):
     """
     Aggregates real-time sentiment for a given ticker by reading CSV files.
     """
+    import pandas as pd
+
     csv_files = glob.glob(f"**/{ticker}_*_sentiment.csv", recursive=True)
     if not csv_files:
         await ctx.send(f"❌ No sentiment data found for **{ticker}**.")
@@ -159,6 +240,10 @@ async def overnight_scraper_scheduler():
     """
     Runs the ephemeral-based multi-ticker sentiment scraper and posts updates to Discord.
     """
+    from sentiment_scraper import enable_cascade_scoring, run_multi_ticker_scraper
+
+    if CASCADE_SCORING:
+        enable_cascade_scoring(batched_classifier(asyncio.get_running_loop()))
     tickers = ["TSLA", "SPY", "QQQ"]
     async for embed in run_multi_ticker_scraper(tickers=tickers, interval_minutes=15, run_duration_hours=24):
         channel = bot.get_channel(DISCORD_CHANNEL_ID)
@@ -174,9 +259,30 @@ async def overnight_scraper_scheduler():
             logger.error(f"Failed to send Discord message: {e}")
 
 # ------------------ Bot Event Handlers ------------------
+async def warm_up_finbert():
+    """Loads FinBERT off the event loop so the first classification is fast."""
+    try:
+        await asyncio.to_thread(get_finbert)
+    except Exception as e:
+        logger.error(f"❌ FinBERT warm-up failed; it will load on first use: {e}")
+
+async def warm_up_database():
+    """
+    Connects the shared database handler (the one the scraper writes through)
+    off the event loop, so the first scrape doesn't pay for connect and schema setup.
+    """
+    from db_handler import get_database_handler
+    try:
+        await asyncio.to_thread(get_database_handler(logger).ensure_ready)
+    except Exception as e:
+        logger.error(f"❌ Database warm-up failed; it will connect on first write: {e}")
+
 @bot.event
 async def on_ready():
-    logger.info(f"✅ Discord bot connected as {bot.user}")
+    logger.info(f"✅ Discord bot connected as {bot.user} ({time.perf_counter() - _IMPORT_STARTED:.1f}s after import).")
+    if FINBERT_WARMUP:
+        bot.loop.create_task(warm_up_finbert())
+    bot.loop.create_task(warm_up_database())
     bot.loop.create_task(overnight_scraper_scheduler())
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+import math
+import multiprocessing
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from importlib.metadata import PackageNotFoundError, version
+
+from textblob.en.sentiments import PatternAnalyzer
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+from logins.project_config import config
+from score_cache import ScoreCache, text_key
+
+# Weighted final score => TEXTBLOB_WEIGHT * TextBlob + VADER_WEIGHT * VADER
+TEXTBLOB_WEIGHT = 0.4
+VADER_WEIGHT = 0.6
+BULLISH_THRESHOLD = 0.2
+BEARISH_THRESHOLD = -0.2
+
+# Bump when scoring logic changes in a way weights/package versions don't capture.
+SCORING_VERSION = 1
+
+# Memoized scores: in-memory LRU size, plus an optional sqlite file that
+# survives restarts (empty disables the disk tier).
+SCORE_CACHE_SIZE = config.get_env("SCORE_CACHE_SIZE", 50000, int)
+SCORE_CACHE_PATH = config.get_env("SCORE_CACHE_PATH", "")
+
+# Process-pool scoring: batches of at least SCORING_MIN_PARALLEL_BATCH texts are
+# split evenly across SCORING_WORKERS processes, in shards of at most
+# SCORING_CHUNK_SIZE. Smaller batches are scored in-process, where IPC would
+# cost more than it saves. benchmarks/bench_scoring_executor.py measured
+# 0.6-48 ms per warm pool call against 0.26-0.34 ms per message in-process, so
+# two workers break even at up to ~270 messages. The scraper scores in chunks
+# of this size (see SCRAPE_FLUSH_SIZE), so deep scrolls reach the pool.
+SCORING_WORKERS = config.get_env("SCORING_WORKERS", max(1, (os.cpu_count() or 1) - 1), int)
+SCORING_MIN_PARALLEL_BATCH = config.get_env("SCORING_MIN_PARALLEL_BATCH", 300, int)
+SCORING_CHUNK_SIZE = config.get_env("SCORING_CHUNK_SIZE", 250, int)
+
+BatchScores = namedtuple("BatchScores", ["textblob", "vader", "final", "category"])
+
+
+def categorize(final_score):
+    if final_score > BULLISH_THRESHOLD:
+        return "Bullish"
+    if final_score < BEARISH_THRESHOLD:
+        return "Bearish"
+    return "Neutral"
+
+
+def _package_version(name):
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def scoring_signature():
+    """
+    Identifies everything a cached score depends on. Any change here
+    invalidates previously cached scores.
+    """
+    return (
+        f"v{SCORING_VERSION}|tb={TEXTBLOB_WEIGHT}|vd={VADER_WEIGHT}"
+        f"|bull={BULLISH_THRESHOLD}|bear={BEARISH_THRESHOLD}"
+        f"|textblob={_package_version('textblob')}|vader={_package_version('vaderSentiment')}"
+    )
+
+
+class SentimentEngine:
+    """
+    Long-lived TextBlob + VADER scorer.
+
+    The VADER lexicon and the TextBlob pattern analyzer are loaded once when the
+    engine is built and reused for every message, instead of once per call.
+    TextBlob(text).sentiment delegates to PatternAnalyzer.analyze, so calling the
+    analyzer directly gives identical scores without building a blob.
+    """
+
+    def __init__(self):
+        self.textblob = PatternAnalyzer()
+        self.vader = SentimentIntensityAnalyzer()
+
+    def analyze(self, text):
+        """
+        Returns (textblob_score, vader_score, final_score, category) for one text.
+        """
+        tb_score = self.textblob.analyze(text).polarity
+        vd_score = self.vader.polarity_scores(text)["compound"]
+        final_score = TEXTBLOB_WEIGHT * tb_score + VADER_WEIGHT * vd_score
+        return tb_score, vd_score, final_score, categorize(final_score)
+
+    def analyze_batch(self, texts):
+        """
+        Scores a list of texts in one call, returning BatchScores whose fields
+        are parallel lists in input order.
+        """
+        tb_scores, vd_scores, final_scores, categories = [], [], [], []
+        for text in texts:
+            tb_score, vd_score, final_score, category = self.analyze(text)
+            tb_scores.append(tb_score)
+            vd_scores.append(vd_score)
+            final_scores.append(final_score)
+            categories.append(category)
+        return BatchScores(tb_scores, vd_scores, final_scores, categories)
+
+
+def _init_scoring_worker():
+    get_engine()
+
+
+def _score_chunk(texts):
+    return get_engine().analyze_batch(texts)
+
+
+class ScoringExecutor:
+    """
+    Shards large scoring batches across a process pool.
+
+    Each worker process builds its SentimentEngine once, in the pool
+    initializer. The pool is started lazily on the first large batch, and
+    batches below `min_parallel_batch` never leave the calling process. If the
+    pool breaks, the batch is scored in-process and a new pool is started on
+    the next large batch.
+    """
+
+    def __init__(self, max_workers=SCORING_WORKERS, min_parallel_batch=SCORING_MIN_PARALLEL_BATCH,
+                 chunk_size=SCORING_CHUNK_SIZE):
+        self.max_workers = max_workers
+        self.min_parallel_batch = min_parallel_batch
+        self.chunk_size = chunk_size
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_scoring_worker,
+                )
+            return self._pool
+
+    def score(self, texts):
+        """
+        Returns BatchScores for `texts` in input order.
+        """
+        if self.max_workers <= 1 or len(texts) < self.min_parallel_batch:
+            return get_engine().analyze_batch(texts)
+
+        # Spread the batch over every worker, in shards of at most chunk_size.
+        shard = min(self.chunk_size, math.ceil(len(texts) / self.max_workers))
+        chunks = [texts[i:i + shard] for i in range(0, len(texts), shard)]
+        try:
+            results = list(self._get_pool().map(_score_chunk, chunks))
+        except BrokenProcessPool:
+            self.shutdown()
+            return get_engine().analyze_batch(texts)
+        return BatchScores(*([value for shard in column for value in shard] for column in zip(*results)))
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_engine = None
+_score_cache = None
+_scoring_executor = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """
+    Returns the process-wide SentimentEngine, building it on first use.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = SentimentEngine()
+    return _engine
+
+
+def get_score_cache():
+    """
+    Returns the process-wide ScoreCache, opening it on first use.
+    """
+    global _score_cache
+    if _score_cache is None:
+        with _engine_lock:
+            if _score_cache is None:
+                _score_cache = ScoreCache(scoring_signature(), SCORE_CACHE_SIZE, SCORE_CACHE_PATH or None)
+    return _score_cache
+
+
+def get_scoring_executor():
+    """
+    Returns the process-wide ScoringExecutor.
+    """
+    global _scoring_executor
+    if _scoring_executor is None:
+        with _engine_lock:
+            if _scoring_executor is None:
+                _scoring_executor = ScoringExecutor()
+    return _scoring_executor
+
+
+def analyze_batch(texts):
+    """
+    Scores `texts` like SentimentEngine.analyze_batch, serving repeats from the
+    score cache. Each distinct uncached text is scored once per call.
+    """
+    cache = get_score_cache()
+    keys = [text_key(text) for text in texts]
+    cached = cache.get_many(list(dict.fromkeys(keys)))
+
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in pending:
+            pending[key] = text
+    if pending:
+        fresh = get_scoring_executor().score(list(pending.values()))
+        scored = dict(zip(pending, zip(fresh.textblob, fresh.vader, fresh.final, fresh.category)))
+        cache.put_many(scored)
+        cached.update(scored)
+
+    rows = [cached[key] for key in keys]
+    return BatchScores(*(list(column) for column in zip(*rows))) if rows else BatchScores([], [], [], [])
@@ -8,7 +8,12 @@ import json
 import re
 import logging
 import asyncio
+import queue
+import threading
 import pandas as pd
+import psutil
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
 import discord
@@ -17,17 +22,23 @@ import discord
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import WebDriverException, SessionNotCreatedException, TimeoutException
+from chromedriver_cache import resolve_chromedriver_path
+from message_parser import parse_messages_html
+from stocktwits_http import StocktwitsHttpFetcher
 
 # Sentiment Analysis
-from textblob import TextBlob
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from difflib import SequenceMatcher
+from sentiment_engine import (
+    SCORING_MIN_PARALLEL_BATCH, analyze_batch, get_engine, get_score_cache, get_scoring_executor
+)
+from cascade_scoring import CASCADE_BAND, CascadeScorer
+from spam_index import SpamDetector
+from seen_filter import SeenFilter
 
 # Database Integration
-from db_handler import DatabaseHandler
+from db_handler import get_database_handler, message_key
+from logins.project_config import config
 
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -37,20 +48,120 @@ logger = logging.getLogger("SentimentScraper")
 # Constants & Files
 COOKIE_FILE = "stocktwits_cookies.json"
 MAX_SCROLLS = 15
-SCROLL_PAUSE = 2
+SCROLL_PAUSE = 2  # max wait for a new message batch after each scroll
 SPAM_THRESHOLD = 0.85
-MAX_SPAM_MESSAGES = 100
-SPAM_RESET_HOURS = 24  # reset spam detection daily
+# Per-ticker near-duplicate window for spam detection: at most SPAM_WINDOW
+# messages, each remembered for SPAM_WINDOW_HOURS; see spam_index. A full
+# window costs ~3.5 KB per message (~70 MB at the default), per ticker.
+MAX_SPAM_MESSAGES = config.get_env("SPAM_WINDOW", 20_000, int)
+SPAM_WINDOW_HOURS = config.get_env("SPAM_WINDOW_HOURS", 24, float)
+
+# Readiness-driven waits (seconds)
+PAGE_READY_TIMEOUT = config.get_env("PAGE_READY_TIMEOUT", 10, int)
+WAIT_POLL_INTERVAL = 0.2
+MESSAGE_SELECTOR = "div[class*='RichTextMessage_body__']"
+
+# "script" extracts messages in the page and returns compact JSON;
+# "html" pulls page_source and parses it with lxml (also the fallback).
+EXTRACTION_MODE = config.get_env("EXTRACTION_MODE", "script").lower()
+
+# Walks time[datetime] and message bodies in document order, pairing each body
+# with the closest preceding timestamp (like BeautifulSoup's find_previous).
+# Returns JSON rows of [timestamp, content, message_id]. Extracted bodies are
+# tagged so that, with arguments[1] set, only newly rendered ones are returned.
+EXTRACT_MESSAGES_SCRIPT = r"""
+const rows = [];
+const onlyNew = arguments[1];
+let lastTime = null;
+const nodes = document.querySelectorAll("time[datetime], " + arguments[0]);
+for (const node of nodes) {
+    if (node.tagName === "TIME") { lastTime = node; continue; }
+    if (onlyNew && node.hasAttribute("data-st-extracted")) continue;
+    node.setAttribute("data-st-extracted", "1");
+    const parts = [];
+    const walker = document.createTreeWalker(node, NodeFilter.SHOW_TEXT);
+    while (walker.nextNode()) {
+        const text = walker.currentNode.nodeValue.trim();
+        if (text) parts.push(text);
+    }
+    let messageId = null;
+    const link = lastTime && lastTime.closest("a[href*='/message/']");
+    if (link) {
+        const match = link.getAttribute("href").match(/message\/(\d+)/);
+        if (match) messageId = match[1];
+    }
+    rows.push([lastTime ? lastTime.getAttribute("datetime") : null, parts.join(""), messageId]);
+}
+return JSON.stringify(rows);
+"""
+
+# Streaming extraction: max message batches buffered between browser and scorer
+STREAM_QUEUE_SIZE = config.get_env("STREAM_QUEUE_SIZE", 4, int)
+
+# Lean scraping profile: headless Chrome that never fetches what we don't parse.
+# Both lists are comma-separated and can be overridden from the environment.
+SCRAPER_HEADLESS = config.get_env("SCRAPER_HEADLESS", "true").lower() == "true"
+BLOCKED_RESOURCE_PATTERNS = [
+    pattern.strip() for pattern in config.get_env(
+        "SCRAPER_BLOCKED_RESOURCES",
+        "*.png,*.jpg,*.jpeg,*.gif,*.webp,*.avif,*.svg,*.ico,"
+        "*.woff,*.woff2,*.ttf,*.otf,*.mp4,*.webm,*.m3u8,*.mp3"
+    ).split(",") if pattern.strip()
+]
+BLOCKED_DOMAINS = [
+    domain.strip() for domain in config.get_env(
+        "SCRAPER_BLOCKED_DOMAINS",
+        "google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,"
+        "googleadservices.com,adservice.google.com,amazon-adsystem.com,facebook.net,"
+        "scorecardresearch.com,quantserve.com,taboola.com,outbrain.com,hotjar.com,"
+        "segment.io,browser-intake-datadoghq.com,pubmatic.com,rubiconproject.com"
+    ).split(",") if domain.strip()
+]
+
+# Warm driver pool: sessions are recycled after N scrapes or once chromedriver and
+# its browser processes together pass DRIVER_MAX_MEMORY_MB of resident memory
+DRIVER_POOL_SIZE = config.get_env("DRIVER_POOL_SIZE", 3, int)
+DRIVER_MAX_USES = config.get_env("DRIVER_MAX_USES", 20, int)
+DRIVER_MAX_MEMORY_MB = config.get_env("DRIVER_MAX_MEMORY_MB", 512, int)
+
+# "selenium" drives a browser for every ticker. "http" (opt-in) fetches symbol
+# streams with aiohttp, paging back at most HTTP_MAX_PAGES pages to the
+# ticker's high-water mark, and falls back to Selenium per ticker on failure.
+FETCH_BACKEND = config.get_env("FETCH_BACKEND", "selenium").lower()
+HTTP_MAX_PAGES = config.get_env("HTTP_MAX_PAGES", 10, int)
+
+# Scraped messages are scored and saved in chunks of this many, bounding the
+# rows held in memory on deep scrolls. Full chunks are large enough to be
+# scored on the process pool (see SCORING_MIN_PARALLEL_BATCH).
+SCRAPE_FLUSH_SIZE = config.get_env("SCRAPE_FLUSH_SIZE", SCORING_MIN_PARALLEL_BATCH, int)
+
+# Concurrent multi-ticker scraping
+MAX_CONCURRENT_SCRAPES = config.get_env("MAX_CONCURRENT_SCRAPES", DRIVER_POOL_SIZE, int)
+TICKER_TIMEOUT_SECONDS = config.get_env("TICKER_TIMEOUT_SECONDS", 300, int)
 
 BASE_DATA_DIR = Path(r"D:\SocialMediaManager\data")
 BASE_DATA_DIR.mkdir(parents=True, exist_ok=True)
+HIGH_WATER_MARK_FILE = BASE_DATA_DIR / "high_water_marks.json"
+
+# Persistent per-ticker seen-message filter checked before cleaning and scoring,
+# so restarts don't re-score what is already stored. Keys stay remembered for
+# one to two rotation periods.
+SEEN_FILTER_ENABLED = config.get_env("SEEN_FILTER_ENABLED", "true").lower() == "true"
+SEEN_FILTER_DIR = config.get_env("SEEN_FILTER_DIR", str(BASE_DATA_DIR / "seen_filter"))
+SEEN_FILTER_CAPACITY = config.get_env("SEEN_FILTER_CAPACITY", 100_000, int)
+SEEN_FILTER_ERROR_RATE = config.get_env("SEEN_FILTER_ERROR_RATE", 0.001, float)
+SEEN_FILTER_ROTATE_HOURS = config.get_env("SEEN_FILTER_ROTATE_HOURS", 168, float)
 
 # -------------------------------------------------------------------------
 # Global Variables
-db = DatabaseHandler(logger)
-recent_messages = set()
-message_list = []
-spam_reset_time = datetime.now() + timedelta(hours=SPAM_RESET_HOURS)
+db = get_database_handler(logger)  # connects on first write
+spam_detector = SpamDetector(threshold=SPAM_THRESHOLD, window=MAX_SPAM_MESSAGES, window_hours=SPAM_WINDOW_HOURS)
+seen_filter = (
+    SeenFilter(SEEN_FILTER_DIR, SEEN_FILTER_CAPACITY, SEEN_FILTER_ERROR_RATE, SEEN_FILTER_ROTATE_HOURS)
+    if SEEN_FILTER_ENABLED else None
+)
+_cookie_jar = {"version": None, "cookies": []}
+_cookie_jar_lock = threading.Lock()
 
 # -------------------------------------------------------------------------
 def get_ephemeral_driver():
@@ -61,53 +172,385 @@ def get_ephemeral_driver():
     logger.info("🌐 Creating ephemeral Selenium driver session for one ticker.")
     options = Options()
     options.add_argument("--disable-blink-features=AutomationControlled")
-    options.add_argument("--start-maximized")
+    if SCRAPER_HEADLESS:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--mute-audio")
+    else:
+        options.add_argument("--start-maximized")
     options.add_argument("--disable-popup-blocking")
     options.add_argument("--disable-extensions")
-    options.add_argument("--remote-debugging-port=9222")
+    options.add_argument("--blink-settings=imagesEnabled=false")
     options.add_argument("log-level=3")
 
-    driver_path = ChromeDriverManager().install()
-    driver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
+    driver_path = resolve_chromedriver_path()
+    try:
+        driver = webdriver.Chrome(service=ChromeService(driver_path), options=options)
+    except SessionNotCreatedException:
+        # Chrome may have auto-updated under a long-running process; re-resolve once.
+        refreshed_path = resolve_chromedriver_path(refresh=True)
+        if refreshed_path == driver_path:
+            raise
+        driver = webdriver.Chrome(service=ChromeService(refreshed_path), options=options)
+    apply_resource_blocking(driver)
     return driver
 
-def load_cookies(driver):
+def apply_resource_blocking(driver):
     """
-    Loads Stocktwits cookies from file if available, then sets them in the browser.
+    Block images, fonts, media and third-party trackers at the network layer
+    via CDP, and enlarge the resource timing buffer so page_bytes_transferred
+    sees every request.
     """
-    if not os.path.exists(COOKIE_FILE):
-        logger.warning("❌ Cookie file not found")
+    blocked = BLOCKED_RESOURCE_PATTERNS + [f"*{domain}*" for domain in BLOCKED_DOMAINS]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+        driver.execute_cdp_cmd(
+            "Page.addScriptToEvaluateOnNewDocument",
+            {"source": "performance.setResourceTimingBufferSize(5000);"}
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not apply resource blocking: {e}")
+
+def page_bytes_transferred(driver):
+    """
+    Bytes transferred for the current page and its resources, from the
+    Resource Timing API. Cross-origin responses without Timing-Allow-Origin
+    report 0, so this is a lower bound.
+    """
+    try:
+        return int(driver.execute_script(
+            "return performance.getEntriesByType('navigation')"
+            ".concat(performance.getEntriesByType('resource'))"
+            ".reduce((total, entry) => total + (entry.transferSize || 0), 0);"
+        ) or 0)
+    except Exception:
+        return 0
+
+def timed_wait(driver, step, condition, timeout, timings=None):
+    """
+    Polls `condition(driver)` until it is truthy or `timeout` seconds pass.
+    Records how long the wait actually took under `step` in `timings`.
+    Returns True if the condition was met, False on timeout.
+    """
+    start = time.monotonic()
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+        ready = True
+    except TimeoutException:
+        ready = False
+    elapsed = time.monotonic() - start
+    if timings is not None:
+        timings.setdefault(step, []).append(elapsed)
+    logger.debug(f"⏱️ Wait '{step}' {'ready' if ready else 'timed out'} after {elapsed:.2f}s")
+    return ready
+
+def format_wait_timings(timings):
+    """Summarize recorded waits as 'step=total s (count)' pairs for logging."""
+    return ", ".join(
+        f"{step}={sum(durations):.2f}s ({len(durations)})" for step, durations in timings.items()
+    )
+
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+def count_messages(driver):
+    """Number of message bodies currently rendered on the page."""
+    return int(driver.execute_script(f"return document.querySelectorAll(\"{MESSAGE_SELECTOR}\").length") or 0)
+
+def messages_rendered(driver):
+    return count_messages(driver) > 0
+
+def oldest_loaded_timestamp(driver):
+    """ISO timestamp of the oldest (bottom-most) message currently loaded, or None."""
+    return driver.execute_script(
+        "const t = document.querySelectorAll('time[datetime]');"
+        "return t.length ? t[t.length - 1].getAttribute('datetime') : null;"
+    )
+
+def reached_high_water_mark(driver, high_water_mark):
+    """True once the loaded feed reaches messages that were already ingested."""
+    if not high_water_mark:
         return False
+    oldest = oldest_loaded_timestamp(driver)
+    if not isinstance(oldest, str):
+        return False
+    return to_datetime(oldest) <= to_datetime(high_water_mark)
+
+def new_batch_rendered(last_height, last_count):
+    """Condition: the page grew or rendered more messages since the last scroll."""
+    def condition(driver):
+        height = driver.execute_script("return document.body.scrollHeight")
+        return height != last_height or count_messages(driver) > last_count
+    return condition
+
+def normalize_cookie(cookie):
+    """
+    Normalize an exported cookie for injection: drop sameSite/expiry/storeId
+    and pin the domain to .stocktwits.com so it applies across subdomains.
+    """
+    normalized = {key: cookie[key] for key in ("name", "value", "path", "secure", "httpOnly") if key in cookie}
+    normalized["domain"] = ".stocktwits.com"
+    normalized.setdefault("path", "/")
+    return normalized
+
+def cookie_jar_version():
+    """mtime of COOKIE_FILE, or None if it does not exist."""
     try:
-        with open(COOKIE_FILE, "r") as f:
-            cookies = json.load(f)
-        
-        # First navigate to the domain to set cookies
-        driver.get("https://stocktwits.com")
-        time.sleep(2)  # Wait for page to load
-        
-        for cookie in cookies:
-            try:
-                # Remove problematic attributes
-                cookie.pop("sameSite", None)
-                cookie.pop("expiry", None)
-                cookie.pop("storeId", None)
-                
-                # Ensure domain is set correctly
-                if "domain" in cookie:
-                    cookie["domain"] = ".stocktwits.com"
-                
-                driver.add_cookie(cookie)
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to add cookie: {str(e)}")
-                continue
-                
+        return os.path.getmtime(COOKIE_FILE)
+    except OSError:
+        return None
+
+def load_cookie_jar():
+    """
+    Returns the normalized Stocktwits cookie jar. The file is parsed once per
+    process and re-read only when its mtime changes.
+    """
+    global _cookie_jar
+    version = cookie_jar_version()
+    if version is None:
+        return []
+    with _cookie_jar_lock:
+        if _cookie_jar["version"] != version:
+            with open(COOKIE_FILE, "r") as f:
+                cookies = json.load(f)
+            _cookie_jar = {"version": version, "cookies": [normalize_cookie(cookie) for cookie in cookies]}
+            logger.info(f"🍪 Loaded {len(cookies)} cookies from {COOKIE_FILE}.")
+        return _cookie_jar["cookies"]
+
+def load_cookies(driver):
+    """
+    Injects the Stocktwits cookie jar into the browser in one CDP call, so it
+    can run before the first navigation and no refresh is needed. Falls back
+    to visiting the homepage and adding cookies one by one if CDP is missing.
+    """
+    try:
+        cookies = load_cookie_jar()
+        if not cookies:
+            logger.warning("❌ Cookie file not found")
+            return False
+        try:
+            driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk cookie injection failed, adding cookies one by one: {e}")
+            driver.get("https://stocktwits.com")
+            timed_wait(driver, "cookie_domain_ready", document_ready, PAGE_READY_TIMEOUT)
+            for cookie in cookies:
+                try:
+                    driver.add_cookie(dict(cookie))
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to add cookie: {str(e)}")
+                    continue
+
         logger.info("✅ Cookies loaded successfully.")
         return True
     except Exception as e:
         logger.error(f"⚠️ Error loading cookies: {e}")
     return False
 
+class DriverPool:
+    """
+    Keeps up to `size` logged-in Selenium sessions warm between scrapes.
+
+    A session is health-checked before it is handed out and recycled (quit and
+    replaced by a fresh ephemeral driver) once it has served `max_uses` scrapes,
+    its chromedriver and browser processes together use more than
+    `max_memory_mb` of resident memory, or it raised during a scrape. This
+    keeps the per-ticker isolation of ephemeral drivers without paying browser
+    startup on every ticker.
+    """
+
+    def __init__(self, size=DRIVER_POOL_SIZE, max_uses=DRIVER_MAX_USES, max_memory_mb=DRIVER_MAX_MEMORY_MB):
+        self.size = max(1, size)
+        self.max_uses = max_uses
+        self.max_memory_mb = max_memory_mb
+        self._idle = []
+        self._uses = {}
+        self._cookie_versions = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+
+    def _inject_cookies(self, driver):
+        try:
+            if load_cookies(driver):
+                with self._lock:
+                    self._cookie_versions[id(driver)] = cookie_jar_version()
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to warm pooled driver with cookies: {e}")
+
+    def _create_session(self):
+        driver = get_ephemeral_driver()
+        with self._lock:
+            self._uses[id(driver)] = 0
+        self._inject_cookies(driver)
+        return driver
+
+    def _memory_mb(self, driver):
+        """Resident memory of the session's chromedriver and every browser process it started."""
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return 0
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                continue  # renderer exited while we were walking the tree
+        return rss / (1024 * 1024)
+
+    def _is_healthy(self, driver):
+        try:
+            driver.execute_script("return document.readyState")
+        except Exception as e:
+            logger.warning(f"⚠️ Pooled driver failed health check: {e}")
+            return False
+        memory_mb = self._memory_mb(driver)
+        if memory_mb > self.max_memory_mb:
+            logger.info(f"♻️ Pooled driver uses {memory_mb:.0f} MB RSS (limit {self.max_memory_mb} MB), recycling.")
+            return False
+        return True
+
+    def _discard(self, driver):
+        with self._lock:
+            self._uses.pop(id(driver), None)
+            self._cookie_versions.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """
+        Returns a healthy warm driver, creating one if no idle session is usable.
+        Raises TimeoutError if no slot frees up within `timeout` seconds.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No pooled driver became available within {timeout:.0f}s.")
+        try:
+            while True:
+                with self._lock:
+                    driver = self._idle.pop() if self._idle else None
+                    cookie_version = self._cookie_versions.get(id(driver)) if driver is not None else None
+                if driver is None:
+                    return self._create_session()
+                if self._is_healthy(driver):
+                    if cookie_version != cookie_jar_version():
+                        # The cookie file changed since this session was warmed.
+                        self._inject_cookies(driver)
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, broken=False):
+        """Returns a driver to the pool, or recycles it if broken or worn out."""
+        try:
+            with self._lock:
+                uses = self._uses.get(id(driver), 0) + 1
+                worn_out = broken or uses >= self.max_uses
+                if not worn_out:
+                    self._uses[id(driver)] = uses
+                    self._idle.append(driver)
+            if worn_out:
+                logger.info(f"♻️ Recycling pooled driver after {uses} use(s).")
+                self._discard(driver)
+        finally:
+            self._slots.release()
+
+    def _expire(self, driver, expired):
+        expired.set()
+        logger.warning("⏰ Pooled driver passed its scrape deadline, quitting it.")
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    @contextmanager
+    def session(self, deadline=None):
+        """
+        Context manager that checks a driver out and recycles it if the scrape
+        raised. With a `deadline` (time.monotonic() value), waiting for a slot
+        gives up at the deadline, and a driver still checked out then is quit
+        so any WebDriver call blocked on it fails and its slot is freed.
+        """
+        if deadline is None:
+            driver = self.acquire()
+            watchdog = expired = None
+        else:
+            driver = self.acquire(timeout=max(0, deadline - time.monotonic()))
+            expired = threading.Event()
+            watchdog = threading.Timer(max(0, deadline - time.monotonic()), self._expire, (driver, expired))
+            watchdog.daemon = True
+            watchdog.start()
+        try:
+            yield driver
+        except Exception:
+            if watchdog is not None:
+                watchdog.cancel()
+            self.release(driver, broken=True)
+            raise
+        else:
+            if watchdog is not None:
+                watchdog.cancel()
+            self.release(driver, broken=expired is not None and expired.is_set())
+
+    def close_all(self):
+        """Quits every idle pooled driver."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for driver in idle:
+            self._discard(driver)
+        logger.info(f"✅ Closed {len(idle)} pooled driver session(s).")
+
+driver_pool = DriverPool()
+
+class HighWaterMarkStore:
+    """
+    Remembers the newest message timestamp already ingested for each ticker,
+    persisted as JSON so incremental scrapes survive restarts.
+    """
+
+    def __init__(self, path=HIGH_WATER_MARK_FILE):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._marks = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self._marks, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def get(self, ticker):
+        """Returns the ISO timestamp of the newest ingested message, or None."""
+        with self._lock:
+            return self._marks.get(ticker)
+
+    def update(self, ticker, timestamp):
+        """Advances the ticker's mark to `timestamp` if it is newer."""
+        with self._lock:
+            current = self._marks.get(ticker)
+            if current and to_datetime(timestamp) <= to_datetime(current):
+                return
+            self._marks[ticker] = timestamp
+            try:
+                self._save()
+            except OSError as e:
+                logger.warning(f"⚠️ Failed to persist high-water mark for {ticker}: {e}")
+
+high_water_marks = HighWaterMarkStore()
+
 def get_stocktwits_url(ticker):
     return f"https://stocktwits.com/symbol/{ticker}"
 
@@ -125,88 +568,176 @@ def analyze_sentiments_advanced(text):
     Combine TextBlob + VADER for a more robust approach.
     Weighted final score => 0.4 * TextBlob + 0.6 * VADER
     """
-    tb_score = TextBlob(text).sentiment.polarity
-    vader = SentimentIntensityAnalyzer()
-    vd_score = vader.polarity_scores(text)["compound"]
+    return get_engine().analyze(text)
 
-    final_score = 0.4 * tb_score + 0.6 * vd_score
-
-    if final_score > 0.2:
-        category = "Bullish"
-    elif final_score < -0.2:
-        category = "Bearish"
-    else:
-        category = "Neutral"
-
-    return tb_score, vd_score, final_score, category
-
-def is_spam(message, threshold=SPAM_THRESHOLD):
+def is_spam(message, threshold=SPAM_THRESHOLD, ticker=None, pending=None):
     """
-    Fuzzy matching for spam. Resets daily to avoid indefinite memory usage.
+    Fuzzy matching for spam against the ticker's recent messages (see
+    SpamDetector). Safe to call from concurrent scrapes.
     """
-    global recent_messages, message_list, spam_reset_time
-
-    if datetime.now() > spam_reset_time:
-        logger.info("⏲ Spam detection reset after 24 hours.")
-        recent_messages.clear()
-        message_list.clear()
-        spam_reset_time = datetime.now() + timedelta(hours=SPAM_RESET_HOURS)
+    return spam_detector.is_spam(message, ticker, threshold, pending)
 
-    if len(message) < 5:
-        return False
-
-    for recent in message_list:
-        similarity = SequenceMatcher(None, message, recent).ratio()
-        if similarity > threshold:
-            return True
-
-    if message not in recent_messages:
-        recent_messages.add(message)
-        message_list.append(message)
-    if len(message_list) > MAX_SPAM_MESSAGES:
-        oldest = message_list.pop(0)
-        recent_messages.remove(oldest)
-    return False
-
-def scroll_and_collect(driver):
+def iter_scroll_steps(driver, timings=None, high_water_mark=None):
     """
-    Scroll multiple times to load older messages, then return final HTML.
+    Yields once for the first viewport and once after every scroll that
+    rendered a new batch. Each scroll waits only until a new batch renders
+    (at most SCROLL_PAUSE); scrolling stops once a scroll loads nothing new
+    or the loaded content reaches `high_water_mark` (newest timestamp
+    already ingested).
     """
+    yield
     last_height = driver.execute_script("return document.body.scrollHeight")
+    last_count = count_messages(driver)
     for _ in range(MAX_SCROLLS):
+        if reached_high_water_mark(driver, high_water_mark):
+            logger.info(f"✅ Reached high-water mark {high_water_mark}, stopping scroll.")
+            break
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(SCROLL_PAUSE)
-        new_height = driver.execute_script("return document.body.scrollHeight")
-        if new_height == last_height:
+        if not timed_wait(driver, "scroll_batch", new_batch_rendered(last_height, last_count), SCROLL_PAUSE, timings):
             break
-        last_height = new_height
-    logger.info("✅ Scrolling complete, extracting messages.")
+        last_height = driver.execute_script("return document.body.scrollHeight")
+        last_count = count_messages(driver)
+        yield
+    logger.info("✅ Scrolling complete.")
+
+def scroll_feed(driver, timings=None, high_water_mark=None):
+    """
+    Scroll multiple times to load older messages (see iter_scroll_steps).
+    """
+    for _ in iter_scroll_steps(driver, timings, high_water_mark):
+        pass
+
+def scroll_and_collect(driver, timings=None, high_water_mark=None):
+    """
+    Scroll multiple times to load older messages, then return final HTML.
+    """
+    scroll_feed(driver, timings, high_water_mark=high_water_mark)
     return driver.page_source
 
-def extract_messages(html_content):
+def filter_spam(messages, ticker=None, pending=None):
     """
-    Parse HTML from Stocktwits, gather messages w/timestamps, filter spam duplicates.
+    Drop spam duplicates from extracted messages and log the counts.
+    With `pending` (see TickerIngest), kept messages are recorded in the
+    spam window only once they are saved.
     """
-    from bs4 import BeautifulSoup
-    soup = BeautifulSoup(html_content, "html.parser")
-    messages = []
+    unique = []
     spam_count = 0
+    for msg in messages:
+        if is_spam(msg["content"], ticker=ticker, pending=pending):
+            spam_count += 1
+            continue
+        unique.append(msg)
+    logger.info(f"✅ Extracted {len(unique)} unique messages. Filtered {spam_count} spam messages.")
+    return unique
+
+def extract_messages(html_content, ticker=None):
+    """
+    Parse HTML from Stocktwits, gather messages w/timestamps, filter spam duplicates.
+    Parsing is a single streaming pass (see message_parser), linear in page size.
+    """
+    try:
+        rows = parse_messages_html(html_content)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to parse messages from HTML: {e}")
+        return []
+    messages = [row for row in rows if row["content"] and row["timestamp"]]
+    return filter_spam(messages, ticker)
+
+def read_messages_in_browser(driver, only_new=False):
+    """
+    Run EXTRACT_MESSAGES_SCRIPT in the page so only message body, timestamp
+    and message ID cross the WebDriver wire. With `only_new`, bodies returned
+    by an earlier call are skipped.
+    """
+    rows = json.loads(driver.execute_script(EXTRACT_MESSAGES_SCRIPT, MESSAGE_SELECTOR, only_new))
+    return [
+        {"timestamp": timestamp, "content": content, "message_id": message_id}
+        for timestamp, content, message_id in rows
+        if content and timestamp
+    ]
+
+def extract_messages_in_browser(driver, ticker=None):
+    """
+    Extract every loaded message in the page, then filter spam duplicates.
+    """
+    return filter_spam(read_messages_in_browser(driver), ticker)
 
-    for msg in soup.find_all("div", class_="RichTextMessage_body__4qUeP"):
+def collect_messages(driver, ticker=None):
+    """
+    Extract messages from the loaded page using EXTRACTION_MODE, falling back
+    to parsing page_source if the in-page script fails.
+    """
+    if EXTRACTION_MODE == "script":
         try:
-            timestamp_elem = msg.find_previous("time")
-            content = msg.get_text(strip=True)
-            timestamp = timestamp_elem.get("datetime") if timestamp_elem else None
-            if content and timestamp:
-                if is_spam(content):
-                    spam_count += 1
-                    continue
-                messages.append({"timestamp": timestamp, "content": content})
+            return extract_messages_in_browser(driver, ticker)
+        except Exception as e:
+            logger.warning(f"⚠️ In-browser extraction failed, falling back to HTML parsing: {e}")
+    return extract_messages(driver.page_source, ticker)
+
+def iter_message_batches(driver, timings=None, high_water_mark=None, ticker=None, spam_pending=None):
+    """
+    Scroll the feed and yield only the messages rendered since the previous
+    step, with spam duplicates filtered out. Falls back to re-parsing
+    page_source (deduplicated in Python) if the in-page script is disabled
+    or fails.
+    """
+    use_script = EXTRACTION_MODE == "script"
+    seen = set()
+    for _ in iter_scroll_steps(driver, timings, high_water_mark):
+        if use_script:
+            try:
+                yield filter_spam(read_messages_in_browser(driver, only_new=True), ticker, spam_pending)
+                continue
+            except Exception as e:
+                logger.warning(f"⚠️ In-browser extraction failed, falling back to HTML parsing: {e}")
+                use_script = False
+        batch = []
+        for row in parse_messages_html(driver.page_source):
+            key = (row["timestamp"], row["content"])
+            if row["content"] and row["timestamp"] and key not in seen:
+                seen.add(key)
+                batch.append(row)
+        yield filter_spam(batch, ticker, spam_pending)
+
+def stream_message_batches(driver, timings=None, high_water_mark=None, ticker=None, spam_pending=None):
+    """
+    Yields message batches while a background thread keeps scrolling, so the
+    caller's spam filtering and scoring overlap with page waits. The queue
+    holds at most STREAM_QUEUE_SIZE batches, so a slow consumer pauses the
+    browser instead of buffering the whole feed.
+    """
+    batches = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for batch in iter_message_batches(driver, timings, high_water_mark, ticker, spam_pending):
+                if stop.is_set():
+                    break
+                batches.put(("batch", batch))
+            batches.put(("done", None))
         except Exception as e:
-            logger.warning(f"⚠️ Failed to extract a message: {e}")
+            batches.put(("error", e))
 
-    logger.info(f"✅ Extracted {len(messages)} unique messages. Filtered {spam_count} spam messages.")
-    return messages
+    producer = threading.Thread(target=produce, name="message-stream", daemon=True)
+    producer.start()
+    try:
+        while True:
+            kind, payload = batches.get()
+            if kind == "error":
+                raise payload
+            if kind == "done":
+                return
+            yield payload
+    finally:
+        # Unblock a producer stuck on a full queue, then wait until it lets go of the driver.
+        stop.set()
+        while producer.is_alive():
+            try:
+                batches.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        producer.join()
 
 def append_to_csv_by_ticker_and_sentiment(processed_data):
     """
@@ -228,18 +759,21 @@ def append_to_csv_by_ticker_and_sentiment(processed_data):
 
     for file_path_str, rows in grouped_data.items():
         file_path = Path(file_path_str)
-        df = pd.DataFrame(rows)
+        # message_key is DB-only; existing CSVs are appended without a header.
+        df = pd.DataFrame(rows).drop(columns=["message_key"], errors="ignore")
         file_exists = file_path.exists()
         df.to_csv(file_path, mode="a", header=not file_exists, index=False)
         logger.info(f"✅ Appended {len(df)} rows to {file_path}.")
 
 def bulk_save_sentiment(processed_data):
     """
-    Insert processed data in bulk to the database.
+    Insert processed data in bulk to the database. Rows already stored (same
+    message_key) are skipped by the database.
+    Returns {"inserted", "duplicates"}, or None if the insert failed.
     """
     if not processed_data:
         logger.warning("⚠️ No data to save to the database.")
-        return
+        return {"inserted": 0, "duplicates": 0}
     try:
         insert_data = [
             (
@@ -248,13 +782,21 @@ def bulk_save_sentiment(processed_data):
                 row["text"],
                 row["textblob_sentiment_tb"],     
                 row["textblob_sentiment_vader"],  
-                row["sentiment_category"]
+                row["sentiment_category"],
+                row.get("message_key") or message_key(row["ticker"], row["timestamp"], row["text"])
             )
             for row in processed_data
         ]
-        db.bulk_insert_sentiment(insert_data)
+        result = db.bulk_insert_sentiment(insert_data)
+        if result:
+            logger.info(
+                f"🗃️ {processed_data[0]['ticker']}: {result['inserted']} new rows, "
+                f"{result['duplicates']} duplicates already stored."
+            )
+        return result
     except Exception as e:
         logger.error(f"⚠️ Database bulk insert failed: {e}")
+        return None
 
 def cleanup_old_files(ticker, days=7):
     """
@@ -275,101 +817,241 @@ def cleanup_old_files(ticker, days=7):
         except Exception as e:
             logger.warning(f"⚠️ Failed to parse timestamp for cleanup on {file}: {e}")
 
-def parse_timestamp(iso_string):
+def to_datetime(iso_string):
     """
-    Convert '2025-02-27T08:36:59Z' => 'YYYY-MM-DD HH:MM:SS'.
+    Convert '2025-02-27T08:36:59Z' => timezone-aware datetime.
     """
     if iso_string.endswith("Z"):
         iso_string = iso_string.replace("Z", "+00:00")
-    dt = datetime.fromisoformat(iso_string)
-    return dt.strftime("%Y-%m-%d %H:%M:%S")
+    return datetime.fromisoformat(iso_string)
 
-def single_ticker_scrape(ticker):
+def parse_timestamp(iso_string):
     """
-    Create ephemeral driver for a single ticker. If it fails, 
-    no other ticker is affected because each has its own driver.
+    Convert '2025-02-27T08:36:59Z' => 'YYYY-MM-DD HH:MM:SS'.
     """
-    driver = None
-    try:
-        driver = get_ephemeral_driver()
-        url = get_stocktwits_url(ticker)
-        driver.get(url)
-        time.sleep(5)
-
-        if load_cookies(driver):
-            driver.refresh()
-            time.sleep(3)
-
-        html_content = scroll_and_collect(driver)
-        messages = extract_messages(html_content)
-        if not messages:
-            logger.warning(f"No messages extracted for {ticker}.")
-            return f"❌ No messages extracted for {ticker}.", []
-
-        # Perform advanced sentiment analysis
-        processed_data = []
-        bullish = bearish = neutral = 0
-        tb_total = 0.0
-        vd_total = 0.0
+    return to_datetime(iso_string).strftime("%Y-%m-%d %H:%M:%S")
 
-        for msg in messages:
-            text_clean = clean_text(msg["content"])
-            if is_spam(text_clean):
-                continue
-            tb_score, vd_score, final_score, category = analyze_sentiments_advanced(text_clean)
-            if category == "Bullish":
-                bullish += 1
-            elif category == "Bearish":
-                bearish += 1
-            else:
-                neutral += 1
-
-            tb_total += tb_score
-            vd_total += vd_score
-
-            data_row = {
-                "ticker": ticker,
-                "platform": "Stocktwits",
-                "text": text_clean,
-                "timestamp": parse_timestamp(msg["timestamp"]),
-                "textblob_sentiment_tb": tb_score,
-                "textblob_sentiment_vader": vd_score,
-                "sentiment_category": category
-            }
-            processed_data.append(data_row)
-
-        bulk_save_sentiment(processed_data)
-        append_to_csv_by_ticker_and_sentiment(processed_data)
-        cleanup_old_files(ticker, days=7)
-
-        total_msgs = len(processed_data)
-        avg_tb = tb_total / total_msgs if total_msgs else 0
-        avg_vd = vd_total / total_msgs if total_msgs else 0
-
-        summary = (
-            f"📊 **{ticker} Sentiment Summary**\n"
-            f"- Total messages: {total_msgs}\n"
-            f"- Bullish: {bullish} ({(bullish/total_msgs)*100:.1f}%)\n"
-            f"- Bearish: {bearish} ({(bearish/total_msgs)*100:.1f}%)\n"
-            f"- Neutral: {neutral} ({(neutral/total_msgs)*100:.1f}%)\n"
-            f"- Avg. TextBlob Score: {avg_tb:.3f}\n"
-            f"- Avg. VADER Score: {avg_vd:.3f}"
+def filter_new_messages(messages, high_water_mark):
+    """
+    Drop messages older than the ticker's high-water mark. Timestamps only
+    have second resolution, so messages in the mark's own second are kept
+    and the ones already stored are skipped by message_key on insert.
+    """
+    if not high_water_mark:
+        return messages
+    mark = to_datetime(high_water_mark)
+    return [msg for msg in messages if to_datetime(msg["timestamp"]) >= mark]
+
+# Cascade scoring (TextBlob/VADER first, FinBERT for ambiguous messages) is
+# off until a caller that owns a FinBERT model enables it.
+cascade_scorer = None
+
+def enable_cascade_scoring(escalate_fn, band=CASCADE_BAND):
+    """
+    Route ambiguous messages to `escalate_fn(texts) -> [(category, confidence)]`.
+    """
+    global cascade_scorer
+    cascade_scorer = CascadeScorer(escalate_fn, band)
+    logger.info(f"🪜 Cascade scoring enabled (band ±{band} around the category thresholds).")
+    return cascade_scorer
+
+def seen_key(ticker, msg):
+    """Seen-filter key for a raw extracted message: the message_key its stored row gets."""
+    return message_key(ticker, parse_timestamp(msg["timestamp"]), clean_text(msg["content"]))
+
+def score_messages(ticker, messages):
+    """
+    Clean and score extracted messages, returning rows ready for DB/CSV.
+    Messages already in the seen filter are skipped before scoring; they are
+    marked seen by TickerIngest once their rows are saved. The whole list is
+    scored in a single analyze_batch call, or through the cascade scorer
+    when enabled.
+    """
+    if seen_filter is not None and messages:
+        unseen = seen_filter.filter_unseen(ticker, messages, lambda msg: seen_key(ticker, msg))
+        if len(unseen) < len(messages):
+            logger.info(
+                f"👁️ Skipped {len(messages) - len(unseen)} already-seen messages for {ticker} "
+                f"({seen_filter.stats()['skipped']} skipped since startup)."
+            )
+        messages = unseen
+    return _score_unseen_messages(ticker, messages)
+
+def _score_unseen_messages(ticker, messages):
+    # Spam was already filtered at extraction (filter_spam).
+    kept = [(msg, clean_text(msg["content"])) for msg in messages]
+    if not kept:
+        return []
+
+    texts = [text_clean for _, text_clean in kept]
+    if cascade_scorer is not None:
+        scores, tiers = cascade_scorer.score(texts)
+        cascade_stats = cascade_scorer.stats()
+        logger.info(
+            f"🪜 Cascade for {ticker}: escalated {tiers.count('finbert')}/{len(texts)} "
+            f"(overall {cascade_stats['escalation_rate']:.1%}); "
+            f"lexicon {cascade_stats['lexicon_ms_per_msg']:.2f} ms/msg, "
+            f"FinBERT {cascade_stats['finbert_ms_per_msg']:.2f} ms/msg."
         )
-        logger.info(f"✅ Saved {total_msgs} messages for {ticker}.")
-        return summary, processed_data
+    else:
+        scores = analyze_batch(texts)
+    cache_stats = get_score_cache().stats()
+    logger.info(
+        f"🧠 Score cache for {ticker}: {cache_stats['hits']} hits ({cache_stats['disk_hits']} from disk), "
+        f"{cache_stats['misses']} misses, hit rate {cache_stats['hit_rate']:.0%}."
+    )
+    processed_data = []
+    for (msg, text_clean), tb_score, vd_score, category in zip(kept, scores.textblob, scores.vader, scores.category):
+        timestamp = parse_timestamp(msg["timestamp"])
+        data_row = {
+            "ticker": ticker,
+            "platform": "Stocktwits",
+            "text": text_clean,
+            "timestamp": timestamp,
+            "textblob_sentiment_tb": tb_score,
+            "textblob_sentiment_vader": vd_score,
+            "sentiment_category": category,
+            "message_key": message_key(ticker, timestamp, text_clean)
+        }
+        processed_data.append(data_row)
+    return processed_data
+
+def build_ticker_summary(ticker, counts, textblob_total, vader_total):
+    """
+    Format the per-ticker embed text from category counts and score totals.
+    """
+    total_msgs = sum(counts.values())
+    bullish = counts["Bullish"]
+    bearish = counts["Bearish"]
+    neutral = total_msgs - bullish - bearish
+    avg_tb = textblob_total / total_msgs
+    avg_vd = vader_total / total_msgs
+
+    return (
+        f"📊 **{ticker} Sentiment Summary**\n"
+        f"- Total messages: {total_msgs}\n"
+        f"- Bullish: {bullish} ({(bullish/total_msgs)*100:.1f}%)\n"
+        f"- Bearish: {bearish} ({(bearish/total_msgs)*100:.1f}%)\n"
+        f"- Neutral: {neutral} ({(neutral/total_msgs)*100:.1f}%)\n"
+        f"- Avg. TextBlob Score: {avg_tb:.3f}\n"
+        f"- Avg. VADER Score: {avg_vd:.3f}"
+    )
+
+class TickerIngest:
+    """
+    Scores and saves one ticker's new messages in chunks of `flush_size`, so
+    a deep scroll holds at most one chunk of messages and scored rows in
+    memory. Only category counts and score totals are kept for the summary.
+    A chunk's messages are marked in the seen filter and recorded in the
+    spam window once it is saved; until then `spam_pending` catches
+    duplicates within the scrape (pass it to filter_spam).
+
+    The feed is read newest first, so the high-water mark advances in
+    finish() only if every chunk was saved; after a failed save no further
+    chunks are flushed and the ticker is fetched again on the next cycle.
+    """
+
+    def __init__(self, ticker, high_water_mark=None, flush_size=SCRAPE_FLUSH_SIZE):
+        self.ticker = ticker
+        self.high_water_mark = high_water_mark
+        self.flush_size = max(1, flush_size)
+        self.pending = []
+        self.newest_timestamp = None
+        self.save_failed = False
+        self.spam_pending = spam_detector.pending_index()
+        self.counts = Counter()
+        self.textblob_total = 0.0
+        self.vader_total = 0.0
+
+    def add(self, messages):
+        """
+        Queues the messages past the high-water mark and flushes every full
+        chunk. Returns False once a save failed and the scrape should stop.
+        """
+        messages = filter_new_messages(messages, self.high_water_mark)
+        for msg in messages:
+            if self.newest_timestamp is None or to_datetime(msg["timestamp"]) > to_datetime(self.newest_timestamp):
+                self.newest_timestamp = msg["timestamp"]
+        self.pending.extend(messages)
+        while len(self.pending) >= self.flush_size and not self.save_failed:
+            chunk, self.pending = self.pending[:self.flush_size], self.pending[self.flush_size:]
+            self._flush(chunk)
+        return not self.save_failed
+
+    def _flush(self, messages):
+        rows = score_messages(self.ticker, messages)
+        if not rows:
+            return
+        if bulk_save_sentiment(rows) is None:
+            self.save_failed = True
+            return
+        # Only stored messages may be skipped or flagged as spam on later runs.
+        spam_detector.record([msg["content"] for msg in messages], self.ticker)
+        if seen_filter is not None:
+            seen_filter.mark_seen(self.ticker, [seen_key(self.ticker, msg) for msg in messages])
+        append_to_csv_by_ticker_and_sentiment(rows)
+        self.counts.update(row["sentiment_category"] for row in rows)
+        self.textblob_total += sum(row["textblob_sentiment_tb"] for row in rows)
+        self.vader_total += sum(row["textblob_sentiment_vader"] for row in rows)
+
+    def finish(self):
+        """
+        Flushes the remaining messages, advances the high-water mark if every
+        chunk was saved and returns (summary, category counts).
+        """
+        if self.pending and not self.save_failed:
+            self._flush(self.pending)
+        self.pending = []
+        if self.save_failed:
+            logger.warning(f"⚠️ {self.ticker} rows were not saved; keeping its high-water mark for the next cycle.")
+        if not self.counts:
+            if self.save_failed:
+                return f"⚠️ Database save failed for {self.ticker}.", Counter()
+            logger.warning(f"No new messages extracted for {self.ticker}.")
+            return f"❌ No new messages extracted for {self.ticker}.", Counter()
+
+        cleanup_old_files(self.ticker, days=7)
+        if not self.save_failed and self.newest_timestamp:
+            high_water_marks.update(self.ticker, self.newest_timestamp)
+
+        logger.info(f"✅ Saved {sum(self.counts.values())} messages for {self.ticker}.")
+        return build_ticker_summary(self.ticker, self.counts, self.textblob_total, self.vader_total), self.counts
+
+def single_ticker_scrape(ticker, deadline=None):
+    """
+    Scrape a single ticker on a warm, logged-in driver from the pool. If the
+    scrape fails the driver is recycled, so no other ticker is affected.
+    Past `deadline` (time.monotonic() value) the driver is quit, which makes
+    the scrape fail instead of holding its pool slot.
+
+    Messages are streamed batch by batch while the browser keeps scrolling,
+    and scored and saved in SCRAPE_FLUSH_SIZE chunks (see TickerIngest).
+    Returns (summary, category counts).
+    """
+    wait_timings = {}
+    ingest = TickerIngest(ticker, high_water_marks.get(ticker))
+    try:
+        with driver_pool.session(deadline) as driver:
+            url = get_stocktwits_url(ticker)
+            driver.get(url)
+            if not timed_wait(driver, "messages_ready", messages_rendered, PAGE_READY_TIMEOUT, wait_timings):
+                logger.warning(f"⚠️ No messages rendered for {ticker} within {PAGE_READY_TIMEOUT}s.")
+            for batch in stream_message_batches(driver, wait_timings, ingest.high_water_mark, ticker, ingest.spam_pending):
+                if not ingest.add(batch):
+                    logger.warning(f"⚠️ Database save failed for {ticker}, stopping the scrape early.")
+                    break
+            transferred = page_bytes_transferred(driver)
+        logger.info(f"⏱️ {ticker} waits: {format_wait_timings(wait_timings)}")
+        logger.info(f"📦 {ticker} page transferred {transferred / 1024:.0f} KB.")
+
+        return ingest.finish()
 
     except WebDriverException as e:
         logger.error(f"⚠️ WebDriverException scraping {ticker}: {e}")
-        return f"⚠️ Error scraping {ticker}: {e}", []
+        return f"⚠️ Error scraping {ticker}: {e}", Counter()
     except Exception as e:
         logger.error(f"⚠️ Unexpected error for {ticker}: {e}")
-        return f"⚠️ Error during scraping for {ticker}: {e}", []
-    finally:
-        if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+        return f"⚠️ Error during scraping for {ticker}: {e}", Counter()
 
 # -------------------------------------------------------------------------
 # Async Multi-Ticker Scraper
@@ -380,31 +1062,90 @@ def get_embed_color(summary):
         return discord.Color.green()
     return discord.Color.light_gray()
 
-async def run_multi_ticker_scraper(tickers=["TSLA", "SPY", "QQQ"], interval_minutes=15, run_duration_hours=8):
+def process_fetched_messages(ticker, messages):
+    """
+    Spam-filter, score and persist messages fetched without a browser,
+    through the same pipeline single_ticker_scrape uses.
+    """
+    ingest = TickerIngest(ticker, high_water_marks.get(ticker))
+    ingest.add(filter_spam(messages, ticker, ingest.spam_pending))
+    return ingest.finish()
+
+async def http_ticker_scrape(fetcher, ticker, deadline=None):
     """
-    Repeatedly runs ephemeral scrapes for each ticker, 
-    building a summary embed each iteration.
+    Fetch a ticker's stream over HTTP and score it off the event loop.
+    Falls back to a Selenium scrape if the HTTP path fails.
+    """
+    try:
+        messages = await fetcher.fetch_messages(ticker, high_water_marks.get(ticker))
+    except Exception as e:
+        logger.warning(f"⚠️ HTTP fetch failed for {ticker}, falling back to Selenium: {e}")
+        return await asyncio.to_thread(single_ticker_scrape, ticker, deadline)
+    return await asyncio.to_thread(process_fetched_messages, ticker, messages)
+
+async def scrape_tickers_concurrently(tickers, max_concurrency=MAX_CONCURRENT_SCRAPES, timeout=TICKER_TIMEOUT_SECONDS,
+                                      fetcher=None):
+    """
+    Scrapes tickers in parallel, at most `max_concurrency` at a time.
+    Each ticker gets its own timeout, and results come back in ticker order.
+    The timeout is also passed to the scrape thread as a deadline: a scrape
+    still running then has its driver quit and its pool slot released, and
+    waiting for a pool slot gives up at the deadline, so one hung ticker
+    cannot block the others.
+    With an HTTP `fetcher`, tickers are fetched over HTTP first.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def scrape(ticker):
+        async with semaphore:
+            deadline = time.monotonic() + timeout
+            try:
+                if fetcher is not None:
+                    return await asyncio.wait_for(http_ticker_scrape(fetcher, ticker, deadline), timeout)
+                return await asyncio.wait_for(asyncio.to_thread(single_ticker_scrape, ticker, deadline), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"⚠️ Timed out scraping {ticker} after {timeout}s.")
+                return f"⚠️ Timed out scraping {ticker} after {timeout}s", Counter()
+
+    return await asyncio.gather(*(scrape(ticker) for ticker in tickers))
+
+async def run_multi_ticker_scraper(tickers=["TSLA", "SPY", "QQQ"], interval_minutes=15, run_duration_hours=8,
+                                   max_concurrency=MAX_CONCURRENT_SCRAPES):
+    """
+    Repeatedly runs pooled scrapes for each ticker, up to `max_concurrency`
+    at a time, building a summary embed each iteration.
     """
     end_time = datetime.now() + timedelta(hours=run_duration_hours)
     logger.info(f"🚀 Starting overnight scraper until {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
 
-    db_handler = DatabaseHandler(logger)
+    fetcher = None
+    if FETCH_BACKEND == "http":
+        cookies = {cookie["name"]: cookie["value"] for cookie in load_cookie_jar()}
+        fetcher = StocktwitsHttpFetcher(
+            logger, cookies=cookies, max_connections=max(1, max_concurrency), max_pages=HTTP_MAX_PAGES
+        )
 
     while datetime.now() < end_time:
         ticker_summaries = []
-        all_sentiments = []
+        market_counts = Counter()
 
-        # Each ticker has its own ephemeral driver
-        for ticker in tickers:
-            summary, processed_data = await asyncio.to_thread(single_ticker_scrape, ticker)
+        # HTTP first when enabled; otherwise each ticker checks out a warm driver from the pool
+        results = await scrape_tickers_concurrently(tickers, max_concurrency=max_concurrency, fetcher=fetcher)
+        for summary, counts in results:
             ticker_summaries.append(summary)
-            all_sentiments.extend(processed_data)
+            market_counts.update(counts)
+        db_stats = db.stats()
+        logger.info(
+            f"🗄️ DB pool: {db_stats['in_use']}/{db_stats['pool_size']} in use, "
+            f"avg wait {db_stats['avg_wait_ms']:.1f} ms (max {db_stats['max_wait_ms']:.1f} ms), "
+            f"{db_stats['retries']} connection retries."
+        )
 
-        if all_sentiments:
-            total_msgs = len(all_sentiments)
-            bullish = sum(1 for d in all_sentiments if d["sentiment_category"] == "Bullish")
-            bearish = sum(1 for d in all_sentiments if d["sentiment_category"] == "Bearish")
-            neutral = sum(1 for d in all_sentiments if d["sentiment_category"] == "Neutral")
+        if market_counts:
+            total_msgs = sum(market_counts.values())
+            bullish = market_counts["Bullish"]
+            bearish = market_counts["Bearish"]
+            neutral = market_counts["Neutral"]
 
             market_sentiment = "Bullish" if bullish > bearish else "Bearish" if bearish > bullish else "Neutral"
             market_summary = (
@@ -439,5 +1180,10 @@ async def run_multi_ticker_scraper(tickers=["TSLA", "SPY", "QQQ"], interval_minu
         logger.info(f"⏳ Sleeping {interval_minutes} minute(s) before next iteration.")
         await asyncio.sleep(interval_minutes * 60)
 
-    db_handler.close_connection()
+    if fetcher is not None:
+        await fetcher.close()
+    driver_pool.close_all()
+    get_scoring_executor().shutdown()
+    if seen_filter is not None:
+        seen_filter.close()
     logger.info("✅ Overnight scraping complete.")
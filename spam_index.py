@@ -0,0 +1,260 @@
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from difflib import SequenceMatcher
+
+import numpy as np
+
+_SHIFT = np.uint64(32)
+
+
+class NearDuplicateIndex:
+    """
+    Sliding-window near-duplicate detector built on character shingles,
+    MinHash signatures and LSH banding.
+
+    `is_similar(text)` answers the same question as scanning the window with
+    SequenceMatcher(None, text, other).ratio() > threshold, but only verifies
+    the few candidates whose signatures collide in at least one LSH band, so
+    lookups stay sublinear in the window size. Candidates are confirmed with
+    SequenceMatcher itself, so anything reported similar really is above
+    `threshold`; pairs whose shingle overlap is far below the LSH band
+    threshold (about Jaccard 0.4 with the defaults) may be missed.
+
+    The window holds at most `window` messages and, with `max_age` set,
+    drops messages added more than `max_age` seconds ago. Each message costs
+    about 3.5 KB (its text, signature and one int key per band; see
+    benchmarks/bench_spam_index.py), so a full 100k-message window is
+    ~350 MB.
+    """
+
+    def __init__(self, threshold=0.85, window=100_000, shingle_size=4, num_perm=128, bands=32,
+                 max_candidates=64, seed=1, max_age=None, clock=time.monotonic):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.threshold = threshold
+        self.window = window
+        self.shingle_size = shingle_size
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+        self.max_age = max_age
+        self.clock = clock
+        rng = random.Random(seed)
+        # Permutation i maps a 32-bit shingle hash h to (a[i] * h + b[i]) >> 32 (mod 2**64),
+        # a 2-universal family; odd multipliers also hash shingles and band rows.
+        self._a = np.array([rng.getrandbits(64) | 1 for _ in range(num_perm)], dtype=np.uint64)
+        self._b = np.array([rng.getrandbits(64) for _ in range(num_perm)], dtype=np.uint64)
+        self._shingle_mix = np.array([rng.getrandbits(64) | 1 for _ in range(shingle_size)], dtype=np.uint64)
+        self._band_mix = np.array([rng.getrandbits(64) | 1 for _ in range(self.rows)], dtype=np.uint64)
+        self._ids = itertools.count()
+        self._order = deque()
+        self._entries = {}
+        self._exact = {}
+        # Per band: key -> entry id, or a list of ids once several entries share the key.
+        self._buckets = [{} for _ in range(bands)]
+
+    def __len__(self):
+        return len(self._order)
+
+    def _shingle_hashes(self, text):
+        """32-bit hashes of every `shingle_size`-character shingle (repeats included)."""
+        k = self.shingle_size
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        if len(codes) < k:
+            codes = np.pad(codes, (0, k - len(codes)))
+        count = len(codes) - k + 1
+        mixed = codes[:count] * self._shingle_mix[0]
+        for i in range(1, k):
+            mixed += codes[i:i + count] * self._shingle_mix[i]
+        return mixed >> _SHIFT
+
+    def signature(self, text):
+        hashes = self._shingle_hashes(text)
+        # The shift is monotonic, so take the minimum before shifting.
+        permuted = self._a[:, None] * hashes[None, :] + self._b[:, None]
+        return (permuted.min(axis=1) >> _SHIFT).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        """One int per band. Distinct bands rarely share a key, and candidates are verified anyway."""
+        rows = signature.reshape(self.bands, self.rows).astype(np.uint64)
+        return (rows * self._band_mix).sum(axis=1).tolist()
+
+    def _find_similar(self, text, signature, keys, threshold=None):
+        threshold = self.threshold if threshold is None else threshold
+        if text in self._exact:
+            return True
+        candidates = set()
+        for bucket, key in zip(self._buckets, keys):
+            members = bucket.get(key)
+            if type(members) is list:
+                candidates.update(members)
+            elif members is not None:
+                candidates.add(members)
+        if not candidates:
+            return False
+        # Check the most promising candidates first (estimated Jaccard from signatures).
+        ranked = sorted(candidates, key=lambda i: -np.count_nonzero(self._entries[i][1] == signature))
+        # Same orientation as SequenceMatcher(None, text, recent).ratio().
+        matcher = SequenceMatcher(None, text, "")
+        for entry_id in ranked[:self.max_candidates]:
+            matcher.set_seq2(self._entries[entry_id][0])
+            if (matcher.real_quick_ratio() > threshold and matcher.quick_ratio() > threshold
+                    and matcher.ratio() > threshold):
+                return True
+        return False
+
+    def expire(self):
+        """Drops messages older than `max_age`."""
+        if self.max_age is None:
+            return
+        cutoff = self.clock() - self.max_age
+        while self._order and self._entries[self._order[0]][2] < cutoff:
+            self._evict(self._order.popleft())
+
+    def is_similar(self, text, threshold=None):
+        """True if a message in the window is more than `threshold` similar to `text`."""
+        self.expire()
+        signature = self.signature(text)
+        return self._find_similar(text, signature, self._band_keys(signature), threshold)
+
+    def add(self, text):
+        """Adds `text` to the window, evicting the oldest message when full."""
+        self.expire()
+        if text in self._exact:
+            return
+        self._insert(text, self.signature(text))
+
+    def check_and_add(self, text, threshold=None):
+        """
+        Returns True if `text` is a near-duplicate of a message in the window;
+        otherwise adds it and returns False.
+        """
+        self.expire()
+        signature = self.signature(text)
+        keys = self._band_keys(signature)
+        if self._find_similar(text, signature, keys, threshold):
+            return True
+        self._insert(text, signature, keys)
+        return False
+
+    def _insert(self, text, signature, keys=None):
+        keys = keys or self._band_keys(signature)
+        entry_id = next(self._ids)
+        self._entries[entry_id] = (text, signature, self.clock())
+        self._exact[text] = entry_id
+        for bucket, key in zip(self._buckets, keys):
+            members = bucket.get(key)
+            if members is None:
+                bucket[key] = entry_id
+            elif type(members) is list:
+                members.append(entry_id)
+            else:
+                bucket[key] = [members, entry_id]
+        self._order.append(entry_id)
+        while len(self._order) > self.window:
+            self._evict(self._order.popleft())
+
+    def _evict(self, entry_id):
+        text, signature, _ = self._entries.pop(entry_id)
+        self._exact.pop(text, None)
+        for bucket, key in zip(self._buckets, self._band_keys(signature)):
+            members = bucket[key]
+            if type(members) is not list:
+                del bucket[key]
+                continue
+            # Entries leave in insertion order, so this is usually the first id.
+            members.remove(entry_id)
+            if len(members) == 1:
+                bucket[key] = members[0]
+
+    def clear(self):
+        self._order.clear()
+        self._entries.clear()
+        self._exact.clear()
+        for bucket in self._buckets:
+            bucket.clear()
+
+
+class SpamDetector:
+    """
+    Thread-safe near-duplicate spam detector with one sliding window per
+    ticker, so identical posts under different tickers don't flag each
+    other. Each window keeps up to `window` messages seen in the last
+    `window_hours` hours. Tickers are locked independently, so concurrent
+    scrapes of different tickers don't wait on each other.
+    """
+
+    def __init__(self, threshold=0.85, window=20_000, window_hours=24, min_length=5, clock=time.monotonic):
+        self.threshold = threshold
+        self.window = window
+        self.max_age = window_hours * 3600
+        self.min_length = min_length
+        self.clock = clock
+        self.checked = 0
+        self.flagged = 0
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def _window_for(self, ticker):
+        with self._lock:
+            entry = self._windows.get(ticker)
+            if entry is None:
+                index = NearDuplicateIndex(self.threshold, window=self.window, max_age=self.max_age, clock=self.clock)
+                entry = self._windows[ticker] = (threading.Lock(), index)
+            return entry
+
+    def pending_index(self):
+        """An empty index for messages checked but not yet recorded (see is_spam)."""
+        return NearDuplicateIndex(self.threshold, window=self.window)
+
+    def is_spam(self, message, ticker=None, threshold=None, pending=None):
+        """
+        True if `message` nearly duplicates one recently seen for `ticker`;
+        otherwise records it. Messages shorter than `min_length` are never spam.
+
+        With `pending` (see pending_index), the ticker's window is only
+        checked and the message is recorded in `pending` instead, so it
+        still catches duplicates among messages that are not stored yet.
+        Call record() once the message is stored.
+        """
+        if len(message) < self.min_length:
+            return False
+        lock, index = self._window_for(ticker)
+        with lock:
+            if pending is None:
+                spam = index.check_and_add(message, threshold)
+            else:
+                spam = index.is_similar(message, threshold)
+        if pending is not None and not spam:
+            spam = pending.check_and_add(message, threshold)
+        with self._lock:
+            self.checked += 1
+            self.flagged += spam
+        return spam
+
+    def record(self, messages, ticker=None):
+        """Adds messages checked against a `pending` index to the ticker's window."""
+        lock, index = self._window_for(ticker)
+        with lock:
+            for message in messages:
+                if len(message) >= self.min_length:
+                    index.add(message)
+
+    def clear(self, ticker=None):
+        """Empties one ticker's window, or every window when `ticker` is None."""
+        with self._lock:
+            if ticker is None:
+                self._windows.clear()
+            else:
+                self._windows.pop(ticker, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "checked": self.checked,
+                "flagged": self.flagged,
+                "window_sizes": {ticker: len(index) for ticker, (_, index) in self._windows.items()},
+            }
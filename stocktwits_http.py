@@ -0,0 +1,132 @@
+import logging
+from datetime import datetime
+
+import aiohttp
+
+from message_parser import parse_messages_html
+
+# Symbol stream endpoint; {ticker} is filled in per request.
+STREAM_URL_TEMPLATE = "https://api.stocktwits.com/api/2/streams/symbol/{ticker}.json"
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "application/json, text/html;q=0.9",
+}
+
+
+def _to_datetime(iso_string):
+    return datetime.fromisoformat(iso_string.replace("Z", "+00:00"))
+
+
+def parse_stream_json(payload):
+    """
+    Convert a Stocktwits stream payload into [{"timestamp", "content", "message_id"}].
+    """
+    messages = []
+    for message in payload.get("messages", []):
+        body = (message.get("body") or "").strip()
+        created_at = message.get("created_at")
+        if body and created_at:
+            messages.append({
+                "timestamp": created_at,
+                "content": body,
+                "message_id": str(message["id"]) if message.get("id") is not None else None,
+            })
+    return messages
+
+
+class StocktwitsHttpFetcher:
+    """
+    Fetches a symbol's message stream over plain HTTP, without a browser.
+
+    One aiohttp session (and its keep-alive connection pool) is shared by every
+    ticker for the fetcher's lifetime. JSON responses are read from the
+    stream API, paging back with `max=<oldest message id>` for at most
+    `max_pages` pages; HTML responses are a single page, parsed with the same
+    streaming parser the Selenium fallback uses.
+    """
+
+    def __init__(self, logger: logging.Logger, cookies=None, url_template=STREAM_URL_TEMPLATE,
+                 max_connections=10, timeout_seconds=15, max_pages=10):
+        self.logger = logger
+        self.cookies = cookies or {}
+        self.url_template = url_template
+        self.max_connections = max_connections
+        self.timeout_seconds = timeout_seconds
+        self.max_pages = max(1, max_pages)
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=60, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                cookies=self.cookies,
+                headers=DEFAULT_HEADERS,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_seconds),
+            )
+        return self._session
+
+    async def _fetch_page(self, url, params):
+        """Returns (messages, more) for one page of the stream."""
+        async with self._get_session().get(url, params=params) as response:
+            response.raise_for_status()
+            if "json" in response.headers.get("Content-Type", ""):
+                payload = await response.json()
+                return parse_stream_json(payload), bool((payload.get("cursor") or {}).get("more"))
+            rows = parse_messages_html(await response.text())
+            return [row for row in rows if row["content"] and row["timestamp"]], False
+
+    async def fetch_messages(self, ticker, high_water_mark=None):
+        """
+        Returns `ticker`'s messages, newest first, paging back until a page
+        reaches `high_water_mark` (ISO timestamp of the newest message already
+        ingested), the stream ends, or `max_pages` pages were read.
+
+        Raises on HTTP errors, on an empty stream, and when the page cap is hit
+        before `high_water_mark`, since messages between the mark and the
+        oldest fetched page would be missed; the caller falls back to Selenium.
+        """
+        url = self.url_template.format(ticker=ticker)
+        mark = _to_datetime(high_water_mark) if high_water_mark else None
+        messages = []
+        seen_ids = set()
+        params = None
+        for page in range(1, self.max_pages + 1):
+            page_messages, more = await self._fetch_page(url, params)
+            # `max` is inclusive, so the previous page's oldest message comes back once more.
+            page_messages = [msg for msg in page_messages if msg.get("message_id") not in seen_ids]
+            seen_ids.update(msg["message_id"] for msg in page_messages if msg.get("message_id"))
+            messages.extend(page_messages)
+            if not page_messages:
+                break
+            if mark and min(_to_datetime(msg["timestamp"]) for msg in page_messages) <= mark:
+                break
+            ids = [int(msg["message_id"]) for msg in page_messages if (msg.get("message_id") or "").isdigit()]
+            if not more or not ids:
+                break
+            params = {"max": min(ids)}
+        else:
+            if mark:
+                raise ValueError(
+                    f"Read {self.max_pages} pages for {ticker} without reaching its high-water mark {high_water_mark}"
+                )
+
+        if not messages:
+            raise ValueError(f"Empty message stream for {ticker}")
+        self.logger.info(f"🌐 Fetched {len(messages)} messages for {ticker} over HTTP ({page} page(s)).")
+        return messages
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -1,5 +1,13 @@
+import os
+from types import SimpleNamespace
 from unittest.mock import MagicMock
+import pytest
 import mysql.connector
+import mysql.connector.pooling
+
+# The persistent seen-message filter would carry state between test runs;
+# tests that need it build their own in a tmp_path.
+os.environ.setdefault("SEEN_FILTER_ENABLED", "false")
 
 # Patch mysql.connector.connect to return a dummy connection object.
 mysql.connector.connect = MagicMock(return_value=MagicMock(
@@ -8,3 +16,41 @@ mysql.connector.connect = MagicMock(return_value=MagicMock(
     rollback=lambda: None,
     close=lambda: None
 ))
+
+# DatabaseHandler checks connections out of a pool; hand out the same dummy.
+mysql.connector.pooling.MySQLConnectionPool = MagicMock(return_value=MagicMock(
+    get_connection=lambda: mysql.connector.connect()
+))
+
+
+@pytest.fixture
+def pooled_drivers(monkeypatch):
+    """
+    Makes DriverPool create MagicMock drivers instead of launching Chrome.
+    Returns the list of drivers created, in order. Each driver's process
+    tree reports `driver.rss_mb` of resident memory (0 by default).
+    """
+    created = []
+
+    def fake_driver():
+        driver = MagicMock()
+        driver.execute_script.return_value = 0
+        driver.service.process.pid = len(created)
+        driver.rss_mb = 0
+        created.append(driver)
+        return driver
+
+    class FakeProcess:
+        def __init__(self, pid):
+            self.driver = created[pid]
+
+        def children(self, recursive=False):
+            return []
+
+        def memory_info(self):
+            return SimpleNamespace(rss=int(self.driver.rss_mb * 1024 * 1024))
+
+    monkeypatch.setattr("sentiment_scraper.get_ephemeral_driver", fake_driver)
+    monkeypatch.setattr("sentiment_scraper.load_cookies", lambda driver: True)
+    monkeypatch.setattr("sentiment_scraper.psutil.Process", FakeProcess)
+    return created
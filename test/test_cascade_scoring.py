@@ -0,0 +1,63 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cascade_scoring import CascadeScorer, is_ambiguous
+from sentiment_engine import BatchScores, categorize
+
+FINALS = {"moon": 0.8, "edge bull": 0.25, "flat": 0.0, "edge bear": -0.15, "dump": -0.7}
+
+def fake_lexicon(texts):
+    finals = [FINALS[text] for text in texts]
+    return BatchScores([0.0] * len(texts), finals, finals, [categorize(f) for f in finals])
+
+def recording_escalator(calls, category="Bearish"):
+    def escalate(texts):
+        calls.append(list(texts))
+        return [(category, 0.9) for _ in texts]
+    return escalate
+
+@pytest.mark.parametrize("score,expected", [
+    (0.2, True), (0.29, True), (0.11, True), (0.31, False), (0.0, False), (-0.2, True), (-0.35, False),
+])
+def test_is_ambiguous_band_around_both_thresholds(score, expected):
+    assert is_ambiguous(score, band=0.1) is expected
+
+def test_only_ambiguous_messages_are_escalated():
+    calls = []
+    scorer = CascadeScorer(recording_escalator(calls), band=0.1, lexicon_fn=fake_lexicon)
+    texts = list(FINALS)
+    scores, tiers = scorer.score(texts)
+    assert calls == [["edge bull", "edge bear"]]
+    assert tiers == ["lexicon", "finbert", "lexicon", "finbert", "lexicon"]
+    assert scores.category == ["Bullish", "Bearish", "Neutral", "Bearish", "Bearish"]
+    # Escalated rows keep their lexicon scores.
+    assert scores.final == [FINALS[text] for text in texts]
+
+def test_stats_report_escalation_rate_and_tier_latency():
+    scorer = CascadeScorer(recording_escalator([]), band=0.1, lexicon_fn=fake_lexicon)
+    scorer.score(list(FINALS))
+    scorer.score(["moon", "flat"])
+    stats = scorer.stats()
+    assert (stats["messages"], stats["escalated"]) == (7, 2)
+    assert stats["escalation_rate"] == pytest.approx(2 / 7)
+    assert stats["lexicon_ms_per_msg"] >= 0
+    assert stats["finbert_ms_per_msg"] >= 0
+
+def test_no_escalation_skips_escalator():
+    calls = []
+    scorer = CascadeScorer(recording_escalator(calls), band=0.01, lexicon_fn=fake_lexicon)
+    _, tiers = scorer.score(["moon", "flat", "dump"])
+    assert calls == []
+    assert set(tiers) == {"lexicon"}
+    assert scorer.stats()["finbert_ms_per_msg"] == 0.0
+
+def test_escalation_failure_keeps_lexicon_scores():
+    def broken(texts):
+        raise RuntimeError("model not loaded")
+    scorer = CascadeScorer(broken, band=0.1, lexicon_fn=fake_lexicon)
+    scores, tiers = scorer.score(["edge bull"])
+    assert scores.category == ["Bullish"]
+    assert tiers == ["lexicon"]
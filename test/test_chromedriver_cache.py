@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+import pytest
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import chromedriver_cache
+from chromedriver_cache import resolve_chromedriver_path
+
+# ------------------ Fixtures ------------------
+
+@pytest.fixture
+def driver_binary(tmp_path):
+    """Create a fake chromedriver binary on disk."""
+    binary = tmp_path / "chromedriver"
+    binary.write_text("binary")
+    return str(binary)
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the resolver at a temporary cache file and reset process state."""
+    cache_file = tmp_path / "chromedriver_cache.json"
+    monkeypatch.setattr(chromedriver_cache, "CACHE_FILE", cache_file)
+    monkeypatch.setattr(chromedriver_cache, "_resolved_path", None)
+    monkeypatch.setattr(chromedriver_cache, "get_chrome_major_version", lambda: "124")
+    return cache_file
+
+@pytest.fixture
+def manager(monkeypatch, driver_binary):
+    """Patch ChromeDriverManager so install() returns the fake binary."""
+    fake_manager = MagicMock()
+    fake_manager.return_value.install.return_value = driver_binary
+    monkeypatch.setattr(chromedriver_cache, "ChromeDriverManager", fake_manager)
+    return fake_manager
+
+# ------------------ Tests ------------------
+
+def test_resolves_once_per_process(cache, manager, driver_binary):
+    assert resolve_chromedriver_path() == driver_binary
+    assert resolve_chromedriver_path() == driver_binary
+    manager.return_value.install.assert_called_once()
+    assert json.loads(cache.read_text()) == {"chrome_major": "124", "driver_path": driver_binary}
+
+def test_reuses_disk_cache_across_restarts(cache, manager, driver_binary):
+    cache.write_text(json.dumps({"chrome_major": "124", "driver_path": driver_binary}))
+    assert resolve_chromedriver_path() == driver_binary
+    manager.return_value.install.assert_not_called()
+
+def test_refreshes_when_chrome_major_changes(cache, manager, driver_binary, monkeypatch):
+    cache.write_text(json.dumps({"chrome_major": "123", "driver_path": driver_binary}))
+    resolve_chromedriver_path()
+    manager.return_value.install.assert_called_once()
+    assert json.loads(cache.read_text())["chrome_major"] == "124"
+
+def test_offline_falls_back_to_cached_driver(cache, manager, driver_binary):
+    cache.write_text(json.dumps({"chrome_major": "123", "driver_path": driver_binary}))
+    manager.return_value.install.side_effect = Exception("network unreachable")
+    assert resolve_chromedriver_path() == driver_binary
+
+def test_install_failure_without_cache_raises(cache, manager):
+    manager.return_value.install.side_effect = Exception("network unreachable")
+    with pytest.raises(Exception, match="network unreachable"):
+        resolve_chromedriver_path()
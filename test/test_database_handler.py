@@ -7,7 +7,8 @@ import os
 # Ensure the parent directory is in sys.path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-from db_handler import DatabaseHandler
+import db_handler as db_handler_module
+from db_handler import DatabaseHandler, get_database_handler, message_key
 
 @pytest.fixture
 def mock_logger():
@@ -16,34 +17,39 @@ def mock_logger():
 
 @pytest.fixture
 def mock_mysql():
-    """Function-scoped fixture to mock MySQL connector in db_handler."""
-    # Patch the connector where it is used in db_handler.
-    with patch("db_handler.mysql.connector.connect", autospec=False) as mock_connect:
-        # Create fresh mock connection and cursor for each test.
+    """Function-scoped fixture to mock the MySQL connection pool in db_handler."""
+    # Patch the pool where it is used in db_handler.
+    with patch("db_handler.pooling.MySQLConnectionPool", autospec=False) as mock_pool_cls:
+        # Create fresh mock pool, connection and cursor for each test.
+        mock_pool = MagicMock()
         mock_conn = MagicMock()
         mock_cursor = MagicMock()
 
         # Set up the return values.
-        mock_connect.return_value = mock_conn
+        mock_pool_cls.return_value = mock_pool
+        mock_pool.get_connection.return_value = mock_conn
         mock_conn.cursor.return_value = mock_cursor
         mock_cursor.connection = mock_conn
 
         # Reset any side effect (so it doesn't carry over from tests that set it).
-        mock_connect.side_effect = None
+        mock_pool_cls.side_effect = None
+        # Schema initialization is once per process; start each test fresh.
+        db_handler_module._initialized_schemas.clear()
 
-        yield mock_connect, mock_conn, mock_cursor
+        yield mock_pool_cls, mock_conn, mock_cursor
 
 @pytest.fixture
 def db_handler(mock_logger, mock_mysql):
     """Fixture to initialize DatabaseHandler with mocks."""
     # Each test gets its own instance of mock_mysql.
     _, mock_conn, mock_cursor = mock_mysql
-    # Instantiate DatabaseHandler; its __init__ will call get_connection(),
-    # but our patched connect should return our mock_conn.
-    db = DatabaseHandler(mock_logger)
-    # Overwrite the connection and cursor after instantiation.
-    db.conn = mock_conn
-    db.cursor = mock_cursor
+    # Instantiate DatabaseHandler and connect it: the pool is created and the
+    # table initialized through our mocked connection.
+    db = DatabaseHandler(mock_logger, reconnect_backoff=0)
+    db.ensure_ready()
+    db.pool.reset_mock()
+    mock_conn.reset_mock()
+    mock_cursor.reset_mock()
     return db, mock_conn, mock_cursor
 
 # ------------------ TESTS ------------------
@@ -53,30 +59,133 @@ def test_initialization(db_handler, mock_logger):
     db, _, _ = db_handler
     mock_logger.info.assert_any_call("✅ Initializing DatabaseHandler for mysql")
 
-def test_get_connection_success(mock_logger, mock_mysql):
-    """Test successful database connection."""
-    mock_connect, mock_conn, _ = mock_mysql
+def test_construction_does_not_connect(mock_logger, mock_mysql):
+    """Nothing touches MySQL until the first operation."""
+    mock_pool_cls, _, _ = mock_mysql
     db = DatabaseHandler(mock_logger)
-    assert db.conn == mock_conn
-    mock_logger.info.assert_any_call("✅ Database connection established.")
-
-def test_get_connection_failure(mock_logger, mock_mysql):
+    mock_pool_cls.assert_not_called()
+    assert db.stats()["connected"] is False
+    db.close_connection()  # no-op before connecting
+
+def test_first_write_connects_and_initializes_schema_once(mock_logger, mock_mysql):
+    mock_pool_cls, _, mock_cursor = mock_mysql
+    mock_cursor.fetchone.return_value = (1,)
+    mock_cursor.rowcount = 1
+    db = DatabaseHandler(mock_logger)
+    row = ("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1")
+
+    db.bulk_insert_sentiment([row])
+    db.bulk_insert_sentiment([row])
+    # A second handler in the same process reuses the initialized schema.
+    DatabaseHandler(mock_logger).bulk_insert_sentiment([row])
+
+    creates = [c for c in mock_cursor.execute.call_args_list if "CREATE TABLE" in c.args[0]]
+    assert len(creates) == 1
+    assert mock_pool_cls.call_count == 2
+    stats = db.stats()
+    assert stats["connected"] is True
+    assert stats["connect_ms"] is not None and stats["schema_init_ms"] is not None
+
+def test_get_database_handler_is_shared_and_lazy(mock_logger, mock_mysql, monkeypatch):
+    mock_pool_cls, _, _ = mock_mysql
+    monkeypatch.setattr("db_handler._shared_handler", None)
+    handler = get_database_handler(mock_logger)
+    assert get_database_handler() is handler
+    mock_pool_cls.assert_not_called()
+
+def test_create_pool_success(mock_logger, mock_mysql):
+    """Test successful pool creation."""
+    mock_pool_cls, _, _ = mock_mysql
+    db = DatabaseHandler(mock_logger, pool_size=3)
+    db.ensure_ready()
+    assert db.pool is mock_pool_cls.return_value
+    assert mock_pool_cls.call_args.kwargs["pool_size"] == 3
+    mock_logger.info.assert_any_call("✅ Database connection pool established (3 connections).")
+
+def test_create_pool_failure(mock_logger, mock_mysql):
     """Test failed database connection."""
-    mock_connect, _, _ = mock_mysql
-    mock_connect.side_effect = Exception("Connection error")
+    mock_pool_cls, _, _ = mock_mysql
+    mock_pool_cls.side_effect = Exception("Connection error")
 
     with pytest.raises(Exception, match="Connection error"):
-        DatabaseHandler(mock_logger)
+        DatabaseHandler(mock_logger).ensure_ready()
     
     mock_logger.error.assert_any_call("❌ Failed to connect to MySQL: Connection error")
 
 def test_close_connection(db_handler):
     """Test database connection closing."""
-    db, mock_conn, mock_cursor = db_handler
+    db, _, _ = db_handler
     db.close_connection()
 
-    mock_cursor.close.assert_called_once()
-    mock_conn.close.assert_called_once()
+    db.pool._remove_connections.assert_called_once()
+
+def test_operations_return_connections_to_pool(db_handler):
+    """Each operation checks out its own connection and cursor and returns them."""
+    db, mock_conn, mock_cursor = db_handler
+    mock_cursor.fetchall.return_value = []
+    checkouts = db.stats()["checkouts"]
+
+    db.fetch_sentiment("AAPL")
+    db.fetch_sentiment("TSLA")
+
+    assert db.pool.get_connection.call_count == 2
+    assert mock_conn.close.call_count == 2
+    assert mock_cursor.close.call_count == 2
+    stats = db.stats()
+    assert (stats["pool_size"], stats["in_use"], stats["checkouts"] - checkouts) == (5, 0, 2)
+
+def test_checkout_retries_with_backoff(db_handler, mock_logger, monkeypatch):
+    """A dropped server is retried with doubling delays until it comes back."""
+    import mysql.connector
+    db, mock_conn, mock_cursor = db_handler
+    delays = []
+    monkeypatch.setattr("db_handler.time.sleep", delays.append)
+    db.reconnect_backoff = 0.5
+    db.pool.get_connection.side_effect = [
+        mysql.connector.errors.InterfaceError("Can't connect"),
+        mysql.connector.errors.InterfaceError("Can't connect"),
+        mock_conn,
+    ]
+    mock_cursor.fetchall.return_value = []
+
+    assert db.fetch_sentiment("AAPL") == []
+    assert delays == [0.5, 1.0]
+    assert db.stats()["retries"] == 2
+
+def test_checkout_gives_up_after_max_attempts(db_handler, monkeypatch):
+    import mysql.connector
+    db, _, _ = db_handler
+    monkeypatch.setattr("db_handler.time.sleep", lambda delay: None)
+    db.pool.get_connection.side_effect = mysql.connector.errors.InterfaceError("Can't connect")
+
+    with pytest.raises(mysql.connector.errors.InterfaceError):
+        db.bulk_insert_sentiment([("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1")])
+    assert db.pool.get_connection.call_count == db.reconnect_attempts
+
+def test_lost_connection_mid_query_is_retried(db_handler):
+    """A query interrupted by a dropped connection is re-run on a fresh checkout."""
+    import mysql.connector
+    db, mock_conn, mock_cursor = db_handler
+    lost = mysql.connector.errors.OperationalError("Lost connection to MySQL server during query", errno=2013)
+    mock_cursor.executemany.side_effect = [lost, None]
+    mock_cursor.rowcount = 1
+
+    result = db.bulk_insert_sentiment([("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1")])
+
+    assert result == {"inserted": 1, "duplicates": 0}
+    assert db.pool.get_connection.call_count == 2
+    mock_conn.rollback.assert_called_once()
+
+def test_pool_is_shared_safely_across_threads(db_handler):
+    from concurrent.futures import ThreadPoolExecutor
+    db, _, mock_cursor = db_handler
+    mock_cursor.fetchall.return_value = []
+    checkouts = db.stats()["checkouts"]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: db.fetch_sentiment("AAPL"), range(40)))
+    stats = db.stats()
+    assert stats["checkouts"] - checkouts == 40
+    assert stats["in_use"] == 0
 
 def test_initialize_table(db_handler, mock_logger):
     """Test table initialization query execution."""
@@ -85,17 +194,64 @@ def test_initialize_table(db_handler, mock_logger):
     mock_cursor.execute.assert_called()
     mock_logger.info.assert_any_call("✅ SentimentData table initialized successfully.")
 
+def test_initialize_table_migrates_existing_table(db_handler, mock_logger):
+    """Tables created without message_key get the column, unique key and a backfill."""
+    db, _, mock_cursor = db_handler
+    mock_cursor.fetchone.return_value = (0,)
+    mock_cursor.rowcount = 12
+
+    db.initialize_table()
+
+    queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert any("ADD UNIQUE KEY uq_sentiment_message_key" in q for q in queries)
+    assert any("UPDATE IGNORE SentimentData" in q and "REGEXP_REPLACE(content, '[^0-9A-Za-z]', '')" in q
+               for q in queries)
+    mock_logger.info.assert_any_call("✅ Added message_key to SentimentData; backfilled 12 rows.")
+
+def test_initialize_table_skips_migration_when_column_exists(db_handler):
+    db, _, mock_cursor = db_handler
+    mock_cursor.fetchone.return_value = (1,)
+
+    db.initialize_table()
+
+    queries = [call.args[0] for call in mock_cursor.execute.call_args_list]
+    assert not any("ALTER TABLE" in q for q in queries)
+
+def test_message_key_ignores_whitespace_between_paths():
+    hashed = message_key("AAPL", "2024-03-01 12:00:00", "Good stock")
+    assert hashed.startswith("h:") and len(hashed) == 42
+    # The HTML parser joins text nodes without spaces; the JSON body keeps them.
+    assert hashed == message_key("AAPL", "2024-03-01 12:00:00", "Goodstock")
+    assert hashed != message_key("TSLA", "2024-03-01 12:00:00", "Good stock")
+    assert hashed != message_key("AAPL", "2024-03-01 12:00:01", "Good stock")
+
 def test_bulk_insert_sentiment_success(db_handler, mock_logger):
     """Test bulk insert with valid data."""
     db, mock_conn, mock_cursor = db_handler
-    test_data = [("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive")]
+    test_data = [("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1")]
+    mock_cursor.rowcount = 1
 
-    db.bulk_insert_sentiment(test_data)
+    result = db.bulk_insert_sentiment(test_data)
 
     mock_cursor.executemany.assert_called_once()
+    assert "ON DUPLICATE KEY UPDATE" in mock_cursor.executemany.call_args.args[0]
     # Allow one or more commit calls:
     assert mock_conn.commit.call_count >= 1
-    mock_logger.info.assert_any_call("✅ Bulk insert successful. Inserted 1 records.")
+    assert result == {"inserted": 1, "duplicates": 0}
+    mock_logger.info.assert_any_call("✅ Bulk insert successful. Inserted 1 new records, skipped 0 duplicates.")
+
+def test_bulk_insert_sentiment_reports_duplicates(db_handler, mock_logger):
+    """Rows whose message_key already exists are not counted as inserted."""
+    db, _, mock_cursor = db_handler
+    test_data = [
+        ("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1"),
+        ("AAPL", "2024-03-01 12:01:00", "Bad stock", -0.8, -0.7, "negative", "st:2"),
+        ("AAPL", "2024-03-01 12:02:00", "Meh stock", 0.0, 0.0, "neutral", "st:3"),
+    ]
+    mock_cursor.rowcount = 1
+
+    assert db.bulk_insert_sentiment(test_data) == {"inserted": 1, "duplicates": 2}
+    mock_logger.info.assert_any_call("✅ Bulk insert successful. Inserted 1 new records, skipped 2 duplicates.")
 
 def test_bulk_insert_sentiment_failure(db_handler, mock_logger):
     """Test rollback on bulk insert failure."""
@@ -103,7 +259,7 @@ def test_bulk_insert_sentiment_failure(db_handler, mock_logger):
     mock_cursor.executemany.side_effect = Exception("Insert error")
 
     with pytest.raises(Exception, match="Insert error"):
-        db.bulk_insert_sentiment([("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive")])
+        db.bulk_insert_sentiment([("AAPL", "2024-03-01 12:00:00", "Good stock", 0.8, 0.7, "positive", "st:1")])
 
     mock_conn.rollback.assert_called_once()
     mock_logger.error.assert_any_call("⚠️ Database bulk insert failed: Insert error")
@@ -118,6 +274,8 @@ def test_save_sentiment_success(db_handler, mock_logger):
     # We assert that it is called at least once for the insert.
     assert mock_cursor.execute.call_count >= 1
     assert mock_conn.commit.call_count >= 1
+    params = mock_cursor.execute.call_args.args[1]
+    assert params[-1] == message_key("AAPL", "2024-03-01 12:00:00", "Good stock")
     mock_logger.info.assert_any_call("✅ Saved sentiment data for AAPL.")
 
 def test_save_sentiment_failure(db_handler, mock_logger):
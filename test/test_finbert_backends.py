@@ -0,0 +1,28 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from finbert_backends import build_finbert_pipeline, check_parity
+
+def fake_pipeline(labels):
+    def pipe(texts, **kwargs):
+        return [{"label": labels.get(text, "neutral"), "score": 0.9} for text in texts]
+    return pipe
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        build_finbert_pipeline("fp4")
+
+def test_parity_reports_agreement_and_mismatches():
+    texts = ["up", "down", "flat", "meh"]
+    reference = fake_pipeline({"up": "positive", "down": "negative"})
+    candidate = fake_pipeline({"up": "Positive", "down": "neutral"})
+    parity = check_parity(reference, candidate, texts)
+    assert parity["agreement"] == pytest.approx(0.75)
+    assert parity["mismatches"] == [("down", "negative", "neutral")]
+
+def test_identical_pipelines_agree_fully():
+    pipe = fake_pipeline({"up": "positive"})
+    assert check_parity(pipe, pipe) == {"agreement": 1.0, "mismatches": []}
@@ -0,0 +1,67 @@
+import os
+import sys
+import asyncio
+import threading
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from finbert_batcher import MicroBatcher
+
+def recording_batch_fn(calls):
+    def batch_fn(texts):
+        calls.append((list(texts), threading.current_thread()))
+        return [text.upper() for text in texts]
+    return batch_fn
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_batch():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls), max_batch_size=8, max_latency_ms=50)
+    results = await asyncio.gather(*(batcher.submit(f"msg {i}") for i in range(5)))
+    await batcher.close()
+    assert results == [f"MSG {i}" for i in range(5)]
+    assert len(calls) == 1
+    assert calls[0][1] is not threading.main_thread()
+
+@pytest.mark.asyncio
+async def test_flushes_at_max_batch_size():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls), max_batch_size=4, max_latency_ms=10_000)
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(str(i)) for i in range(8))), timeout=5)
+    await batcher.close()
+    assert results == [str(i) for i in range(8)]
+    assert [len(texts) for texts, _ in calls] == [4, 4]
+
+@pytest.mark.asyncio
+async def test_lone_request_flushes_after_latency_window():
+    calls = []
+    batcher = MicroBatcher(recording_batch_fn(calls), max_batch_size=64, max_latency_ms=20)
+    assert await asyncio.wait_for(batcher.submit("solo"), timeout=2) == "SOLO"
+    await batcher.close()
+    assert batcher.batches == 1
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller():
+    def failing(texts):
+        raise ValueError("model exploded")
+    batcher = MicroBatcher(failing, max_batch_size=4, max_latency_ms=10)
+    results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"), return_exceptions=True)
+    await batcher.close()
+    assert all(isinstance(result, ValueError) for result in results)
+
+@pytest.mark.asyncio
+async def test_close_fails_queued_requests():
+    release = threading.Event()
+    def slow(texts):
+        release.wait(5)
+        return texts
+    batcher = MicroBatcher(slow, max_batch_size=1, max_latency_ms=0)
+    first = asyncio.ensure_future(batcher.submit("a"))
+    second = asyncio.ensure_future(batcher.submit("b"))
+    await asyncio.sleep(0.05)
+    await batcher.close()
+    release.set()
+    for future in (first, second):
+        with pytest.raises(RuntimeError):
+            await future
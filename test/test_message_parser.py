@@ -0,0 +1,63 @@
+import os
+import sys
+import pytest
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from message_parser import parse_messages_html
+
+def legacy_parse(html_content):
+    """The original BeautifulSoup + find_previous extraction, kept as the reference."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    rows = []
+    for msg in soup.find_all("div", class_="RichTextMessage_body__4qUeP"):
+        timestamp_elem = msg.find_previous("time")
+        rows.append({
+            "timestamp": timestamp_elem.get("datetime") if timestamp_elem else None,
+            "content": msg.get_text(strip=True),
+        })
+    return rows
+
+PAGE = """
+<html>
+  <body>
+    <div class="RichTextMessage_body__4qUeP">Before any timestamp</div>
+    <article>
+      <a href="/TSLA/message/1"><time datetime="2025-02-27T08:36:59Z">1m</time></a>
+      <div class="RichTextMessage_body__4qUeP other-class">
+        $TSLA <span>to the   moon</span> &amp; beyond<br/>
+        <a href="/symbol/TSLA">$TSLA</a>
+      </div>
+    </article>
+    <article>
+      <time datetime="2025-02-27T09:00:00Z"></time>
+      <div class="RichTextMessage_body__4qUeP"><div><p>Nested</p> body</div></div>
+    </article>
+    <div class="RichTextMessage_body__4qUeP"></div>
+  </body>
+</html>
+"""
+
+def test_matches_legacy_parser():
+    rows = [{"timestamp": row["timestamp"], "content": row["content"]} for row in parse_messages_html(PAGE)]
+    assert rows == legacy_parse(PAGE)
+
+def test_reads_message_id_from_permalink_around_time():
+    assert [row["message_id"] for row in parse_messages_html(PAGE)] == [None, "1", None, None]
+
+def test_pairs_each_message_with_preceding_time():
+    rows = parse_messages_html(PAGE)
+    assert [row["timestamp"] for row in rows] == [
+        None, "2025-02-27T08:36:59Z", "2025-02-27T09:00:00Z", "2025-02-27T09:00:00Z"
+    ]
+    assert rows[1]["content"] == "$TSLAto the   moon& beyond$TSLA"
+    assert rows[2]["content"] == "Nestedbody"
+
+def test_matches_any_build_hash():
+    html = '<time datetime="2025-02-27T08:36:59Z"></time><div class="RichTextMessage_body__zZ9">New build</div>'
+    assert parse_messages_html(html) == [{"timestamp": "2025-02-27T08:36:59Z", "content": "New build", "message_id": None}]
+
+@pytest.mark.parametrize("html", ["", "   ", None])
+def test_empty_input(html):
+    assert parse_messages_html(html) == []
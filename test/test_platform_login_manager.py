@@ -45,7 +45,7 @@ def test_get_driver():
     with patch("platform_login_manager.Options") as mock_options, \
          patch("platform_login_manager.Service") as mock_service, \
          patch("platform_login_manager.webdriver.Chrome") as mock_chrome, \
-         patch("platform_login_manager.ChromeDriverManager.install", return_value="dummy_path"):
+         patch("platform_login_manager.resolve_chromedriver_path", return_value="dummy_path"):
         
         dummy_options = MagicMock()
         mock_options.return_value = dummy_options
@@ -0,0 +1,71 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import sentiment_engine
+from score_cache import ScoreCache, text_key
+from sentiment_engine import SentimentEngine, analyze_batch, get_engine
+
+SCORES = (0.5, 0.6, 0.56, "Bullish")
+
+def test_memory_tier_counts_hits_and_misses():
+    cache = ScoreCache("sig", max_entries=10)
+    assert cache.get_many(["a", "b"]) == {}
+    cache.put_many({"a": SCORES})
+    assert cache.get_many(["a", "b"]) == {"a": SCORES}
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 3)
+    assert stats["hit_rate"] == pytest.approx(0.25)
+
+def test_lru_evicts_least_recently_used():
+    cache = ScoreCache("sig", max_entries=2)
+    cache.put_many({"a": SCORES, "b": SCORES})
+    cache.get_many(["a"])
+    cache.put_many({"c": SCORES})
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "scores.sqlite"
+    cache = ScoreCache("sig", path=path)
+    cache.put_many({"a": SCORES})
+    cache.close()
+
+    reopened = ScoreCache("sig", path=path)
+    assert reopened.get_many(["a"]) == {"a": SCORES}
+    assert reopened.stats()["disk_hits"] == 1
+
+def test_signature_change_invalidates_disk_tier(tmp_path):
+    path = tmp_path / "scores.sqlite"
+    cache = ScoreCache("weights-v1", path=path)
+    cache.put_many({"a": SCORES})
+    cache.close()
+
+    assert ScoreCache("weights-v2", path=path).get_many(["a"]) == {}
+
+def test_signature_tracks_weights(monkeypatch):
+    before = sentiment_engine.scoring_signature()
+    monkeypatch.setattr(sentiment_engine, "VADER_WEIGHT", 0.7)
+    assert sentiment_engine.scoring_signature() != before
+
+def test_analyze_batch_scores_each_distinct_text_once(monkeypatch):
+    monkeypatch.setattr(sentiment_engine, "_score_cache", ScoreCache("test"))
+    scored = []
+    original = SentimentEngine.analyze_batch
+    def recording_batch(self, texts):
+        scored.extend(texts)
+        return original(self, texts)
+    monkeypatch.setattr(SentimentEngine, "analyze_batch", recording_batch)
+
+    texts = ["buy the dip", "buy the dip", "sell now"]
+    first = analyze_batch(texts)
+    second = analyze_batch(texts)
+    assert scored == ["buy the dip", "sell now"]
+    assert first == second
+    assert first.category == [get_engine().analyze(text)[3] for text in texts]
+    assert sentiment_engine.get_score_cache().stats()["hits"] == 2
+
+def test_text_key_is_stable():
+    assert text_key("same text") == text_key("same text")
+    assert text_key("same text") != text_key("other text")
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from seen_filter import BloomFilter, ScalableBloomFilter, SeenFilter
+
+def test_bloom_filter_persists_across_reopen(tmp_path):
+    path = tmp_path / "f.bloom"
+    bloom = BloomFilter(path, capacity=1000, error_rate=0.01)
+    assert bloom.add("st:1") is True
+    assert bloom.add("st:1") is False
+    bloom.close()
+
+    reopened = BloomFilter(path)
+    assert "st:1" in reopened
+    assert "st:2" not in reopened
+    assert reopened.count == 1
+    reopened.close()
+
+def test_bloom_filter_rejects_foreign_file(tmp_path):
+    path = tmp_path / "junk.bloom"
+    path.write_bytes(b"\0" * 128)
+    with pytest.raises(ValueError):
+        BloomFilter(path)
+
+def test_scalable_filter_grows_and_keeps_error_rate(tmp_path):
+    bloom = ScalableBloomFilter(tmp_path, capacity=500, error_rate=0.01)
+    for i in range(3000):
+        bloom.add(f"seen-{i}")
+    assert len(bloom.slices) > 1
+    assert all(f"seen-{i}" in bloom for i in range(3000))
+    false_positives = sum(f"unseen-{i}" in bloom for i in range(20000))
+    assert false_positives / 20000 < 0.01
+    bloom.close()
+
+def test_seen_filter_counts_skips_per_ticker(tmp_path):
+    seen = SeenFilter(tmp_path)
+    seen.mark_seen("AAPL", ["a", "b"])
+    assert seen.filter_unseen("AAPL", ["a", "b", "c"], lambda key: key) == ["c"]
+    assert seen.filter_unseen("TSLA", ["a"], lambda key: key) == ["a"]
+    stats = seen.stats()
+    assert (stats["checked"], stats["skipped"], stats["added"]) == (4, 2, 2)
+    assert stats["skipped_by_ticker"] == {"AAPL": 2, "TSLA": 0}
+    seen.close()
+
+def test_seen_filter_rotation_keeps_one_previous_generation(tmp_path, monkeypatch):
+    seen = SeenFilter(tmp_path, rotate_hours=1)
+    seen.mark_seen("AAPL", ["old"])
+
+    now = time.time()
+    monkeypatch.setattr("seen_filter.time.time", lambda: now + 3600 + 1)
+    seen.mark_seen("AAPL", ["newer"])
+    # The previous generation is still consulted after one rotation.
+    assert seen.filter_unseen("AAPL", ["old", "newer"], lambda key: key) == []
+
+    monkeypatch.setattr("seen_filter.time.time", lambda: now + 2 * 3600 + 2)
+    assert seen.filter_unseen("AAPL", ["old", "newer"], lambda key: key) == ["old"]
+    assert len(list((tmp_path / "AAPL").glob("gen_*"))) == 2
+    seen.close()
@@ -0,0 +1,121 @@
+import os
+import sys
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import sentiment_analysis_discord_bot as bot_module
+from sentiment_analysis_discord_bot import classify_batch, classify_sentiment, get_finbert, to_sentiment
+
+class FakePipeline:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        self.calls.append((inputs, kwargs))
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        return [{"label": "negative" if "bear" in t else "positive", "score": 0.9} for t in texts]
+
+@pytest.fixture
+def fake_finbert(monkeypatch):
+    pipeline = FakePipeline()
+    monkeypatch.setattr(bot_module, "_finbert", pipeline)
+    return pipeline
+
+def test_import_does_not_load_heavy_dependencies():
+    # A bare import must not pull in the model.
+    for name in ("transformers", "torch"):
+        assert name not in sys.modules
+
+def test_get_finbert_loads_once(monkeypatch):
+    monkeypatch.setattr(bot_module, "_finbert", None)
+    loads = []
+    fake_transformers = type(sys)("transformers")
+    fake_transformers.pipeline = lambda task, model: loads.append((task, model)) or FakePipeline()
+    monkeypatch.setitem(sys.modules, "transformers", fake_transformers)
+    assert get_finbert() is get_finbert()
+    assert loads == [("text-classification", "ProsusAI/finbert")]
+
+def test_classify_sentiment_maps_labels(fake_finbert):
+    assert classify_sentiment("very bearish tape") == ("Bearish", 0.9)
+    assert classify_sentiment("ripping higher") == ("Bullish", 0.9)
+
+def test_classify_batch_runs_one_pipeline_call(fake_finbert):
+    results = classify_batch(["bear flag", "moon", "x" * 600])
+    assert results == [("Bearish", 0.9), ("Bullish", 0.9), ("Bullish", 0.9)]
+    assert len(fake_finbert.calls) == 1
+    inputs, kwargs = fake_finbert.calls[0]
+    assert len(inputs[2]) == 512
+    assert kwargs["batch_size"] == 3
+
+def test_to_sentiment_defaults_to_neutral():
+    assert to_sentiment({"label": "", "score": 0.5}) == ("Neutral", 0.5)
+    assert to_sentiment({"label": "Bullish", "score": 0.7}) == ("Bullish", 0.7)
+
+@pytest.mark.asyncio
+async def test_warm_up_loads_model_off_loop(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(bot_module, "get_finbert", lambda: loaded.append(True))
+    await bot_module.warm_up_finbert()
+    assert loaded == [True]
+
+@pytest.mark.asyncio
+async def test_warm_up_database_uses_shared_handler(monkeypatch):
+    import db_handler
+    readied = []
+    class FakeHandler:
+        def ensure_ready(self):
+            readied.append(True)
+    monkeypatch.setattr(db_handler, "_shared_handler", FakeHandler())
+    await bot_module.warm_up_database()
+    assert readied == [True]
+
+@pytest.mark.asyncio
+async def test_batched_classifier_coalesces_calls_from_threads(fake_finbert, monkeypatch):
+    from finbert_batcher import MicroBatcher
+    monkeypatch.setattr(bot_module, "finbert_batcher", MicroBatcher(classify_batch, max_batch_size=16, max_latency_ms=50))
+    classify = bot_module.batched_classifier(asyncio.get_running_loop())
+    # Two scrape threads escalate at the same time and share one FinBERT batch.
+    first, second = await asyncio.gather(
+        asyncio.to_thread(classify, ["bear flag", "moon"]),
+        asyncio.to_thread(classify, ["bearish divergence"]),
+    )
+    await bot_module.finbert_batcher.close()
+    assert first == [("Bearish", 0.9), ("Bullish", 0.9)]
+    assert second == [("Bearish", 0.9)]
+    assert len(fake_finbert.calls) == 1
+
+@pytest.mark.asyncio
+async def test_batched_classifier_runs_when_scrape_threads_fill_the_default_executor(fake_finbert, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from finbert_batcher import MicroBatcher
+    monkeypatch.setattr(bot_module, "finbert_batcher", MicroBatcher(classify_batch, max_batch_size=16, max_latency_ms=50))
+    loop = asyncio.get_running_loop()
+    default_executor = ThreadPoolExecutor(max_workers=2)
+    loop.set_default_executor(default_executor)
+    classify = bot_module.batched_classifier(loop, timeout=5)
+    # Every default-executor thread is a scrape blocked on the batcher; inference must still run.
+    results = await asyncio.wait_for(asyncio.gather(
+        asyncio.to_thread(classify, ["bear flag"]),
+        asyncio.to_thread(classify, ["moon"]),
+    ), timeout=5)
+    await bot_module.finbert_batcher.close()
+    default_executor.shutdown()
+    assert results == [[("Bearish", 0.9)], [("Bullish", 0.9)]]
+
+@pytest.mark.asyncio
+async def test_batched_classifier_times_out_so_cascade_keeps_lexicon_scores(monkeypatch):
+    import threading
+    from cascade_scoring import CascadeScorer
+    from finbert_batcher import MicroBatcher
+    release = threading.Event()
+    monkeypatch.setattr(bot_module, "finbert_batcher", MicroBatcher(lambda texts: release.wait() and [], max_latency_ms=1))
+    classify = bot_module.batched_classifier(asyncio.get_running_loop(), timeout=0.1)
+    with pytest.raises(TimeoutError):
+        await asyncio.to_thread(classify, ["Great quarter"])
+    scorer = CascadeScorer(classify, band=2.0)
+    _, tiers = await asyncio.to_thread(scorer.score, ["Great quarter"])
+    release.set()
+    await bot_module.finbert_batcher.close()
+    assert tiers == ["lexicon"]
@@ -0,0 +1,87 @@
+import os
+import sys
+import pytest
+from textblob import TextBlob
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import sentiment_engine
+from sentiment_engine import ScoringExecutor, SentimentEngine, analyze_batch, categorize, get_engine
+
+TEXTS = [
+    "I love this stock, great earnings!",
+    "Terrible guidance, selling everything.",
+    "Holding until Friday.",
+    "",
+]
+
+def reference_scores(text):
+    """The original per-call implementation, kept as the reference."""
+    tb_score = TextBlob(text).sentiment.polarity
+    vd_score = SentimentIntensityAnalyzer().polarity_scores(text)["compound"]
+    final_score = 0.4 * tb_score + 0.6 * vd_score
+    return tb_score, vd_score, final_score, categorize(final_score)
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_analyze_matches_reference(text):
+    tb_score, vd_score, final_score, category = SentimentEngine().analyze(text)
+    ref = reference_scores(text)
+    assert (tb_score, vd_score, category) == (ref[0], ref[1], ref[3])
+    assert final_score == pytest.approx(ref[2])
+
+def test_analyze_batch_returns_parallel_lists_in_order():
+    scores = analyze_batch(TEXTS)
+    assert len(scores.textblob) == len(scores.vader) == len(scores.final) == len(scores.category) == len(TEXTS)
+    for i, text in enumerate(TEXTS):
+        assert (scores.textblob[i], scores.vader[i], scores.final[i], scores.category[i]) == get_engine().analyze(text)
+    assert scores.category[0] == "Bullish"
+    assert scores.category[1] == "Bearish"
+
+def test_analyze_batch_empty():
+    assert analyze_batch([]) == ([], [], [], [])
+
+def test_engine_is_built_once(monkeypatch):
+    monkeypatch.setattr(sentiment_engine, "_engine", None)
+    built = []
+    original_init = SentimentEngine.__init__
+    def counting_init(self):
+        built.append(self)
+        original_init(self)
+    monkeypatch.setattr(SentimentEngine, "__init__", counting_init)
+    analyze_batch(TEXTS)
+    analyze_batch(TEXTS)
+    assert get_engine() is get_engine()
+    assert len(built) == 1
+
+@pytest.mark.parametrize("score,expected", [(0.21, "Bullish"), (0.2, "Neutral"), (-0.2, "Neutral"), (-0.21, "Bearish")])
+def test_categorize_thresholds(score, expected):
+    assert categorize(score) == expected
+
+def test_scoring_executor_keeps_small_batches_in_process():
+    executor = ScoringExecutor(max_workers=2, min_parallel_batch=100)
+    scores = executor.score(TEXTS)
+    assert executor._pool is None
+    assert scores == get_engine().analyze_batch(TEXTS)
+
+def test_scoring_executor_shards_large_batches_in_order():
+    texts = [f"{text} #{i}" for i in range(10) for text in TEXTS]
+    executor = ScoringExecutor(max_workers=2, min_parallel_batch=10, chunk_size=7)
+    try:
+        scores = executor.score(texts)
+        assert executor._pool is not None
+    finally:
+        executor.shutdown()
+    assert scores == get_engine().analyze_batch(texts)
+
+def test_scoring_executor_spreads_threshold_batches_over_every_worker(monkeypatch):
+    executor = ScoringExecutor(max_workers=4, min_parallel_batch=8, chunk_size=250)
+    shards = []
+    class FakePool:
+        def map(self, fn, chunks):
+            shards.extend(len(chunk) for chunk in chunks)
+            return [fn(chunk) for chunk in chunks]
+    monkeypatch.setattr(executor, "_get_pool", lambda: FakePool())
+    texts = [f"{text} #{i}" for i in range(2) for text in TEXTS][:8]
+    assert executor.score(texts) == get_engine().analyze_batch(texts)
+    assert shards == [2, 2, 2, 2]
@@ -4,6 +4,7 @@ import json
 import tempfile
 import shutil
 import asyncio
+import threading
 import pytest
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -18,6 +19,7 @@ from sentiment_scraper import (
     analyze_sentiments_advanced,
     is_spam,
     scroll_and_collect,
+    timed_wait,
     extract_messages,
     append_to_csv_by_ticker_and_sentiment,
     bulk_save_sentiment,
@@ -25,11 +27,27 @@ from sentiment_scraper import (
     parse_timestamp,
     single_ticker_scrape,
     run_multi_ticker_scraper,
+    scrape_tickers_concurrently,
+    DriverPool,
+    HighWaterMarkStore,
+    filter_new_messages,
+    TickerIngest,
+    extract_messages_in_browser,
+    collect_messages,
+    iter_message_batches,
+    stream_message_batches,
+    page_bytes_transferred,
+    load_cookie_jar,
+    http_ticker_scrape,
     logger  # for checking log outputs if needed
 )
 
 # We'll need to patch Selenium and DatabaseHandler calls for tests that involve side effects.
+from sentiment_engine import BatchScores
+from db_handler import message_key
+from collections import Counter
 from unittest.mock import MagicMock, patch
+from selenium.common.exceptions import WebDriverException
 
 # ------------------ Fixtures ------------------
 
@@ -59,6 +77,82 @@ def temp_cookie_file(tmp_path):
 
 # ------------------ Tests ------------------
 
+def test_get_ephemeral_driver_uses_lean_profile(monkeypatch):
+    chrome = MagicMock()
+    monkeypatch.setattr("sentiment_scraper.webdriver.Chrome", chrome)
+    monkeypatch.setattr("sentiment_scraper.ChromeService", MagicMock())
+    monkeypatch.setattr("sentiment_scraper.resolve_chromedriver_path", lambda refresh=False: "chromedriver")
+    monkeypatch.setattr("sentiment_scraper.SCRAPER_HEADLESS", True)
+    monkeypatch.setattr("sentiment_scraper.BLOCKED_RESOURCE_PATTERNS", ["*.png"])
+    monkeypatch.setattr("sentiment_scraper.BLOCKED_DOMAINS", ["doubleclick.net"])
+    driver = get_ephemeral_driver()
+    arguments = chrome.call_args.kwargs["options"].arguments
+    assert "--headless=new" in arguments
+    assert not any("remote-debugging-port" in arg for arg in arguments)
+    driver.execute_cdp_cmd.assert_any_call("Network.setBlockedURLs", {"urls": ["*.png", "*doubleclick.net*"]})
+
+def test_page_bytes_transferred():
+    driver = MagicMock()
+    driver.execute_script.return_value = 2048
+    assert page_bytes_transferred(driver) == 2048
+    driver.execute_script.side_effect = Exception("no performance API")
+    assert page_bytes_transferred(driver) == 0
+
+def test_load_cookies_injects_jar_in_one_call(monkeypatch, tmp_path):
+    cookie_file = tmp_path / "cookies.json"
+    cookie_file.write_text(json.dumps([
+        {"name": "session", "value": "dummy", "domain": "stocktwits.com", "sameSite": "Lax", "expiry": 1, "storeId": "0"},
+        {"name": "csrf", "value": "token", "path": "/", "secure": True},
+    ]))
+    monkeypatch.setattr("sentiment_scraper.COOKIE_FILE", str(cookie_file))
+    monkeypatch.setattr("sentiment_scraper._cookie_jar", {"version": None, "cookies": []})
+    driver = MagicMock()
+    assert load_cookies(driver)
+    driver.execute_cdp_cmd.assert_called_once_with("Network.setCookies", {"cookies": [
+        {"name": "session", "value": "dummy", "domain": ".stocktwits.com", "path": "/"},
+        {"name": "csrf", "value": "token", "path": "/", "secure": True, "domain": ".stocktwits.com"},
+    ]})
+    # No navigation or per-cookie round-trips are needed.
+    driver.get.assert_not_called()
+    driver.add_cookie.assert_not_called()
+
+def test_cookie_jar_is_parsed_once_until_file_changes(monkeypatch, tmp_path):
+    cookie_file = tmp_path / "cookies.json"
+    cookie_file.write_text(json.dumps([{"name": "a", "value": "1"}]))
+    monkeypatch.setattr("sentiment_scraper.COOKIE_FILE", str(cookie_file))
+    monkeypatch.setattr("sentiment_scraper._cookie_jar", {"version": None, "cookies": []})
+    opened = []
+    real_open = open
+    def counting_open(path, *args, **kwargs):
+        if str(path) == str(cookie_file):
+            opened.append(path)
+        return real_open(path, *args, **kwargs)
+    monkeypatch.setattr("builtins.open", counting_open)
+    assert load_cookie_jar()[0]["value"] == "1"
+    assert load_cookie_jar()[0]["value"] == "1"
+    assert len(opened) == 1
+    cookie_file.write_text(json.dumps([{"name": "a", "value": "2"}]))
+    os.utime(cookie_file, (time.time() + 10, time.time() + 10))
+    assert load_cookie_jar()[0]["value"] == "2"
+    assert len(opened) == 2
+
+def test_load_cookies_falls_back_to_add_cookie(monkeypatch, tmp_path):
+    cookie_file = tmp_path / "cookies.json"
+    cookie_file.write_text(json.dumps([{"name": "a", "value": "1"}, {"name": "b", "value": "2"}]))
+    monkeypatch.setattr("sentiment_scraper.COOKIE_FILE", str(cookie_file))
+    monkeypatch.setattr("sentiment_scraper._cookie_jar", {"version": None, "cookies": []})
+    monkeypatch.setattr("sentiment_scraper.PAGE_READY_TIMEOUT", 0.1)
+    driver = MagicMock()
+    driver.execute_cdp_cmd.side_effect = Exception("CDP unavailable")
+    driver.execute_script.return_value = "complete"
+    assert load_cookies(driver)
+    driver.get.assert_called_once_with("https://stocktwits.com")
+    assert driver.add_cookie.call_count == 2
+
+def test_load_cookies_missing_file(monkeypatch, tmp_path):
+    monkeypatch.setattr("sentiment_scraper.COOKIE_FILE", str(tmp_path / "missing.json"))
+    assert not load_cookies(MagicMock())
+
 def test_get_stocktwits_url():
     ticker = "AAPL"
     url = get_stocktwits_url(ticker)
@@ -88,9 +182,8 @@ def test_parse_timestamp():
 
 def test_is_spam():
     # Reset globals to ensure clean state
-    from sentiment_scraper import recent_messages, message_list, spam_reset_time
-    recent_messages.clear()
-    message_list.clear()
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
     # A short message should not be considered spam.
     assert not is_spam("Hi")
     # Add a message and check for similar spam.
@@ -98,6 +191,23 @@ def test_is_spam():
     assert not is_spam(msg)
     # A very similar message should be flagged as spam.
     assert is_spam("This is a test message.")
+    # Windows are per ticker: the same post under another ticker is not spam.
+    assert not is_spam("This is a test message.", ticker="SPY")
+    assert is_spam("This is a test message!", ticker="SPY")
+
+def test_is_spam_is_safe_under_concurrent_scrapes():
+    from concurrent.futures import ThreadPoolExecutor
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
+    import random
+    rng = random.Random(7)
+    words = "calls puts moon dump squeeze buy sell hold beat miss earnings chart red green support".split()
+    messages = list({" ".join(rng.choice(words) for _ in range(12)) for _ in range(200)})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        flags = list(pool.map(lambda msg: is_spam(msg, ticker="TSLA"), messages * 2))
+    # Every message is new exactly once, whichever thread saw it first.
+    assert sum(flags) == len(messages)
+    assert spam_detector.stats()["window_sizes"]["TSLA"] == len(messages)
 
 def test_scroll_and_collect(fake_driver):
     # Ensure that scrolling returns some output (we simulate a constant height)
@@ -107,6 +217,139 @@ def test_scroll_and_collect(fake_driver):
     result = scroll_and_collect(fake_driver)
     assert result == html
 
+def test_timed_wait_returns_as_soon_as_ready(fake_driver):
+    timings = {}
+    start = time.monotonic()
+    assert timed_wait(fake_driver, "ready", lambda d: True, timeout=5, timings=timings)
+    assert time.monotonic() - start < 1
+    assert len(timings["ready"]) == 1
+
+def test_timed_wait_records_timeout(fake_driver):
+    timings = {}
+    assert not timed_wait(fake_driver, "never", lambda d: False, timeout=0.3, timings=timings)
+    assert timings["never"][0] >= 0.3
+
+def test_scroll_and_collect_follows_new_batches(monkeypatch):
+    # Each scroll renders a new batch until the page stops growing at 3000px.
+    state = {"height": 1000}
+    def execute_script(script):
+        if script.startswith("window.scrollTo"):
+            state["height"] = min(state["height"] + 1000, 3000)
+            return None
+        if "document.body.scrollHeight" in script:
+            return state["height"]
+        return 0
+    driver = MagicMock()
+    driver.execute_script.side_effect = execute_script
+    driver.page_source = "<html></html>"
+    monkeypatch.setattr("sentiment_scraper.SCROLL_PAUSE", 0.3)
+    timings = {}
+    assert scroll_and_collect(driver, timings) == "<html></html>"
+    # Two scrolls found new content immediately, the third timed out.
+    assert len(timings["scroll_batch"]) == 3
+    assert sum(timings["scroll_batch"][:2]) < 0.3
+
+def test_scroll_and_collect_stops_at_high_water_mark(monkeypatch):
+    scrolls = []
+    def execute_script(script):
+        if script.startswith("window.scrollTo"):
+            scrolls.append(script)
+            return None
+        if "time[datetime]" in script:
+            # The first viewport already reaches back to the mark.
+            return "2025-02-27T08:00:00Z"
+        if "document.body.scrollHeight" in script:
+            return 1000 + 1000 * len(scrolls)
+        return 0
+    driver = MagicMock()
+    driver.execute_script.side_effect = execute_script
+    driver.page_source = "<html></html>"
+    scroll_and_collect(driver, high_water_mark="2025-02-27T08:30:00Z")
+    assert scrolls == []
+
+def test_high_water_mark_store_persists_newest(tmp_path):
+    path = tmp_path / "marks.json"
+    store = HighWaterMarkStore(path)
+    assert store.get("AAPL") is None
+    store.update("AAPL", "2025-02-27T08:36:59Z")
+    store.update("AAPL", "2025-02-27T08:00:00Z")  # older, ignored
+    reloaded = HighWaterMarkStore(path)
+    assert reloaded.get("AAPL") == "2025-02-27T08:36:59Z"
+
+def test_filter_new_messages():
+    messages = [
+        {"timestamp": "2025-02-27T09:00:00Z", "content": "new"},
+        {"timestamp": "2025-02-27T08:36:59Z", "content": "at mark"},
+        {"timestamp": "2025-02-27T08:00:00Z", "content": "old"},
+    ]
+    assert filter_new_messages(messages, None) == messages
+    # Same-second messages are kept; message_key drops the ones already stored.
+    assert [m["content"] for m in filter_new_messages(messages, "2025-02-27T08:36:59Z")] == ["new", "at mark"]
+
+def fake_scores(monkeypatch):
+    monkeypatch.setattr("sentiment_scraper.analyze_batch", lambda texts: BatchScores(
+        [0.1] * len(texts), [0.2] * len(texts), [0.3] * len(texts), ["Bullish"] * len(texts)))
+    monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", lambda data: None)
+    monkeypatch.setattr("sentiment_scraper.cleanup_old_files", lambda ticker, days=7: None)
+
+def feed(start, count):
+    """`count` distinct messages, one second apart, newest first."""
+    return [{"timestamp": f"2025-02-27T08:{(start - i) // 60:02d}:{(start - i) % 60:02d}Z", "content": f"post {start - i}"}
+            for i in range(count)]
+
+def test_ticker_ingest_flushes_in_chunks(monkeypatch, tmp_path):
+    fake_scores(monkeypatch)
+    marks = HighWaterMarkStore(tmp_path / "marks.json")
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", marks)
+    saved = []
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment",
+                        lambda rows: saved.append(len(rows)) or {"inserted": len(rows), "duplicates": 0})
+    ingest = TickerIngest("AAPL", flush_size=4)
+    for batch in (feed(1000, 3), feed(997, 3), feed(994, 3)):
+        assert ingest.add(batch)
+        # Never more than one chunk of unsaved messages is held.
+        assert len(ingest.pending) < 4
+    summary, counts = ingest.finish()
+    assert saved == [4, 4, 1]
+    assert counts == Counter({"Bullish": 9})
+    assert "Total messages: 9" in summary
+    assert marks.get("AAPL") == feed(1000, 1)[0]["timestamp"]
+
+def test_ticker_ingest_scores_full_chunks_on_the_process_pool(monkeypatch, tmp_path):
+    from sentiment_engine import ScoringExecutor
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda rows: {"inserted": len(rows), "duplicates": 0})
+    monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", lambda data: None)
+    monkeypatch.setattr("sentiment_scraper.cleanup_old_files", lambda ticker, days=7: None)
+    executor = ScoringExecutor(max_workers=2, min_parallel_batch=8)
+    batches = []
+    class FakePool:
+        def map(self, fn, chunks):
+            batches.append(sum(len(chunk) for chunk in chunks))
+            return [fn(chunk) for chunk in chunks]
+    monkeypatch.setattr(executor, "_get_pool", lambda: FakePool())
+    monkeypatch.setattr("sentiment_engine._scoring_executor", executor)
+    # Scroll batches are small; the chunk they fill up is scored in one pool call.
+    ingest = TickerIngest("AAPL", flush_size=8)
+    for start in (1000, 997, 994):
+        ingest.add([dict(msg, content=f"{msg['content']} {time.time_ns()}") for msg in feed(start, 3)])
+    ingest.finish()
+    assert batches == [8]
+
+def test_ticker_ingest_keeps_high_water_mark_after_failed_save(monkeypatch, tmp_path):
+    fake_scores(monkeypatch)
+    marks = HighWaterMarkStore(tmp_path / "marks.json")
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", marks)
+    saves = iter([{"inserted": 2, "duplicates": 0}, None])
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda rows: next(saves))
+    ingest = TickerIngest("AAPL", flush_size=2)
+    assert ingest.add(feed(1000, 2))
+    # The older chunk fails to save: stop, and fetch it again next cycle.
+    assert not ingest.add(feed(998, 3))
+    ingest.finish()
+    assert marks.get("AAPL") is None
+
 def test_extract_messages():
     # Create a small HTML snippet with two message blocks.
     html = """
@@ -124,6 +367,90 @@ def test_extract_messages():
     for m in messages:
         assert "timestamp" in m and "content" in m
 
+def test_extract_messages_in_browser():
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
+    driver = MagicMock()
+    driver.execute_script.return_value = json.dumps([
+        ["2025-02-27T08:36:59Z", "Browser message one", "601"],
+        ["2025-02-27T09:00:00Z", "Another browser post", None],
+        [None, "No timestamp", None],
+    ])
+    messages = extract_messages_in_browser(driver)
+    assert messages == [
+        {"timestamp": "2025-02-27T08:36:59Z", "content": "Browser message one", "message_id": "601"},
+        {"timestamp": "2025-02-27T09:00:00Z", "content": "Another browser post", "message_id": None},
+    ]
+
+def test_collect_messages_falls_back_to_html():
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
+    driver = MagicMock()
+    driver.execute_script.side_effect = Exception("javascript error")
+    driver.page_source = """
+    <time datetime="2025-02-27T08:36:59Z"></time>
+    <div class="RichTextMessage_body__4qUeP">Fallback message</div>
+    """
+    messages = collect_messages(driver)
+    assert [m["content"] for m in messages] == ["Fallback message"]
+
+def test_iter_message_batches_yields_only_new_messages(monkeypatch):
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
+    # Each extraction returns the bodies rendered since the last one.
+    batches = [
+        [["2025-02-27T09:00:00Z", "First viewport post", "3"]],
+        [["2025-02-27T08:50:00Z", "Older post after scrolling", "2"]],
+    ]
+    state = {"height": 1000}
+    def execute_script(script, *args):
+        if script.startswith("window.scrollTo"):
+            state["height"] = min(state["height"] + 1000, 2000)
+            return None
+        if "JSON.stringify" in script:
+            assert args[1] is True
+            return json.dumps(batches.pop(0) if batches else [])
+        if "document.body.scrollHeight" in script:
+            return state["height"]
+        return 0
+    driver = MagicMock()
+    driver.execute_script.side_effect = execute_script
+    monkeypatch.setattr("sentiment_scraper.SCROLL_PAUSE", 0.2)
+    result = [[m["content"] for m in batch] for batch in iter_message_batches(driver)]
+    assert result == [["First viewport post"], ["Older post after scrolling"]]
+
+def test_stream_message_batches_overlaps_and_preserves_order(monkeypatch):
+    def fake_batches(driver, timings=None, high_water_mark=None, ticker=None, spam_pending=None):
+        for i in range(3):
+            time.sleep(0.05)
+            yield [{"timestamp": "2025-02-27T08:36:59Z", "content": f"batch {i}"}]
+    monkeypatch.setattr("sentiment_scraper.iter_message_batches", fake_batches)
+    received = [batch[0]["content"] for batch in stream_message_batches(MagicMock())]
+    assert received == ["batch 0", "batch 1", "batch 2"]
+
+def test_stream_message_batches_propagates_errors(monkeypatch):
+    def failing_batches(driver, timings=None, high_water_mark=None, ticker=None, spam_pending=None):
+        yield [{"timestamp": "2025-02-27T08:36:59Z", "content": "ok"}]
+        raise RuntimeError("browser crashed")
+    monkeypatch.setattr("sentiment_scraper.iter_message_batches", failing_batches)
+    stream = stream_message_batches(MagicMock())
+    assert next(stream)[0]["content"] == "ok"
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        next(stream)
+
+def test_stream_message_batches_stops_producer_when_consumer_exits(monkeypatch):
+    produced = []
+    def endless_batches(driver, timings=None, high_water_mark=None, ticker=None, spam_pending=None):
+        while True:
+            produced.append(1)
+            yield [{"timestamp": "2025-02-27T08:36:59Z", "content": "again"}]
+    monkeypatch.setattr("sentiment_scraper.iter_message_batches", endless_batches)
+    stream = stream_message_batches(MagicMock())
+    next(stream)
+    stream.close()
+    # The queue is bounded, so the producer stops shortly after the consumer.
+    assert len(produced) < 20
+
 def test_append_to_csv_by_ticker_and_sentiment(tmp_path):
     # Use temporary directory for CSV outputs.
     test_dir = tmp_path / "AAPL"
@@ -157,6 +484,7 @@ def test_bulk_save_sentiment(monkeypatch):
     class FakeDB:
         def bulk_insert_sentiment(self, data):
             self.data = data
+            return {"inserted": len(data), "duplicates": 0}
     fake_db = FakeDB()
     monkeypatch.setattr("sentiment_scraper.db", fake_db)
     sample_data = [{
@@ -167,9 +495,11 @@ def test_bulk_save_sentiment(monkeypatch):
         "textblob_sentiment_vader": 0.2,
         "sentiment_category": "Bullish"
     }]
-    bulk_save_sentiment(sample_data)
+    assert bulk_save_sentiment(sample_data) == {"inserted": 1, "duplicates": 0}
     assert hasattr(fake_db, "data")
     assert len(fake_db.data) == 1
+    # Rows without a precomputed key fall back to the content hash.
+    assert fake_db.data[0][-1] == message_key("AAPL", "2025-02-27 08:36:59", "Test")
 
 def test_cleanup_old_files(tmp_path):
     # Create dummy CSV file with an old timestamp in the filename.
@@ -191,37 +521,93 @@ def test_cleanup_old_files(tmp_path):
     finally:
         sentiment_scraper.BASE_DATA_DIR = original_base
 
-def test_single_ticker_scrape(monkeypatch):
+def test_single_ticker_scrape(monkeypatch, tmp_path):
     # Patch out functions that do network and Selenium work.
     fake_summary = "Test Summary"
     fake_processed = [{"ticker": "AAPL", "sentiment_category": "Bullish", "text": "Test", "timestamp": "2025-02-27 08:36:59",
                         "textblob_sentiment_tb": 0.1, "textblob_sentiment_vader": 0.2}]
     monkeypatch.setattr("sentiment_scraper.get_ephemeral_driver", lambda: MagicMock())
     monkeypatch.setattr("sentiment_scraper.load_cookies", lambda driver: False)
-    monkeypatch.setattr("sentiment_scraper.scroll_and_collect", lambda driver: "<html></html>")
-    monkeypatch.setattr("sentiment_scraper.extract_messages", lambda html: [{
+    monkeypatch.setattr("sentiment_scraper.driver_pool", DriverPool(size=1))
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    monkeypatch.setattr("sentiment_scraper.iter_message_batches", lambda driver, timings=None, hwm=None, ticker=None, spam_pending=None: iter([[{
         "timestamp": "2025-02-27T08:36:59Z",
         "content": "Test message"
-    }])
-    monkeypatch.setattr("sentiment_scraper.analyze_sentiments_advanced", lambda text: (0.1, 0.2, 0.3, "Bullish"))
-    # Patch bulk_save and CSV functions to do nothing.
-    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda data: None)
+    }]]))
+    monkeypatch.setattr("sentiment_scraper.analyze_batch", lambda texts: BatchScores(
+        [0.1] * len(texts), [0.2] * len(texts), [0.3] * len(texts), ["Bullish"] * len(texts)))
+    # Patch bulk_save and CSV functions to succeed without side effects.
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda data: {"inserted": len(data), "duplicates": 0})
     monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", lambda data: None)
     monkeypatch.setattr("sentiment_scraper.cleanup_old_files", lambda ticker, days=7: None)
     summary, processed = single_ticker_scrape("AAPL")
     assert "AAPL" in summary
-    assert isinstance(processed, list)
+    assert isinstance(processed, Counter)
     # At least one message should be processed.
-    assert len(processed) >= 1
+    assert processed["Bullish"] >= 1
+
+def test_driver_pool_reuses_warm_session(pooled_drivers):
+    pool = DriverPool(size=1, max_uses=5, max_memory_mb=100)
+    with pool.session() as first:
+        pass
+    with pool.session() as second:
+        pass
+    assert first is second
+    assert len(pooled_drivers) == 1
+
+def test_driver_pool_recycles_worn_out_and_broken_sessions(pooled_drivers):
+    pool = DriverPool(size=1, max_uses=1, max_memory_mb=100)
+    with pool.session():
+        pass
+    # max_uses=1 -> the first driver is quit after a single scrape
+    pooled_drivers[0].quit.assert_called_once()
+    with pytest.raises(RuntimeError):
+        with pool.session():
+            raise RuntimeError("scrape failed")
+    pooled_drivers[1].quit.assert_called_once()
+    assert len(pooled_drivers) == 2
+
+def test_driver_pool_recycles_on_memory_ceiling(pooled_drivers):
+    pool = DriverPool(size=1, max_uses=10, max_memory_mb=100)
+    with pool.session():
+        pass
+    # Simulate chromedriver + Chrome growing past the RSS ceiling between scrapes.
+    pooled_drivers[0].rss_mb = 200
+    with pool.session() as driver:
+        assert driver is pooled_drivers[1]
+    pooled_drivers[0].quit.assert_called_once()
+
+def test_driver_pool_memory_sums_the_browser_process_tree(monkeypatch):
+    mb = 1024 * 1024
+    chrome = MagicMock(**{"memory_info.return_value.rss": 300 * mb})
+    renderer = MagicMock(**{"memory_info.return_value.rss": 250 * mb})
+    chromedriver = MagicMock(**{"memory_info.return_value.rss": 20 * mb, "children.return_value": [chrome, renderer]})
+    monkeypatch.setattr("sentiment_scraper.psutil.Process", lambda pid: chromedriver)
+    assert DriverPool()._memory_mb(MagicMock()) == 570
+
+def test_driver_pool_counts_uses_across_threads(pooled_drivers):
+    pool = DriverPool(size=3, max_uses=10_000, max_memory_mb=100)
+
+    def worker():
+        for _ in range(200):
+            with pool.session():
+                pass
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(pool._uses.values()) == 8 * 200
+    assert len(pool._idle) == len(pooled_drivers) <= 3
 
 @pytest.mark.asyncio
 async def test_run_multi_ticker_scraper(monkeypatch):
     # Patch single_ticker_scrape to return a fixed summary and data.
-    async def fake_to_thread(func, ticker):
-        return ("Fake Summary", [{"ticker": ticker, "sentiment_category": "Bullish", "text": "Test",
-                                  "timestamp": "2025-02-27 08:36:59", "textblob_sentiment_tb": 0.1,
-                                  "textblob_sentiment_vader": 0.2}])
+    async def fake_to_thread(func, ticker, deadline=None):
+        return ("Fake Summary", Counter({"Bullish": 1}))
     monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
+    monkeypatch.setattr("sentiment_scraper.FETCH_BACKEND", "selenium")
     # Run the async generator for one iteration.
     gen = run_multi_ticker_scraper(tickers=["AAPL"], interval_minutes=0, run_duration_hours=0.001)
     embeds = []
@@ -229,3 +615,214 @@ async def test_run_multi_ticker_scraper(monkeypatch):
         embeds.append(embed)
     # Ensure we get at least one embed.
     assert len(embeds) >= 1
+
+@pytest.mark.asyncio
+async def test_scrape_tickers_concurrently_keeps_order_and_isolates_timeouts(monkeypatch):
+    in_flight = 0
+    peak = 0
+    async def fake_to_thread(func, ticker, deadline=None):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later tickers finish first; SLOW never finishes within the timeout.
+        await asyncio.sleep(10 if ticker == "SLOW" else 0.01 * (4 - len(ticker)))
+        in_flight -= 1
+        return (f"{ticker} Summary", Counter({"Bullish": 1}))
+    monkeypatch.setattr("asyncio.to_thread", fake_to_thread)
+    results = await scrape_tickers_concurrently(["A", "BB", "SLOW", "CCC"], max_concurrency=2, timeout=0.2)
+    summaries = [summary for summary, _ in results]
+    assert summaries[0] == "A Summary"
+    assert summaries[1] == "BB Summary"
+    assert "Timed out" in summaries[2] and not results[2][1]
+    assert summaries[3] == "CCC Summary"
+    assert peak <= 2
+
+@pytest.mark.asyncio
+async def test_timed_out_scrape_quits_hung_driver_and_frees_its_slot(monkeypatch, pooled_drivers, tmp_path):
+    import sentiment_scraper
+    make_driver = sentiment_scraper.get_ephemeral_driver
+    def driver_that_hangs_first():
+        driver = make_driver()
+        if len(pooled_drivers) == 1:
+            # driver.get blocks like a wedged page load until the session is quit.
+            quit_called = threading.Event()
+            def hang(url):
+                quit_called.wait(10)
+                raise WebDriverException("session deleted")
+            driver.get.side_effect = hang
+            driver.quit.side_effect = lambda: quit_called.set()
+        return driver
+    monkeypatch.setattr("sentiment_scraper.get_ephemeral_driver", driver_that_hangs_first)
+    monkeypatch.setattr("sentiment_scraper.driver_pool", DriverPool(size=1))
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    monkeypatch.setattr("sentiment_scraper.PAGE_READY_TIMEOUT", 0)
+    monkeypatch.setattr("sentiment_scraper.stream_message_batches", lambda driver, *args: iter([]))
+    results = await scrape_tickers_concurrently(["HUNG", "NEXT"], max_concurrency=1, timeout=0.5)
+    # Either the caller's timeout or the driver quit at the deadline ends HUNG first.
+    assert "HUNG" in results[0][0] and not results[0][1]
+    # The hung driver was quit at the deadline, so NEXT got the only slot on a fresh driver.
+    assert "NEXT" in results[1][0] and "Timed out" not in results[1][0]
+    assert pooled_drivers[0].quit.called
+    assert len(pooled_drivers) == 2 and pooled_drivers[1].get.called
+
+def test_driver_pool_acquire_times_out_when_exhausted(pooled_drivers):
+    pool = DriverPool(size=1)
+    pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+
+@pytest.mark.asyncio
+async def test_http_ticker_scrape_scores_fetched_messages(monkeypatch, tmp_path):
+    from sentiment_scraper import spam_detector
+    spam_detector.clear()
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    monkeypatch.setattr("sentiment_scraper.analyze_batch", lambda texts: BatchScores(
+        [0.1] * len(texts), [0.2] * len(texts), [0.3] * len(texts), ["Bullish"] * len(texts)))
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda data: {"inserted": len(data), "duplicates": 0})
+    monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", lambda data: None)
+    monkeypatch.setattr("sentiment_scraper.cleanup_old_files", lambda ticker, days=7: None)
+    selenium = MagicMock()
+    monkeypatch.setattr("sentiment_scraper.single_ticker_scrape", selenium)
+    fetcher = MagicMock()
+    async def fetch_messages(ticker, high_water_mark=None):
+        return [{"timestamp": "2025-02-27T08:36:59Z", "content": "Fetched over http", "message_id": "1"}]
+    fetcher.fetch_messages = fetch_messages
+    summary, processed = await http_ticker_scrape(fetcher, "AAPL")
+    assert "AAPL" in summary
+    assert processed == Counter({"Bullish": 1})
+    selenium.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_http_ticker_scrape_falls_back_to_selenium(monkeypatch):
+    monkeypatch.setattr("sentiment_scraper.single_ticker_scrape", lambda ticker, deadline=None: (f"{ticker} via Selenium", []))
+    fetcher = MagicMock()
+    async def fetch_messages(ticker, high_water_mark=None):
+        raise ValueError("Empty message stream")
+    fetcher.fetch_messages = fetch_messages
+    summary, processed = await http_ticker_scrape(fetcher, "AAPL")
+    assert summary == "AAPL via Selenium"
+
+def test_score_messages_uses_cascade_when_enabled(monkeypatch):
+    import sentiment_scraper
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    escalated = []
+    def escalate(texts):
+        escalated.extend(texts)
+        return [("Bearish", 0.9) for _ in texts]
+    scorer = sentiment_scraper.enable_cascade_scoring(escalate, band=2.0)
+    rows = sentiment_scraper.score_messages("AAPL", [{"timestamp": "2025-02-27T08:36:59Z", "content": "Great quarter"}])
+    assert escalated == ["Great quarter"]
+    assert rows[0]["sentiment_category"] == "Bearish"
+    assert scorer.stats()["escalated"] == 1
+
+def test_score_messages_assigns_message_keys(monkeypatch):
+    import sentiment_scraper
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    rows = sentiment_scraper.score_messages("AAPL", [
+        {"timestamp": "2025-02-27T08:36:59Z", "content": "Great quarter", "message_id": "601"},
+        {"timestamp": "2025-02-27T09:00:00Z", "content": "Weak guidance"},
+    ])
+    assert rows[0]["message_key"] == message_key("AAPL", "2025-02-27 08:36:59", "Great quarter")
+    assert rows[1]["message_key"] == message_key("AAPL", "2025-02-27 09:00:00", "Weak guidance")
+
+def test_same_message_over_html_and_json_is_stored_once(monkeypatch, tmp_path):
+    from message_parser import parse_messages_html
+    from stocktwits_http import parse_stream_json
+    fake_scores(monkeypatch)
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    stored = {}
+    class UniqueKeyDB:
+        def bulk_insert_sentiment(self, data):
+            new = [record for record in data if record[-1] not in stored]
+            stored.update((record[-1], record) for record in new)
+            return {"inserted": len(new), "duplicates": len(data) - len(new)}
+    monkeypatch.setattr("sentiment_scraper.db", UniqueKeyDB())
+    html = """
+    <a href="/AAPL/message/601"><time datetime="2025-02-27T08:36:59.000Z"></time></a>
+    <div class="RichTextMessage_body__4qUeP">$AAPL <span>beat</span> on <a href="/symbol/AAPL">$AAPL</a>!</div>
+    """
+    payload = {"messages": [{"id": 601, "body": "$AAPL beat on $AAPL!", "created_at": "2025-02-27T08:36:59Z"}]}
+    html_messages = [row for row in parse_messages_html(html) if row["content"]]
+    json_messages = parse_stream_json(payload)
+    assert html_messages[0]["message_id"] == json_messages[0]["message_id"] == "601"
+    for messages in (html_messages, json_messages):
+        ingest = TickerIngest("AAPL")
+        ingest.add(messages)
+        ingest.finish()
+    assert len(stored) == 1
+
+def test_score_messages_skips_seen_messages(monkeypatch, tmp_path):
+    import sentiment_scraper
+    from seen_filter import SeenFilter
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    monkeypatch.setattr("sentiment_scraper.seen_filter", SeenFilter(tmp_path))
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda rows: {"inserted": len(rows), "duplicates": 0})
+    monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", lambda data: None)
+    monkeypatch.setattr("sentiment_scraper.cleanup_old_files", lambda ticker, days=7: None)
+    messages = [
+        {"timestamp": "2025-02-27T08:36:59Z", "content": "Great quarter", "message_id": "601"},
+        {"timestamp": "2025-02-27T09:00:00Z", "content": "Weak guidance"},
+    ]
+    ingest = TickerIngest("AAPL")
+    ingest.add(messages)
+    assert sum(ingest.finish()[1].values()) == 2
+    # A restart reopens the same files and still skips both.
+    sentiment_scraper.seen_filter.close()
+    monkeypatch.setattr("sentiment_scraper.seen_filter", SeenFilter(tmp_path))
+    assert sentiment_scraper.score_messages("AAPL", messages) == []
+    assert len(sentiment_scraper.score_messages("TSLA", messages)) == 2
+    assert sentiment_scraper.seen_filter.stats()["skipped_by_ticker"] == {"AAPL": 2, "TSLA": 0}
+
+def test_failed_save_leaves_messages_unseen(monkeypatch, tmp_path):
+    import sentiment_scraper
+    from seen_filter import SeenFilter
+    fake_scores(monkeypatch)
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    monkeypatch.setattr("sentiment_scraper.seen_filter", SeenFilter(tmp_path / "seen"))
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    messages = feed(1000, 3)
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment", lambda rows: None)
+    ingest = TickerIngest("AAPL")
+    ingest.add(messages)
+    ingest.finish()
+    # The next run scores and saves the same messages again.
+    saved = []
+    monkeypatch.setattr("sentiment_scraper.bulk_save_sentiment",
+                        lambda rows: saved.extend(rows) or {"inserted": len(rows), "duplicates": 0})
+    ingest = TickerIngest("AAPL")
+    ingest.add(messages)
+    ingest.finish()
+    assert len(saved) == 3
+    assert sentiment_scraper.score_messages("AAPL", messages) == []
+
+def test_spam_window_keeps_only_saved_messages(monkeypatch, tmp_path):
+    from sentiment_scraper import process_fetched_messages, spam_detector
+    spam_detector.clear()
+    fake_scores(monkeypatch)
+    monkeypatch.setattr("sentiment_scraper.cascade_scorer", None)
+    monkeypatch.setattr("sentiment_scraper.high_water_marks", HighWaterMarkStore(tmp_path / "marks.json"))
+    written = []
+    monkeypatch.setattr("sentiment_scraper.append_to_csv_by_ticker_and_sentiment", written.extend)
+    db = MagicMock()
+    db.bulk_insert_sentiment.side_effect = [Exception("connection lost"), {"inserted": 5, "duplicates": 0}]
+    monkeypatch.setattr("sentiment_scraper.db", db)
+    posts = ["Earnings beat, raising my target", "Delivery numbers look weak this quarter",
+             "Loading calls before the split", "Margins keep shrinking, selling here", "New factory opens next month"]
+    messages = [dict(msg, content=post) for msg, post in zip(feed(1000, 5), posts)]
+    # Within one fetch a near-duplicate is still dropped.
+    messages.append({"timestamp": "2025-02-27T08:00:00Z", "content": posts[0] + "!"})
+    summary, counts = process_fetched_messages("TSLA", messages)
+    assert not counts and "failed" in summary
+    assert written == []
+    # The retry stores the same messages instead of flagging them as spam.
+    summary, counts = process_fetched_messages("TSLA", messages)
+    assert counts == Counter({"Bullish": 5})
+    assert db.bulk_insert_sentiment.call_count == 2
+    assert len(written) == 5
+    assert spam_detector.stats()["window_sizes"]["TSLA"] == 5
+    # Once saved, they are spam for the next fetch.
+    summary, counts = process_fetched_messages("TSLA", messages)
+    assert not counts
+    assert db.bulk_insert_sentiment.call_count == 2
@@ -0,0 +1,112 @@
+import os
+import random
+import sys
+from difflib import SequenceMatcher
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from spam_index import NearDuplicateIndex, SpamDetector
+
+PUMP = "massive short squeeze incoming on abcd target 40 dollars load up now"
+
+def test_flags_exact_and_near_duplicates():
+    index = NearDuplicateIndex(threshold=0.85)
+    assert index.check_and_add(PUMP) is False
+    assert index.check_and_add(PUMP) is True
+    assert index.check_and_add(PUMP.replace("40", "45") + "!!") is True
+    assert len(index) == 1
+
+def test_unrelated_text_is_not_flagged():
+    index = NearDuplicateIndex(threshold=0.85)
+    index.add(PUMP)
+    assert index.check_and_add("earnings beat on revenue and margins, guidance raised for the year") is False
+    assert len(index) == 2
+
+def test_threshold_override():
+    index = NearDuplicateIndex(threshold=0.99)
+    index.add(PUMP)
+    variant = PUMP.replace("40", "45")
+    assert index.is_similar(variant) is False
+    assert index.is_similar(variant, threshold=0.9) is True
+
+def test_window_evicts_oldest():
+    index = NearDuplicateIndex(threshold=0.85, window=2)
+    index.add(PUMP)
+    index.add("completely different message about dividends and buybacks")
+    index.add("another unrelated note on the weekly chart and support levels")
+    assert len(index) == 2
+    assert index.is_similar(PUMP) is False
+
+def test_evicting_entries_that_share_buckets():
+    index = NearDuplicateIndex(threshold=0.85, window=2)
+    # add() skips the similarity check, so these near-duplicates share LSH buckets.
+    for suffix in ("", "!", "!!"):
+        index.add(PUMP + suffix)
+    assert index.is_similar(PUMP) is True
+    index.add("completely different message about dividends and buybacks")
+    index.add("another unrelated note on the weekly chart and support levels")
+    assert index.is_similar(PUMP) is False
+    # Each band holds exactly the two live entries; evicted ids left no stale members.
+    members = [member for bucket in index._buckets for value in bucket.values()
+               for member in (value if isinstance(value, list) else [value])]
+    assert len(members) == 2 * index.bands
+    assert set(members) == set(index._entries)
+
+def test_clear_resets_window():
+    index = NearDuplicateIndex()
+    index.add(PUMP)
+    index.clear()
+    assert len(index) == 0
+    assert index.is_similar(PUMP) is False
+
+def test_agrees_with_exhaustive_scan():
+    rng = random.Random(3)
+    words = "tsla calls puts moon dump squeeze buy sell hold beat miss earnings chart red green".split()
+    feed = []
+    for _ in range(300):
+        if rng.random() < 0.3:
+            feed.append(PUMP.replace("40", str(rng.randint(10, 99))))
+        else:
+            feed.append(" ".join(rng.choice(words) for _ in range(rng.randint(5, 15))))
+
+    index = NearDuplicateIndex(threshold=0.85)
+    window = []
+    for message in feed:
+        expected = any(SequenceMatcher(None, message, recent).ratio() > 0.85 for recent in window)
+        assert index.check_and_add(message) == expected, message
+        if not expected:
+            window.append(message)
+
+def test_max_age_expires_old_messages():
+    now = [0.0]
+    index = NearDuplicateIndex(threshold=0.85, max_age=60, clock=lambda: now[0])
+    index.add(PUMP)
+    now[0] = 59
+    assert index.is_similar(PUMP) is True
+    now[0] = 61
+    assert index.is_similar(PUMP) is False
+    assert len(index) == 0
+
+def test_spam_detector_windows_are_per_ticker_and_time_based():
+    now = [0.0]
+    detector = SpamDetector(threshold=0.85, window_hours=1, clock=lambda: now[0])
+    assert detector.is_spam(PUMP, "TSLA") is False
+    assert detector.is_spam(PUMP, "SPY") is False
+    assert detector.is_spam(PUMP + "!", "TSLA") is True
+    assert detector.is_spam("Hi", "TSLA") is False
+    now[0] = 3601
+    assert detector.is_spam(PUMP, "TSLA") is False
+    stats = detector.stats()
+    assert (stats["checked"], stats["flagged"]) == (4, 1)
+    assert stats["window_sizes"] == {"TSLA": 1, "SPY": 1}
+
+def test_spam_detector_records_pending_messages_only_when_asked():
+    detector = SpamDetector(threshold=0.85)
+    pending = detector.pending_index()
+    assert detector.is_spam(PUMP, "TSLA", pending=pending) is False
+    assert detector.is_spam(PUMP + "!", "TSLA", pending=pending) is True
+    # Nothing reached the window, so a fresh scrape may keep the message.
+    assert detector.is_spam(PUMP, "TSLA", pending=detector.pending_index()) is False
+    detector.record([PUMP], "TSLA")
+    assert detector.is_spam(PUMP, "TSLA", pending=detector.pending_index()) is True
+    assert detector.stats()["window_sizes"] == {"TSLA": 1}
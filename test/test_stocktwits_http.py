@@ -0,0 +1,142 @@
+import os
+import sys
+import logging
+from datetime import datetime, timedelta
+import pytest
+from unittest.mock import MagicMock
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from stocktwits_http import StocktwitsHttpFetcher, parse_stream_json
+
+# ------------------ Local stand-in for the Stocktwits stream API ------------------
+
+STREAMS = {
+    "TSLA": {"messages": [
+        {"id": 602, "body": "$TSLA breaking out", "created_at": "2025-02-27T09:00:00Z"},
+        {"id": 601, "body": "$TSLA looks weak here", "created_at": "2025-02-27T08:36:59Z"},
+    ]},
+    "EMPTY": {"messages": []},
+}
+
+# 100 messages, ids 1000..901, one minute apart, served 30 per page.
+DEEP_STREAM = [
+    {"id": 1000 - i, "body": f"$DEEP post {i}",
+     "created_at": (datetime(2025, 2, 27, 10) - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%SZ")}
+    for i in range(100)
+]
+PAGE_SIZE = 30
+
+HTML_PAGE = """
+<html><body>
+  <a href="/SPY/message/9"><time datetime="2025-02-27T08:36:59Z"></time></a>
+  <div class="RichTextMessage_body__4qUeP">$SPY from html</div>
+</body></html>
+"""
+
+def create_stub_app(peers, queries=None):
+    """
+    aiohttp app serving canned symbol streams; records each request's client
+    address in `peers` and its query string in `queries`.
+    """
+    app = web.Application()
+
+    async def stream(request):
+        peers.append(request.transport.get_extra_info("peername"))
+        if queries is not None:
+            queries.append(dict(request.query))
+        ticker = request.match_info["ticker"]
+        if ticker == "SPY":
+            return web.Response(text=HTML_PAGE, content_type="text/html")
+        if ticker == "DEEP":
+            # Like the real API: `max` returns messages with id <= max, newest first.
+            max_id = int(request.query.get("max", 10 ** 9))
+            older = [m for m in DEEP_STREAM if m["id"] <= max_id]
+            page = older[:PAGE_SIZE]
+            return web.json_response({"messages": page, "cursor": {"more": len(older) > PAGE_SIZE,
+                                                                   "max": page[-1]["id"] if page else None}})
+        if ticker not in STREAMS:
+            raise web.HTTPNotFound()
+        return web.json_response(STREAMS[ticker])
+
+    app.router.add_get("/api/2/streams/symbol/{ticker}.json", stream)
+    return app
+
+@pytest.fixture
+def peers():
+    return []
+
+@pytest.fixture
+def queries():
+    return []
+
+@pytest.fixture
+async def stub_server(peers, queries):
+    server = TestServer(create_stub_app(peers, queries))
+    await server.start_server()
+    yield server
+    await server.close()
+
+@pytest.fixture
+async def fetcher(stub_server):
+    url_template = str(stub_server.make_url("/api/2/streams/symbol/{ticker}.json")).replace("%7B", "{").replace("%7D", "}")
+    fetcher = StocktwitsHttpFetcher(MagicMock(spec=logging.Logger), cookies={"session": "dummy"}, url_template=url_template)
+    yield fetcher
+    await fetcher.close()
+
+# ------------------ Tests ------------------
+
+def test_parse_stream_json():
+    assert parse_stream_json(STREAMS["TSLA"]) == [
+        {"timestamp": "2025-02-27T09:00:00Z", "content": "$TSLA breaking out", "message_id": "602"},
+        {"timestamp": "2025-02-27T08:36:59Z", "content": "$TSLA looks weak here", "message_id": "601"},
+    ]
+
+async def test_fetch_json_stream(fetcher):
+    messages = await fetcher.fetch_messages("TSLA")
+    assert [m["message_id"] for m in messages] == ["602", "601"]
+
+async def test_fetch_html_stream(fetcher):
+    messages = await fetcher.fetch_messages("SPY")
+    assert messages == [{"timestamp": "2025-02-27T08:36:59Z", "content": "$SPY from html", "message_id": "9"}]
+
+async def test_connection_is_kept_alive_across_tickers(fetcher, peers):
+    await fetcher.fetch_messages("TSLA")
+    await fetcher.fetch_messages("TSLA")
+    await fetcher.fetch_messages("SPY")
+    assert len(peers) == 3
+    assert len(set(peers)) == 1
+
+async def test_http_errors_and_empty_streams_raise(fetcher):
+    with pytest.raises(aiohttp.ClientResponseError):
+        await fetcher.fetch_messages("UNKNOWN")
+    with pytest.raises(ValueError, match="Empty message stream"):
+        await fetcher.fetch_messages("EMPTY")
+
+async def test_fetch_pages_back_to_high_water_mark(fetcher, queries):
+    # The mark (id 935) sits on the third page (ids 942..913).
+    mark = DEEP_STREAM[65]["created_at"]
+    messages = await fetcher.fetch_messages("DEEP", high_water_mark=mark)
+    assert queries == [{}, {"max": "971"}, {"max": "942"}]
+    ids = [int(m["message_id"]) for m in messages]
+    assert ids == list(range(1000, 912, -1))  # newest first, no repeats
+
+async def test_fetch_without_mark_stops_at_page_cap(fetcher, queries):
+    fetcher.max_pages = 2
+    messages = await fetcher.fetch_messages("DEEP")
+    assert len(queries) == 2
+    assert len(messages) == 2 * PAGE_SIZE - 1
+
+async def test_fetch_raises_when_page_cap_hits_before_mark(fetcher):
+    fetcher.max_pages = 2
+    with pytest.raises(ValueError, match="without reaching its high-water mark"):
+        await fetcher.fetch_messages("DEEP", high_water_mark=DEEP_STREAM[90]["created_at"])
+
+async def test_fetch_stops_at_end_of_stream(fetcher, queries):
+    fetcher.max_pages = 10
+    messages = await fetcher.fetch_messages("DEEP")
+    assert len(messages) == len(DEEP_STREAM)
+    assert len(queries) == 4
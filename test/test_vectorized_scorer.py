@@ -0,0 +1,91 @@
+import os
+import sys
+import random
+import re
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sentiment_engine import get_engine
+from vectorized_scorer import VectorizedScorer
+
+TB_TOLERANCE = 1e-9
+VADER_TOLERANCE = 1e-4  # VADER rounds compound scores to 4 decimals
+
+TRICKY = [
+    "",
+    "good",
+    "The stock is not good",
+    "not a good quarter",
+    "really not good",
+    "very not good",
+    "very good but the guidance is terrible",
+    "great great but bad bad",
+    "TSLA is VERY GOOD today",
+    "ALL CAPS GOOD NEWS",
+    "no good deals",
+    "no or bad news",
+    "never so good",
+    "without a doubt excellent idea",
+    "at least it is good",
+    "the least compelling pitch",
+    "least good",
+    "kind of good",
+    "the shit",
+    "Make sure you x D today",
+    "Good guidance, great margins!",
+    "absolutely amazing earnings extremely bullish",
+    "barely profitable slightly disappointing",
+    "TSLA 420 calls printing",
+    "I I a a good",
+]
+
+def scalar(texts):
+    engine = get_engine()
+    return np.array([engine.analyze(text)[:3] for text in texts]), [engine.analyze(text)[3] for text in texts]
+
+def random_corpus(n, seed=0):
+    engine = get_engine()
+    rng = random.Random(seed)
+    pool = [w for w in engine.vader.lexicon if w.isalnum()][:3000] + [
+        "no", "not", "never", "but", "so", "this", "without", "doubt", "least", "at", "very", "or", "nor",
+        "really", "absolutely", "seriously", "a", "I", "the", "TSLA", "123", "x", "D",
+    ] * 5
+    texts = []
+    for _ in range(n):
+        words = [rng.choice(pool) for _ in range(rng.randint(0, 14))]
+        words = [w.upper() if rng.random() < 0.1 else w for w in words]
+        text = re.sub(r"[^a-zA-Z0-9\s]", "", " ".join(words))
+        texts.append(re.sub(r"\s+", " ", text).strip())
+    return texts
+
+@pytest.fixture(scope="module")
+def scorer():
+    return VectorizedScorer()
+
+@pytest.mark.parametrize("texts", [TRICKY, random_corpus(2000)], ids=["tricky", "random"])
+def test_matches_scalar_path_within_tolerance(scorer, texts):
+    scores = scorer.score(texts)
+    reference, categories = scalar(texts)
+    np.testing.assert_allclose(scores.textblob, reference[:, 0], atol=TB_TOLERANCE)
+    np.testing.assert_allclose(scores.vader, reference[:, 1], atol=VADER_TOLERANCE)
+    np.testing.assert_allclose(scores.final, reference[:, 2], atol=VADER_TOLERANCE)
+    assert list(scores.category) == categories
+
+def test_chunking_does_not_change_results(scorer):
+    texts = random_corpus(500, seed=1)
+    chunked = VectorizedScorer(chunk_size=37).score(texts)
+    whole = scorer.score(texts)
+    np.testing.assert_array_equal(chunked.final, whole.final)
+    np.testing.assert_array_equal(chunked.category, whole.category)
+
+def test_unclean_text_falls_back_to_scalar(scorer):
+    texts = ["Love it :) !!!", "kind of meh", "plain clean text"]
+    assert [scorer.needs_fallback(text) for text in texts] == [True, True, False]
+    reference, _ = scalar(texts)
+    np.testing.assert_allclose(scorer.score(texts).vader, reference[:, 1], atol=VADER_TOLERANCE)
+
+def test_empty_input(scorer):
+    scores = scorer.score([])
+    assert len(scores.final) == 0 and len(scores.category) == 0
@@ -0,0 +1,284 @@
+import re
+
+import numpy as np
+from textblob._text import RE_EMOTICONS
+from textblob.en import sentiment as pattern_sentiment
+from vaderSentiment.vaderSentiment import (
+    BOOSTER_DICT,
+    C_INCR,
+    N_SCALAR,
+    NEGATE,
+    SPECIAL_CASES,
+    SentimentIntensityAnalyzer,
+)
+
+from sentiment_engine import (
+    BEARISH_THRESHOLD,
+    BULLISH_THRESHOLD,
+    TEXTBLOB_WEIGHT,
+    VADER_WEIGHT,
+    BatchScores,
+    get_engine,
+)
+
+# The vectorized rules assume clean_text() output: ASCII letters, digits and
+# single spaces. Anything else, and the rare multi-word idioms/boosters and
+# spaced-out emoticons that need n-gram matching, is scored by the scalar engine.
+CLEAN_TEXT = re.compile(r"[A-Za-z0-9 ]*")
+PHRASES = re.compile(
+    r"\b(?:%s)\b" % "|".join(
+        re.escape(phrase) for phrase in sorted(list(SPECIAL_CASES) + list(BOOSTER_DICT)) if " " in phrase
+    )
+)
+# Words the VADER rules look for by position ("no good", "never so good", "at least", ...).
+CONTEXT_WORDS = ("no", "or", "nor", "never", "so", "this", "without", "doubt", "least", "at", "very", "but")
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def _shift(values, k, valid, fill):
+    """values[t - k] where the token k places back is in the same message, else `fill`."""
+    shifted = np.full_like(values, fill)
+    if k < len(values):
+        shifted[k:] = values[:-k] if k else values
+    return np.where(valid, shifted, fill)
+
+
+class VectorizedScorer:
+    """
+    Bulk TextBlob + VADER scorer that works on whole message arrays.
+
+    A chunk of messages is tokenized once. Each distinct token is mapped
+    through a vocabulary index, built once from both lexicons, to per-word
+    feature arrays. VADER's windowed rules (boosters, negation, caps emphasis,
+    "but", "least") and TextBlob's modifier/negation chains are then applied as
+    NumPy operations over the flat token array. The 0.4/0.6 blend and category
+    thresholds are the ones analyze_sentiments_advanced uses. Scores match the
+    scalar path to within rounding; see test_vectorized_scorer.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        engine = get_engine()
+        self._fallback = engine.analyze
+        vader_lexicon = engine.vader.lexicon
+        len(pattern_sentiment)  # lazydict: loads the pattern lexicon
+        tb_negations = set(pattern_sentiment.negations)
+
+        words = {w for w in vader_lexicon if w.isalnum()}
+        words |= {w for w in BOOSTER_DICT if w.isalnum()}
+        words |= {w for w in NEGATE if w.isalnum()}
+        words |= {w for w in dict.keys(pattern_sentiment) if w.isalnum()}
+        words |= set(CONTEXT_WORDS) | tb_negations
+        vocab = sorted(words)
+        self.vocab = {word: i for i, word in enumerate(vocab)}
+        self.unknown_id = len(vocab)
+
+        size = len(vocab) + 1  # last slot: out-of-vocabulary
+        self.vd_in_lexicon = np.zeros(size, bool)
+        self.vd_valence = np.zeros(size)
+        self.is_booster = np.zeros(size, bool)
+        self.booster = np.zeros(size)
+        self.vd_negate = np.zeros(size, bool)
+        self.tb_known = np.zeros(size, bool)
+        self.tb_polarity = np.zeros(size)
+        self.tb_intensity = np.ones(size)
+        self.tb_modifier = np.zeros(size, bool)
+        self.tb_ly = np.zeros(size, bool)
+        self.tb_negation = np.zeros(size, bool)
+        for word, i in self.vocab.items():
+            if word in vader_lexicon:
+                self.vd_in_lexicon[i] = True
+                self.vd_valence[i] = vader_lexicon[word]
+            if word in BOOSTER_DICT:
+                self.is_booster[i] = True
+                self.booster[i] = BOOSTER_DICT[word]
+            self.vd_negate[i] = word in NEGATE
+            entry = dict.get(pattern_sentiment, word)
+            if entry is not None:
+                self.tb_known[i] = True
+                self.tb_polarity[i], _, self.tb_intensity[i] = entry[None]
+                self.tb_modifier[i] = any(pos in entry for pos in pattern_sentiment.modifiers)
+            self.tb_ly[i] = word.endswith("ly")
+            self.tb_negation[i] = word in tb_negations
+        self.ids = {word: self.vocab[word] for word in CONTEXT_WORDS}
+
+    def needs_fallback(self, text):
+        return (
+            CLEAN_TEXT.fullmatch(text) is None
+            or "  " in text
+            or PHRASES.search(text.lower()) is not None
+            or RE_EMOTICONS.search(text) is not None
+        )
+
+    def score(self, texts):
+        """
+        Scores `texts`, returning BatchScores of NumPy arrays in input order.
+        """
+        texts = list(texts)
+        if not texts:
+            return BatchScores(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros(0, dtype="<U7"))
+        parts = [self._score_chunk(texts[i:i + self.chunk_size]) for i in range(0, len(texts), self.chunk_size)]
+        tb = np.concatenate([p[0] for p in parts])
+        vd = np.concatenate([p[1] for p in parts])
+        final = TEXTBLOB_WEIGHT * tb + VADER_WEIGHT * vd
+        category = np.where(final > BULLISH_THRESHOLD, "Bullish", np.where(final < BEARISH_THRESHOLD, "Bearish", "Neutral"))
+        return BatchScores(tb, vd, final, category)
+
+    def _score_chunk(self, texts):
+        n_msgs = len(texts)
+        fallback = [i for i, text in enumerate(texts) if self.needs_fallback(text)]
+        skip = set(fallback)
+
+        # Tokenize once; each distinct token is looked up in the vocabulary once.
+        local = {}
+        token_index = []
+        lengths = np.zeros(n_msgs, np.int64)
+        for m, text in enumerate(texts):
+            if m in skip:
+                continue
+            tokens = text.split()
+            lengths[m] = len(tokens)
+            token_index.extend(local.setdefault(token, len(local)) for token in tokens)
+
+        distinct = list(local)
+        distinct_id = np.array([self.vocab.get(t.lower(), self.unknown_id) for t in distinct], np.int64)
+        distinct_upper = np.array([t.isupper() for t in distinct], bool)
+        distinct_len = np.array([len(t) for t in distinct], np.int64)
+
+        token_index = np.array(token_index, np.int64)
+        ids = distinct_id[token_index] if len(token_index) else np.zeros(0, np.int64)
+        upper = distinct_upper[token_index] if len(token_index) else np.zeros(0, bool)
+        length = distinct_len[token_index] if len(token_index) else np.zeros(0, np.int64)
+
+        msg = np.repeat(np.arange(n_msgs), lengths)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        pos = np.arange(len(ids)) - starts[msg]
+        msg_len = lengths[msg]
+
+        vd = self._vader(ids, upper, msg, pos, msg_len, n_msgs)
+        tb = self._textblob(ids, length, msg, starts[msg], n_msgs)
+
+        for i in fallback:
+            tb[i], vd[i], _, _ = self._fallback(texts[i])
+        return tb, vd
+
+    def _vader(self, ids, upper, msg, pos, msg_len, n_msgs):
+        unk = self.unknown_id
+        in_lex = self.vd_in_lexicon[ids]
+        lex_val = self.vd_valence[ids]
+        active = in_lex & ~self.is_booster[ids]
+        prev = [None] + [_shift(ids, k, pos >= k, unk) for k in (1, 2, 3)]
+        prev_upper = [None] + [_shift(upper, k, pos >= k, False) for k in (1, 2, 3)]
+        has_next = pos < msg_len - 1
+        next_ids = np.where(has_next, np.roll(ids, -1), unk)
+
+        n_upper = np.bincount(msg, weights=upper.astype(float), minlength=n_msgs)
+        n_tokens = np.bincount(msg, minlength=n_msgs)
+        cap_diff = ((n_upper > 0) & (n_upper < n_tokens))[msg]
+
+        ids_ = self.ids
+        is_word = lambda arr, *words: np.isin(arr, [ids_[w] for w in words])
+
+        v = np.where(active, lex_val, 0.0)
+        # "no" followed by a lexicon word negates that word instead of scoring itself.
+        v = np.where(active & (ids == ids_["no"]) & has_next & self.vd_in_lexicon[next_ids], 0.0, v)
+        preceded_by_no = (
+            is_word(prev[1], "no") | is_word(prev[2], "no") | (is_word(prev[3], "no") & is_word(prev[1], "or", "nor"))
+        )
+        v = np.where(active & preceded_by_no, lex_val * N_SCALAR, v)
+        caps = active & upper & cap_diff
+        v = np.where(caps, np.where(v > 0, v + C_INCR, v - C_INCR), v)
+
+        for k, damping in ((0, 1.0), (1, 0.95), (2, 0.9)):
+            p = prev[k + 1]
+            step = active & (pos > k) & ~self.vd_in_lexicon[p]
+            s = np.where(v < 0, -self.booster[p], self.booster[p])
+            boost_caps = self.is_booster[p] & prev_upper[k + 1] & cap_diff
+            s = np.where(boost_caps, np.where(v > 0, s + C_INCR, s - C_INCR), s) * damping
+            v = np.where(step, v + s, v)
+
+            if k == 0:
+                v = np.where(step & self.vd_negate[p], v * N_SCALAR, v)
+            elif k == 1:
+                emphasis = is_word(prev[2], "never") & is_word(prev[1], "so", "this")
+                doubt = is_word(prev[2], "without") & is_word(prev[1], "doubt")
+                v = np.where(step & emphasis, v * 1.25, v)
+                v = np.where(step & ~emphasis & ~doubt & self.vd_negate[prev[2]], v * N_SCALAR, v)
+            else:
+                emphasis = (is_word(prev[3], "never") & is_word(prev[2], "so", "this")) | is_word(prev[1], "so", "this")
+                doubt = is_word(prev[3], "without") & (is_word(prev[2], "doubt") | is_word(prev[1], "doubt"))
+                v = np.where(step & emphasis, v * 1.25, v)
+                v = np.where(step & ~emphasis & ~doubt & self.vd_negate[prev[3]], v * N_SCALAR, v)
+
+        least = active & is_word(prev[1], "least") & ~self.vd_in_lexicon[prev[1]]
+        v = np.where(least & (pos > 1) & ~is_word(prev[2], "at", "very"), v * N_SCALAR, v)
+        v = np.where(least & (pos == 1), v * N_SCALAR, v)
+
+        # Contrastive "but": VADER halves what precedes the first one and boosts
+        # what follows, locating entries by value (list.index). Its own routine is
+        # replayed on those messages so repeated valences are treated identically.
+        but_msgs = np.unique(msg[ids == ids_["but"]])
+        msg_start = np.cumsum(n_tokens) - n_tokens
+        for m in but_msgs:
+            start, end = msg_start[m], msg_start[m] + n_tokens[m]
+            words = ["but" if token == ids_["but"] else "" for token in ids[start:end]]
+            v[start:end] = SentimentIntensityAnalyzer._but_check(words, list(v[start:end]))
+
+        total = np.bincount(msg, weights=v, minlength=n_msgs).astype(float)
+        compound = np.clip(total / np.sqrt(total * total + 15), -1.0, 1.0)
+        return np.round(compound, 4)
+
+    def _textblob(self, ids, length, msg, msg_start, n_msgs):
+        known = self.tb_known[ids]
+        negation = self.tb_negation[ids] & ~known
+        short = ~known & (length <= 1)
+        resets_modifier = ~known & (length > 2) & ~negation
+        long_negation = negation & (length > 2)
+        index = np.arange(len(ids))
+
+        def last_before(mask):
+            marked = np.maximum.accumulate(np.where(mask, index, -1))
+            before = np.concatenate([[-1], marked[:-1]]).astype(np.int64)
+            return np.where(before >= msg_start, before, -1)
+
+        # A known adverb modifies the next known word ("very good") unless a
+        # longer unknown word intervenes. An "-ly" modifier followed by a
+        # negation absorbs it ("really not good"); other modifiers are reset by it.
+        last_known = last_before(known)
+        source = np.maximum(last_known, 0)
+        modifier_active = (
+            (last_known >= 0) & self.tb_modifier[ids[source]]
+            & (last_before(resets_modifier) < last_known)
+            & (self.tb_ly[ids[source]] | (last_before(long_negation) < last_known))
+        )
+        absorbed = negation & modifier_active & self.tb_ly[ids[source]]
+        # A negation carries across single-character words to the next known word.
+        last_word = last_before(~short)
+        negated = (last_word >= 0) & negation[np.maximum(last_word, 0)] & ~absorbed[np.maximum(last_word, 0)]
+
+        known_at = np.flatnonzero(known)
+        polarity = np.zeros(n_msgs)
+        if not len(known_at):
+            return polarity
+        joins = modifier_active[known_at]
+        chain = np.cumsum(~joins) - 1
+        chain_of_token = np.full(len(ids), -1)
+        chain_of_token[known_at] = chain
+
+        p = self.tb_polarity[ids]
+        intensity = np.where(negated, 1.0 / self.tb_intensity[ids], self.tb_intensity[ids])
+        prev_known = np.maximum(last_known[known_at], 0)
+        value = np.where(joins, np.clip(p[known_at] * intensity[prev_known], -1.0, 1.0), p[known_at])
+
+        chain_negated = np.zeros(chain[-1] + 1, bool)
+        np.logical_or.at(chain_negated, chain, negated[known_at])
+        chain_negated[chain_of_token[last_known[absorbed]]] = True
+
+        is_last = np.append(chain[1:] != chain[:-1], True)
+        chain_value = value[is_last]
+        chain_value = np.where(chain_negated, chain_value * -0.5, chain_value)
+        chain_msg = msg[known_at[is_last]]
+        sums = np.bincount(chain_msg, weights=chain_value, minlength=n_msgs)
+        counts = np.bincount(chain_msg, minlength=n_msgs)
+        return np.divide(sums, counts, out=polarity, where=counts > 0)
@@ -16,6 +16,7 @@ from sentiment_scraper import (
     is_spam,
     get_stocktwits_url
 )
+from db_handler import get_database_handler
 from sentiment_analysis_discord_bot import (
     load_discord_credentials,
     classify_sentiment,
@@ -132,6 +133,25 @@ class BetaVerifier:
                 f"Scraper verification failed: {str(e)}"
             )
 
+    async def verify_database(self):
+        """Verify the shared database handler can connect and initialize the schema."""
+        try:
+            db = get_database_handler(logger)
+            await asyncio.to_thread(db.ensure_ready)
+            stats = db.stats()
+            self.log_result(
+                "Database",
+                stats["connected"],
+                f"Database ready (connect {stats['connect_ms'] or 0:.0f} ms, "
+                f"schema {stats['schema_init_ms'] or 0:.0f} ms)"
+            )
+        except Exception as e:
+            self.log_result(
+                "Database",
+                False,
+                f"Database verification failed: {str(e)}"
+            )
+
     async def verify_discord_bot(self):
         """Verify Discord bot functionality."""
         try:
@@ -193,6 +213,7 @@ async def main():
     # Run verifications
     await verifier.verify_environment()
     await verifier.verify_scraper()
+    await verifier.verify_database()
     await verifier.verify_discord_bot()
     
     # Save and print results